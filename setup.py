@@ -19,5 +19,9 @@ setup(
         'Programming Language :: Python :: 3.8'
     ],
     python_requires='>=3.8',
-    install_requires=install_requires
+    install_requires=install_requires,
+    extras_require={
+        'numpy': ['numpy'],
+        'fast': ['orjson', 'lxml'],
+    }
 )
@@ -1,64 +1,637 @@
 import csv
 import io
 import json
-from typing import Union, Dict, List, Tuple, Optional, Any
+import mmap
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice, chain
+from json.decoder import WHITESPACE as JSON_WHITESPACE, scanstring
+from json.scanner import make_scanner
+from typing import Union, Dict, List, Tuple, Optional, Any, Callable, Literal, IO, Generator, \
+    Iterator, Iterable, Sequence
 from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
 
-from funk_py.sorting.dict_manip import align_to_list, acc_
+import yaml
+
+try:
+    import orjson
+
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+
+except ImportError:
+    ujson = None
+
+try:
+    from lxml import etree as lxml_etree
+
+except ImportError:
+    lxml_etree = None
+
+from funk_py.modularity.logging import make_logger
+from funk_py.sorting.dict_manip import acc_
+
+main_logger = make_logger('converters', 'CONVERTERS_LOG_LEVEL', default_level='warning')
 
 TEXT = 'text'
 
+ParserKind = Literal['json', 'yaml', 'xml']
+PoolType = Literal['thread', 'process']
+# Which parts of parsed data are wanted. See parse_json.
+Projection = Optional[Dict[str, Any]]
+
+
+# lxml's parsers mustn't be shared between threads, so each thread gets its own.
+_lxml_parsers = threading.local()
+
+
+def _lxml_fromstring(data: Union[str, bytes]) -> ET.Element:
+    # Entities declared in a DTD would be left as entity nodes, which the standard library expands
+    # instead, so leave anything with a DTD to the standard library.
+    if ('<!DOCTYPE' if isinstance(data, str) else b'<!DOCTYPE') in data:
+        raise ValueError('Documents with a DTD are parsed by the standard library.')
+
+    if (parser := getattr(_lxml_parsers, 'parser', None)) is None:
+        # Comments and processing instructions would otherwise show up as children, which the
+        # standard library leaves out.
+        _lxml_parsers.parser = parser = lxml_etree.XMLParser(
+            remove_comments=True, remove_pis=True, resolve_entities=False, no_network=True)
+
+    return lxml_etree.fromstring(data, parser)
+
+
+# Some versions of orjson quietly turn integers too big for 64 bits into floats, where the standard
+# library keeps them exact. Any run of twenty digits might be one of those, so with those versions
+# such data is left to the standard library. Searching for them costs about as much as orjson saves,
+# so those versions are never chosen by default.
+_LONG_DIGITS = re.compile(r'[0-9]{20}')
+_LONG_DIGITS_BYTES = re.compile(rb'[0-9]{20}')
+
+
+def _orjson_is_exact() -> bool:
+    try:
+        return isinstance(orjson.loads('18446744073709551616'), int)
+
+    except orjson.JSONDecodeError:
+        return True
+
+
+def _guarded_orjson_loads(data: Union[str, bytes]) -> Any:
+    if (_LONG_DIGITS if isinstance(data, str) else _LONG_DIGITS_BYTES).search(data) is not None:
+        raise ValueError('Integers may be too big for orjson.')
+
+    return orjson.loads(data)
+
+
+def _libyaml_load(data: Union[str, bytes]) -> Any:
+    return yaml.load(data, Loader=yaml.CSafeLoader)
+
+
+# The standard library's (or the pure-Python) parser for each kind of data. Every other parser falls
+# back on it if it fails, so that results and errors are always the same no matter which parser is
+# in use.
+_STDLIB_PARSERS = {'json': 'json', 'yaml': 'pyyaml', 'xml': 'etree'}
+# The parsers available for each kind of data, fastest first.
+_PARSER_BACKENDS: Dict[str, Dict[str, Callable[[Any], Any]]] = {
+    'json': {},
+    'yaml': {},
+    'xml': {},
+}
+if orjson is not None and _orjson_is_exact():
+    _PARSER_BACKENDS['json']['orjson'] = orjson.loads
+
+if ujson is not None:
+    _PARSER_BACKENDS['json']['ujson'] = ujson.loads
+
+_PARSER_BACKENDS['json']['json'] = json.loads
+if orjson is not None and 'orjson' not in _PARSER_BACKENDS['json']:
+    _PARSER_BACKENDS['json']['orjson'] = _guarded_orjson_loads
+
+if getattr(yaml, '__with_libyaml__', False):
+    _PARSER_BACKENDS['yaml']['libyaml'] = _libyaml_load
+
+_PARSER_BACKENDS['yaml']['pyyaml'] = yaml.safe_load
+if lxml_etree is not None:
+    _PARSER_BACKENDS['xml']['lxml'] = _lxml_fromstring
+
+_PARSER_BACKENDS['xml']['etree'] = ET.fromstring
+# The name of the parser in use for each kind of data, and the function that actually parses.
+_active_parser_names: Dict[str, str] = {}
+_active_parsers: Dict[str, Callable[[Any], Any]] = {}
+
+
+def available_parser_backends() -> Dict[str, List[str]]:
+    """
+    :return: The names of the parsers installed for each kind of data (``'json'``, ``'yaml'`` and
+        ``'xml'``), fastest first.
+    """
+    return {kind: list(backends) for kind, backends in _PARSER_BACKENDS.items()}
+
+
+def get_parser_backends() -> Dict[str, str]:
+    """:return: The name of the parser in use for each kind of data."""
+    return _active_parser_names.copy()
+
+
+def set_parser_backend(kind: ParserKind, backend: str):
+    """
+    Chooses which parser should be used for a kind of data by the converters here and by
+    :func:`funk_py.sorting.pieces.pick`. Whichever is chosen, results are the same: if a faster
+    parser fails, the standard library's parser is tried before giving up.
+
+    :param kind: The kind of data, ``'json'``, ``'yaml'`` or ``'xml'``.
+    :param backend: The name of the parser. See :func:`available_parser_backends`.
+    """
+    if kind not in _PARSER_BACKENDS:
+        raise ValueError(f'There are no parsers for {kind!r}.')
+
+    if (parser := _PARSER_BACKENDS[kind].get(backend)) is None:
+        raise ValueError(f'{backend!r} is not an available parser for {kind!r}. Available parsers '
+                         f'are {list(_PARSER_BACKENDS[kind])}.')
+
+    fallback = _PARSER_BACKENDS[kind][_STDLIB_PARSERS[kind]]
+    if parser is not fallback:
+        parser = _with_fallback(parser, fallback)
+
+    _active_parser_names[kind] = backend
+    _active_parsers[kind] = parser
 
-def csv_to_json(data: str) -> list:
+
+def _with_fallback(parser: Callable[[Any], Any], fallback: Callable[[Any], Any]) \
+        -> Callable[[Any], Any]:
+    def parse(data: Any) -> Any:
+        try:
+            return parser(data)
+
+        except Exception:
+            return fallback(data)
+
+    return parse
+
+
+def use_stdlib_parsers():
+    """
+    Uses only the standard library's parsers (and PyYAML's pure-Python one), for reproducibility.
+    The same can be done at import by setting the ``FUNK_PY_STDLIB_PARSERS`` environment variable.
+    """
+    for kind, backend in _STDLIB_PARSERS.items():
+        set_parser_backend(kind, backend)
+
+
+def use_fastest_parsers():
+    """Uses the fastest parser installed for each kind of data. This is the default."""
+    for kind, backends in _PARSER_BACKENDS.items():
+        set_parser_backend(kind, next(iter(backends)))
+
+
+if os.environ.get('FUNK_PY_STDLIB_PARSERS', '').lower() in ('', '0', 'false', 'no'):
+    use_fastest_parsers()
+
+else:
+    use_stdlib_parsers()
+
+main_logger.info(f'Using parsers: {_active_parser_names}')
+
+
+def parse_json(data: Union[str, bytes], projection: Projection = None) -> Any:
+    """
+    Parses a JSON string with whichever parser is in use (see :func:`set_parser_backend`).
+
+    If a ``projection`` is given, only the parts of the JSON it asks for are built. A projection is
+    a ``dict`` whose keys are the keys wanted from an object, and whose values are projections for
+    the values under those keys. ``None`` means the whole value is wanted. A projection applies to
+    every item of an array. Anything not asked for is parsed a piece at a time and dropped, so
+    memory follows the size of what is kept rather than the size of ``data``.
+
+    Example:
+
+    .. code-block:: python
+
+        data = '{"a": [{"b": 1, "c": 2}, {"b": 3, "d": [4, 5]}], "e": {"f": 6}}'
+
+        parse_json(data, {'a': {'b': None}})
+        # {'a': [{'b': 1}, {'b': 3}]}
+
+    :param data: The JSON to parse.
+    :param projection: What should be kept, or ``None`` to keep everything.
+    :return: The parsed value.
+    """
+    if projection is None:
+        return _active_parsers['json'](data)
+
+    if not isinstance(data, str):
+        data = data.decode(json.detect_encoding(data), 'surrogatepass')
+
+    value, idx = _project_json_value(data, _json_skip_whitespace(data, 0), projection)
+    if (idx := _json_skip_whitespace(data, idx)) != len(data):
+        raise json.JSONDecodeError('Extra data', data, idx)
+
+    return value
+
+
+# The standard library's own scanner, so that whatever is kept is parsed just as json.loads would.
+_json_scan_once = make_scanner(json.JSONDecoder())
+
+
+def _json_skip_whitespace(data: str, idx: int) -> int:
+    return JSON_WHITESPACE.match(data, idx).end()
+
+
+def _scan_json_value(data: str, idx: int) -> Tuple[Any, int]:
+    try:
+        return _json_scan_once(data, idx)
+
+    except StopIteration as e:
+        raise json.JSONDecodeError('Expecting value', data, e.value) from None
+
+
+def _project_json_value(data: str, idx: int, projection: Projection) -> Tuple[Any, int]:
+    """
+    Parses the JSON value starting at ``idx``, keeping only what ``projection`` asks for.
+
+    :return: The value, and the index just past it.
+    """
+    char = data[idx:idx + 1]
+    if projection is None or (char != '{' and char != '['):
+        return _scan_json_value(data, idx)
+
+    idx = _json_skip_whitespace(data, idx + 1)
+    if char == '[':
+        builder = []
+        if data[idx:idx + 1] == ']':
+            return builder, idx + 1
+
+        while True:
+            value, idx = _project_json_value(data, idx, projection)
+            builder.append(value)
+            idx = _json_skip_whitespace(data, idx)
+            char = data[idx:idx + 1]
+            if char == ']':
+                return builder, idx + 1
+
+            if char != ',':
+                raise json.JSONDecodeError('Expecting \',\' delimiter', data, idx)
+
+            idx = _json_skip_whitespace(data, idx + 1)
+
+    builder = {}
+    if data[idx:idx + 1] == '}':
+        return builder, idx + 1
+
+    while True:
+        if data[idx:idx + 1] != '"':
+            raise json.JSONDecodeError('Expecting property name enclosed in double quotes', data,
+                                       idx)
+
+        key, idx = scanstring(data, idx + 1)
+        idx = _json_skip_whitespace(data, idx)
+        if data[idx:idx + 1] != ':':
+            raise json.JSONDecodeError('Expecting \':\' delimiter', data, idx)
+
+        idx = _json_skip_whitespace(data, idx + 1)
+        if key in projection:
+            builder[key], idx = _project_json_value(data, idx, projection[key])
+
+        else:
+            idx = _skip_json_value(data, idx)
+
+        idx = _json_skip_whitespace(data, idx)
+        char = data[idx:idx + 1]
+        if char == '}':
+            return builder, idx + 1
+
+        if char != ',':
+            raise json.JSONDecodeError('Expecting \',\' delimiter', data, idx)
+
+        idx = _json_skip_whitespace(data, idx + 1)
+
+
+def _skip_json_value(data: str, idx: int) -> int:
+    """
+    Finds the end of the JSON value starting at ``idx`` without keeping it. The items of arrays and
+    objects are parsed and dropped one at a time, so that no more than one of them is held at once.
+
+    :return: The index just past the value.
+    """
+    char = data[idx:idx + 1]
+    if char == '[':
+        closing = ']'
+
+    elif char == '{':
+        closing = '}'
+
+    else:
+        return _scan_json_value(data, idx)[1]
+
+    idx = _json_skip_whitespace(data, idx + 1)
+    if data[idx:idx + 1] == closing:
+        return idx + 1
+
+    while True:
+        if closing == '}':
+            if data[idx:idx + 1] != '"':
+                raise json.JSONDecodeError('Expecting property name enclosed in double quotes',
+                                           data, idx)
+
+            idx = _json_skip_whitespace(data, scanstring(data, idx + 1)[1])
+            if data[idx:idx + 1] != ':':
+                raise json.JSONDecodeError('Expecting \':\' delimiter', data, idx)
+
+            idx = _json_skip_whitespace(data, idx + 1)
+
+        idx = _json_skip_whitespace(data, _scan_json_value(data, idx)[1])
+        char = data[idx:idx + 1]
+        if char == closing:
+            return idx + 1
+
+        if char != ',':
+            raise json.JSONDecodeError('Expecting \',\' delimiter', data, idx)
+
+        idx = _json_skip_whitespace(data, idx + 1)
+
+
+def yaml_to_json(data: Union[str, bytes]) -> Any:
+    """
+    Parses a YAML string safely, with whichever parser is in use (see :func:`set_parser_backend`).
+
+    :param data: The YAML to parse.
+    :return: The parsed value.
+    """
+    return _active_parsers['yaml'](data)
+
+
+def csv_to_json(data: str, strip: bool = True, dialect: Union[str, csv.Dialect] = 'excel',
+                **fmtparams) -> list:
     """
     Converts a CSV string to a list of json dicts. Will use the first row as the keys for all other
-    rows.
+    rows. To read large CSV files without holding all of them in memory, see :func:`iter_csv`.
 
     :param data: The ``str`` to be converted.
+    :param strip: Whether whitespace should be stripped from the start and end of every value.
+    :param dialect: The CSV dialect to read. See ``csv.reader``.
+    :param fmtparams: Any other formatting parameters for ``csv.reader``.
     :return: A ``list`` of the rows as ``dict`` items.
     """
-    builder = []
-    csv_reader = csv.reader(io.StringIO(data))
-    headers = [header.strip() for header in next(csv_reader)]
-    for row in csv_reader:
-        builder.append(dict(zip(headers, [val.strip() for val in row])))
+    rows = csv.reader(io.StringIO(data), dialect, **fmtparams)
+    if (headers := _read_csv_headers(rows, strip)) is None:
+        return []
+
+    if strip:
+        return [dict(zip(headers, map(str.strip, row))) for row in rows]
+
+    return [dict(zip(headers, row)) for row in rows]
 
-    return builder
 
+# Anything CSV or JSONL can be read from. A str is the data itself, while paths must be os.PathLike.
+TextSource = Union[str, os.PathLike, IO, mmap.mmap, bytes, bytearray, memoryview]
 
-def json_to_csv(data: List[dict]) -> str:
+
+def iter_csv(
+        source: TextSource,
+        chunk_size: int = 1024,
+        as_tuples: bool = False,
+        strip: bool = True,
+        dialect: Union[str, csv.Dialect] = 'excel',
+        encoding: str = 'utf-8',
+        **fmtparams
+) -> Generator[Union[List[dict], Tuple[tuple, List[tuple]]], None, None]:
+    """
+    Reads CSV a chunk of rows at a time, using the first row as the keys for all other rows. Only
+    one chunk is held in memory at once, no matter how large the CSV is.
+
+    :param source: Where to read the CSV from. This can be a ``str`` holding the CSV itself, an
+        ``os.PathLike`` path to a file (such as a ``pathlib.Path``), a text or binary file object,
+        an ``mmap.mmap``, or ``bytes``. Files opened here are closed when reading finishes, while
+        file objects passed in are left open.
+    :param chunk_size: The most rows to yield at once.
+    :param as_tuples: Whether to yield rows as ``tuple`` items, rather than as ``dict`` items.
+        Chunks are then yielded as ``(headers, rows)``, where ``headers`` is the same ``tuple`` of
+        keys every time. Every row is the same length as ``headers``, so extra values are dropped
+        (just as they are from ``dict`` rows) and missing values are filled in with ``None``.
+    :param strip: Whether whitespace should be stripped from the start and end of every value.
+    :param dialect: The CSV dialect to read. See ``csv.reader``.
+    :param encoding: The encoding to read paths, binary file objects, ``mmap.mmap`` objects and
+        ``bytes`` with.
+    :param fmtparams: Any other formatting parameters for ``csv.reader``.
+    :return: A generator yielding a ``list`` of rows at a time.
     """
-    Converts a list of dictionaries to a CSV string. Will check every item to determine needed
-    headers.
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1.')
+
+    with _open_text_source(source, encoding) as file:
+        rows = csv.reader(file, dialect, **fmtparams)
+        if (headers := _read_csv_headers(rows, strip)) is None:
+            return
+
+        if as_tuples:
+            headers = tuple(headers)
+            rows = map(tuple, map(partial(map, str.strip), rows)) if strip else map(tuple, rows)
+            rows = map(partial(_fit_csv_row, len(headers), (None,) * len(headers)), rows)
+            while len(chunk := list(islice(rows, chunk_size))):
+                yield headers, chunk
+
+        else:
+            rows = map(partial(map, str.strip), rows) if strip else rows
+            rows = map(dict, map(partial(zip, headers), rows))
+            while len(chunk := list(islice(rows, chunk_size))):
+                yield chunk
+
+
+def _fit_csv_row(width: int, padding: tuple, row: tuple) -> tuple:
+    return row if len(row) == width else (row + padding)[:width]
+
+
+def _read_csv_headers(rows: Iterator[List[str]], strip: bool) -> Optional[List[str]]:
+    if (headers := next(rows, None)) is None:
+        return None
+
+    return [header.strip() for header in headers] if strip else headers
 
-    :param data: The ``list`` to convert.
-    :return: A ``str`` of the items in ``data`` converted to CSV.
+
+class _BufferReader(io.RawIOBase):
+    """Reads anything supporting the buffer protocol, such as ``mmap.mmap``, without copying it."""
+    def __init__(self, buffer: Union[mmap.mmap, bytes, bytearray, memoryview]):
+        self._view = memoryview(buffer).cast('B')
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        size = min(len(b), len(self._view) - self._position)
+        b[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def close(self):
+        # The view must be let go of, or the mmap it came from can't be closed.
+        if not self.closed:
+            self._view.release()
+
+        super().close()
+
+
+@contextmanager
+def _open_text_source(source: TextSource, encoding: str) -> Iterator[IO[str]]:
+    """
+    Opens anything that text can be read from as a text file object, with newlines left as they are
+    (which the ``csv`` module relies on).
     """
-    if len(data):
-        if type(data[0]) is dict:
-            headers = set(data[0].keys())
-            for i in range(1, len(data)):
-                if type(data[i]) is dict:
-                    headers.update(data[i].keys())
+    if isinstance(source, str):
+        yield io.StringIO(source)
 
-                else:
-                    raise TypeError('Items must be dictionaries.')
+    elif isinstance(source, os.PathLike):
+        with open(source, encoding=encoding, newline='') as file:
+            yield file
+
+    elif isinstance(source, (mmap.mmap, bytes, bytearray, memoryview)):
+        with io.TextIOWrapper(io.BufferedReader(_BufferReader(source)), encoding,
+                              newline='') as file:
+            yield file
+
+    elif isinstance(source.read(0), str):
+        yield source
+
+    else:
+        file = io.TextIOWrapper(source, encoding, newline='')
+        try:
+            yield file
+
+        finally:
+            # Leave the caller's file open.
+            file.detach()
+
+
+@contextmanager
+def _open_binary_source(source: TextSource) -> Iterator[IO]:
+    """
+    Opens anything that data can be read from as a file object. Bytes are read as they are, rather
+    than being decoded, except from a ``str`` or a text file object.
+    """
+    if isinstance(source, str):
+        yield io.StringIO(source)
+
+    elif isinstance(source, os.PathLike):
+        with open(source, 'rb') as file:
+            yield file
+
+    elif isinstance(source, (mmap.mmap, bytes, bytearray, memoryview)):
+        with io.BufferedReader(_BufferReader(source)) as file:
+            yield file
+
+    else:
+        yield source
 
-            headers = list(headers)
-            output = io.StringIO()
-            writer = csv.writer(output, quoting=csv.QUOTE_MINIMAL)
-            writer.writerow(headers)
-            for row in data:
-                writer.writerow(align_to_list(headers, row))
 
-            return output.getvalue()
+# How json_to_csv should find its headers. See json_to_csv.
+CsvHeaders = Union[Literal['all', 'first'], Sequence[str]]
 
-        raise TypeError('Items must be dictionaries.')
 
-    return ''
+def json_to_csv(
+        data: Iterable[dict],
+        stream: Optional[IO[str]] = None,
+        headers: CsvHeaders = 'all',
+        dialect: Union[str, csv.Dialect] = 'excel',
+        **fmtparams
+) -> Optional[str]:
+    """
+    Converts dictionaries to CSV, writing each row as it is reached. Columns are ordered by when
+    their keys are first seen, so the same data always gives the same CSV.
+
+    :param data: The dictionaries to convert. When ``headers`` is ``'all'``, this must be something
+        which can be iterated over twice, such as a ``list``.
+    :param stream: The text stream to write to, such as a file opened with ``newline=''``. If not
+        given, the CSV is returned as a ``str`` instead.
+    :param headers: How to find the headers. ``'all'`` checks every item for headers before
+        writing anything, ``'first'`` uses only the keys of the first item, so that ``data`` is
+        only gone over once, and a sequence of keys uses those keys in that order. Keys which
+        aren't in the headers are left out of the CSV.
+    :param dialect: The CSV dialect to write. See ``csv.writer``.
+    :param fmtparams: Any other formatting parameters for ``csv.writer``.
+    :return: A ``str`` of the items in ``data`` converted to CSV if no ``stream`` was given,
+        otherwise ``None``.
+    """
+    if headers == 'all':
+        if iter(data) is data:
+            raise TypeError('data must be iterable more than once to find all headers. Pass '
+                            "headers='first' or a list of headers to convert it in one pass.")
+
+        found = {}
+        for row in data:
+            if type(row) is not dict:
+                raise TypeError('Items must be dictionaries.')
+
+            # Values are never used, only the order in which keys were first seen.
+            found.update(row)
+
+        headers = list(found)
+        rows = iter(data)
+
+    elif headers == 'first':
+        rows = iter(data)
+        if (first := next(rows, None)) is None:
+            headers = []
+
+        elif type(first) is dict:
+            headers = list(first)
+            rows = chain((first,), rows)
+
+        else:
+            raise TypeError('Items must be dictionaries.')
+
+    elif isinstance(headers, str):
+        raise ValueError(f"headers must be 'all', 'first' or a sequence of keys, not {headers!r}.")
+
+    else:
+        headers = list(headers)
+        rows = iter(data)
+
+    output = io.StringIO() if stream is None else stream
+    if len(headers):
+        writer = csv.writer(output, dialect, **fmtparams)
+        writer.writerow(headers)
+        writer.writerows(_align_csv_rows(headers, rows))
+
+    return output.getvalue() if stream is None else None
+
+
+def _align_csv_rows(headers: List[str], rows: Iterator[dict]) -> Iterator[list]:
+    width = len(headers)
+    positions = {}
+    for i, header in enumerate(headers):
+        positions.setdefault(header, i)
+
+    # Sparse rows are placed through the key to position map, so that a row only costs as much as
+    # the keys it has. Denser rows are faster to look up header by header, as are all rows when a
+    # header is repeated, since only its first column is in the map.
+    sparse = width // 4 if len(positions) == width else 0
+    get_position = positions.get
+    for row in rows:
+        if type(row) is not dict:
+            raise TypeError('Items must be dictionaries.')
 
+        if len(row) < sparse:
+            aligned = [None] * width
+            for key, value in row.items():
+                if (i := get_position(key)) is not None:
+                    aligned[i] = value
 
-def xml_to_json(data: str, sans_attributes: bool = False):
+            yield aligned
+
+        else:
+            yield map(row.get, headers)
+
+
+def xml_to_json(data: str, sans_attributes: bool = False, projection: Projection = None):
     """
     Converts XML data to a JSON representation. Attributes will be interpreted as keys of a dict, as
     will tags within elements. If there are multiple of a tag within one element, the values inside
@@ -142,14 +715,152 @@ def xml_to_json(data: str, sans_attributes: bool = False):
         #     }
         # }
 
+    If a ``projection`` is given (see :func:`parse_json`), elements which it doesn't ask for are
+    emptied as soon as they have been read, so only the parts which are wanted are held in memory.
+    They are then left out of the result entirely, just as :func:`parse_json` leaves out keys, while
+    the parts which are wanted keep the same shape they would have had otherwise.
+
+    To read a large document one repeating element at a time, see :func:`iter_xml`.
+
     :param data: The XML data to parse.
     :param sans_attributes: Whether to exclude attributes from the JSON output.
+    :param projection: What should be kept, or ``None`` to keep everything.
     :return: The JSON representation of the XML data.
     """
-    root = ET.fromstring(data)
+    if projection is None:
+        root = _active_parsers['xml'](data)
+
+    else:
+        root = _parse_projected_xml(data, projection)
+        # Unwanted elements are only dropped now, once the elements around them have been parsed
+        # with them in place, so that removing them can't change the shape of anything else.
+        return _project_parsed({root.tag: _parse_xml_internal(root, sans_attributes)}, projection)
+
     return {root.tag: _parse_xml_internal(root, sans_attributes)}
 
 
+def iter_xml(source: TextSource, path: Union[str, Sequence[str]],
+             sans_attributes: bool = False) -> Generator[Union[dict, str], None, None]:
+    """
+    Reads XML incrementally, yielding each element found at ``path`` as soon as it has been read.
+    Every element is thrown away once it has been read or yielded, so only one record is held in
+    memory at once, no matter how large the XML is. Each record has the same shape it would have
+    in the output of :func:`xml_to_json`.
+
+    Example:
+
+    .. code-block:: python
+
+        data = '''<feed>
+            <meta>skipped</meta>
+            <records>
+                <record id="1"><name>a</name></record>
+                <record id="2"><name>b</name></record>
+            </records>
+        </feed>'''
+
+        list(iter_xml(data, 'feed/records/record'))
+        # [{'name': 'a', 'id': '1'}, {'name': 'b', 'id': '2'}]
+
+        list(iter_xml(data, 'feed/records/record', True))
+        # [{'name': 'a'}, {'name': 'b'}]
+
+    :param source: Where to read the XML from. This can be a ``str`` holding the XML itself, an
+        ``os.PathLike`` path to a file (such as a ``pathlib.Path``), a file object, an
+        ``mmap.mmap``, or ``bytes``. Files opened here are closed when reading finishes, while
+        file objects passed in are left open.
+    :param path: The tags leading from the root to the records, including the root's tag. This
+        can be a ``str`` with the tags separated by ``'/'``, or a sequence of tags, which must be
+        used for tags containing ``'/'``, such as those with namespaces.
+    :param sans_attributes: Whether to exclude attributes from the JSON output.
+    :return: A generator yielding each record.
+    """
+    tags = path.split('/') if isinstance(path, str) else list(path)
+    if not len(tags):
+        raise ValueError('path must hold at least one tag.')
+
+    depth = len(tags)
+    with _open_binary_source(source) as file:
+        # The elements currently open, and how many of them, from the root, match path.
+        opened = []
+        matched = 0
+        for event, element in ET.iterparse(file, ('start', 'end')):
+            level = len(opened)
+            if event == 'start':
+                if matched == level < depth and element.tag == tags[level]:
+                    matched += 1
+
+                opened.append(element)
+                continue
+
+            opened.pop()
+            level -= 1
+            if matched == depth:
+                if level >= depth:
+                    # Part of a record, which is kept until the record itself has been read.
+                    continue
+
+                if level == depth - 1:
+                    yield _parse_xml_internal(element, sans_attributes)
+
+            if matched > level:
+                matched = level
+
+            element.clear()
+            if len(opened):
+                opened[-1].remove(element)
+
+
+# Marks an element none of which is wanted.
+_UNWANTED = object()
+
+
+def _parse_projected_xml(data: Union[str, bytes], projection: dict) -> ET.Element:
+    """
+    Parses XML incrementally, clearing each element that ``projection`` doesn't ask for once it has
+    been read. An unwanted element is left in place empty, so that its parent keeps its shape.
+
+    :param data: The XML data to parse.
+    :param projection: What should be kept. Its keys are matched against the root's tag.
+    :return: The root element.
+    """
+    source = io.StringIO(data) if isinstance(data, str) else io.BytesIO(data)
+    # The projection for each element currently open.
+    projections = []
+    root = None
+    for event, element in ET.iterparse(source, ('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = element
+                projections.append(projection.get(element.tag, _UNWANTED))
+
+            elif (parent := projections[-1]) is None or parent is _UNWANTED:
+                projections.append(parent)
+
+            else:
+                projections.append(parent.get(element.tag, _UNWANTED))
+
+        elif projections.pop() is _UNWANTED:
+            element.clear()
+
+    return root
+
+
+def _project_parsed(value: Any, projection: Projection) -> Any:
+    """Keeps only what ``projection`` asks for from a value which has already been parsed."""
+    if projection is None:
+        return value
+
+    if isinstance(value, dict):
+        return {key: _project_parsed(val, projection[key]) for key, val in value.items()
+                if key in projection}
+
+    if isinstance(value, list):
+        return [_project_parsed(val, projection) for val in value]
+
+    return value
+
+
 def _parse_xml_internal(element: ET.Element, sans_attributes: bool) -> Union[dict, str]:
     """
     Recursively parses XML elements.
@@ -159,23 +870,23 @@ def _parse_xml_internal(element: ET.Element, sans_attributes: bool) -> Union[dic
     :return: The JSON representation of the XML data.
     """
     builder = {}
-    counts = _get_xml_element_internal_names(element)
     for ele in element:
         t = ele.tag
-        if counts[t] > 1:
-            if t in builder:
-                builder[t].append(_parse_xml_internal(ele, sans_attributes))
+        val = _parse_xml_internal(ele, sans_attributes)
+        # Parsed elements are never lists, so a list can only mean the tag was already repeated.
+        if (current := builder.get(t, _UNWANTED)) is _UNWANTED:
+            builder[t] = val
 
-            else:
-                builder[t] = [_parse_xml_internal(ele, sans_attributes)]
+        elif type(current) is list:
+            current.append(val)
 
         else:
-            builder[t] = _parse_xml_internal(ele, sans_attributes)
+            builder[t] = [current, val]
 
     if sans_attributes:
         if not len(builder):
             if (t := element.text) is None:
-                return element.attrib.copy()
+                return dict(element.attrib)
 
             return str(t)
 
@@ -192,23 +903,9 @@ def _parse_xml_internal(element: ET.Element, sans_attributes: bool) -> Union[dic
     return builder
 
 
-def _get_xml_element_internal_names(element: ET.Element) -> Dict[str, int]:
-    """
-    Counts the occurrences of each tag among the children of an XML element.
-
-    :param element: The XML element.
-    :return: A ``dict`` containing tag names as keys and the count of their occurrences as values.
-    """
-    builder = {}
-    for ele in element:
-        t = ele.tag
-        builder[t] = builder.get(t, 0) + 1
-
-    return builder
-
-
-def json_to_xml(data: dict, favor_attributes: bool = False,
-                avoid_text_and_elements: bool = True):
+def json_to_xml(data: Union[dict, Iterable[dict]], favor_attributes: bool = False,
+                avoid_text_and_elements: bool = True, stream: Optional[IO[str]] = None,
+                root: Optional[str] = None) -> Optional[str]:
     """
     Converts JSON data to an XML representation. If ``favor_attributes`` is ``True`` then:
 
@@ -341,56 +1038,305 @@ def json_to_xml(data: dict, favor_attributes: bool = False,
         #            '</j>'
         #            '</a>')
 
-    :param data: The JSON data to convert.
+    The XML is written out as it is converted, so it is never held in memory all at once as a tree
+    or as a ``str`` when a ``stream`` is given. To convert records one at a time as they are
+    reached, pass them as an iterator together with the tag of the ``root`` they belong in. Only
+    the elements of each record are kept, just as for a ``list`` under the root's key, so
+    ``json_to_xml(records, root='a')`` gives the same XML as ``json_to_xml({'a': list(records)})``:
+
+    .. code-block:: python
+
+        records = ({'record': {'id': i}} for i in range(3))
+
+        with open('records.xml', 'w') as file:
+            json_to_xml(records, stream=file, root='records')
+
+        # records.xml holds ('<records>'
+        #                    '<record><id>0</id></record>'
+        #                    '<record><id>1</id></record>'
+        #                    '<record><id>2</id></record>'
+        #                    '</records>')
+
+    :param data: The JSON data to convert, or an iterator of records if ``root`` is given.
     :type data: dict
     :param favor_attributes: Whether to favor storing values as attributes or not.
     :type favor_attributes: bool
     :param avoid_text_and_elements: If ``True``, then attempts will be made to avoid an element
         having both text and internal elements. If ``False``, no such attempts will be made.
     :type avoid_text_and_elements: bool
-    :return: A string representing the JSON object converted to an XML format.
+    :param stream: The text stream to write to. If not given, the XML is returned as a ``str``
+        instead.
+    :param root: The tag of the root element, when ``data`` holds records rather than a ``dict``.
+    :return: A string representing the JSON object converted to an XML format if no ``stream`` was
+        given, otherwise ``None``.
     """
-    if len(data) == 1:
-        root = ET.Element(key := list(data.keys())[0])
-        if (t := type(data[key])) is dict:
-            attributes, elements, text = _json_dict_to_element(data[key], favor_attributes,
-                                                               avoid_text_and_elements)
-            root.attrib.update(attributes)
-            for element in elements:
-                root.append(element)
+    if root is not None:
+        if isinstance(data, dict):
+            raise TypeError('root is only used when data holds records, rather than a dict.')
+
+        key, val = root, data
+
+    elif not isinstance(data, dict):
+        raise TypeError('root must be given when data holds records, rather than a dict.')
+
+    elif len(data) == 1:
+        key, val = next(iter(data.items()))
 
+    elif len(data) > 1:
+        raise ValueError('The root dictionary should only have one key to generate XML data.')
+
+    else:
+        raise ValueError('Why have you done this? Whatever you passed to json_to_xml had a '
+                         'length, but could not be converted.')
+
+    if not isinstance(key, str):
+        raise TypeError(f'cannot serialize {key!r} (type {type(key).__name__})')
+
+    writer = _XmlWriter(io.StringIO() if stream is None else stream)
+    if root is not None:
+        if key[:1] == '{':
+            raise ValueError(_QUALIFIED_RECORDS_ERROR)
+
+        qualified = False
+
+    else:
+        qualified = key[:1] == '{' or _has_qualified_names(val)
+
+    if type(val) is list and not qualified or root is not None:
+        # Only the elements of each item are kept, so each item can be written as it is reached.
+        writer.start(key)
+        for v in val:
+            if root is not None and _has_qualified_names(v):
+                raise ValueError(_QUALIFIED_RECORDS_ERROR)
+
+            _, elements, _ = _json_dict_to_element(v, favor_attributes, avoid_text_and_elements)
+            writer.children(elements)
+
+        writer.end(key)
+
+    else:
+        current = _XmlElement(key)
+        if type(val) is dict:
+            current.attrib, current.children, text = \
+                _json_dict_to_element(val, favor_attributes, avoid_text_and_elements)
             if text:
-                root.text = text
+                current.text = text
 
-        elif t is list:
-            for v in data[key]:
-                _, elements, _ = _json_dict_to_element(v, favor_attributes, avoid_text_and_elements)
-                for element in elements:
-                    root.append(element)
+        elif type(val) is list:
+            for v in val:
+                _, elements, _ = _json_dict_to_element(v, favor_attributes,
+                                                       avoid_text_and_elements)
+                current.children.extend(elements)
 
         else:
-            root.text = str(data[key])
+            current.text = str(val)
 
-        return ET.tostring(root).decode()
+        if qualified:
+            # Namespaces are declared on the root, so every name has to be known before anything
+            # is written.
+            _expand_xml_element(current)
+            writer.qnames, namespaces = _get_xml_qnames(current)
+            writer.element(current, namespaces)
 
-    elif len(data) > 1:
-        raise ValueError('The root dictionary should only have one key to generate XML data.')
+        else:
+            writer.element(current)
+
+    writer.flush()
+    return writer.stream.getvalue() if stream is None else None
+
+
+_QUALIFIED_RECORDS_ERROR = ('Tags in {namespace}tag form need their namespaces declared on the '
+                            'root before any records are written, so they can only be used when '
+                            'data is a dict.')
+# The prefixes ElementTree gives well-known namespaces.
+_XML_NAMESPACE_PREFIXES = {
+    'http://www.w3.org/XML/1998/namespace': 'xml',
+    'http://www.w3.org/1999/xhtml': 'html',
+    'http://www.w3.org/1999/02/22-rdf-syntax-ns#': 'rdf',
+    'http://schemas.xmlsoap.org/wsdl/': 'wsdl',
+    'http://www.w3.org/2001/XMLSchema': 'xs',
+    'http://www.w3.org/2001/XMLSchema-instance': 'xsi',
+    'http://purl.org/dc/elements/1.1/': 'dc',
+}
+_XML_ATTRIBUTE_ENTITIES = {'"': '&quot;', '\r': '&#13;', '\n': '&#10;', '\t': '&#09;'}
 
-    raise ValueError('Why have you done this? Whatever you passed to json_to_xml had a length, but '
-                     'could not be converted.')
+
+def _has_qualified_names(data: Any) -> bool:
+    """Checks whether any key in ``data`` would give a tag or attribute in {namespace}name form."""
+    stack = [data]
+    while len(stack):
+        if isinstance(val := stack.pop(), dict):
+            for k, v in val.items():
+                if (k if type(k) is str else str(k))[:1] == '{':
+                    return True
+
+                if isinstance(v, (dict, list)):
+                    stack.append(v)
+
+        elif isinstance(val, list):
+            stack.extend(val)
+
+    return False
+
+
+def _expand_xml_element(element: '_XmlElement'):
+    """Converts every child of ``element`` left to be converted when written, all the way down."""
+    stack = [element]
+    while len(stack):
+        children = stack.pop().children
+        for i, child in enumerate(children):
+            if type(child) is tuple:
+                children[i] = child = _parse_dict_to_element(*child)
+
+            stack.append(child)
+
+
+def _get_xml_qnames(root: '_XmlElement') -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Works out the prefixed name of every tag and attribute name the same way ElementTree does,
+    numbering namespaces in the order they are first used.
+
+    :return: The prefixed name for each name, and the prefix for each namespace.
+    """
+    qnames = {}
+    namespaces = {}
+
+    def add_qname(qname: str):
+        if qname[:1] == '{':
+            uri, tag = qname[1:].rsplit('}', 1)
+            if (prefix := namespaces.get(uri)) is None:
+                if (prefix := _XML_NAMESPACE_PREFIXES.get(uri)) is None:
+                    prefix = 'ns' + str(len(namespaces))
+
+                if prefix != 'xml':
+                    namespaces[uri] = prefix
+
+            qnames[qname] = prefix + ':' + tag
+
+        else:
+            qnames[qname] = qname
+
+    stack = [root]
+    while len(stack):
+        element = stack.pop()
+        if element.tag not in qnames:
+            add_qname(element.tag)
+
+        for k in element.attrib:
+            if k not in qnames:
+                add_qname(k)
+
+        stack.extend(reversed(element.children))
+
+    return qnames, namespaces
+
+
+class _XmlElement:
+    """
+    Holds what :func:`json_to_xml` needs of an element until it is written, in place of an
+    ``ET.Element``. Children may be left as ``(tag, dict, fa, ave)`` to be converted only once they
+    are written, since a ``dict`` always becomes exactly one element.
+    """
+    __slots__ = ('tag', 'attrib', 'text', 'children')
+
+    def __init__(self, tag: str, attrib: Optional[dict] = None):
+        self.tag = tag
+        self.attrib = {} if attrib is None else dict(attrib)
+        self.text = None
+        self.children = []
+
+
+class _XmlWriter:
+    """
+    Writes elements to a text stream exactly as ``ET.tostring`` would have, a few thousand pieces at
+    a time.
+    """
+    __slots__ = ('stream', 'pieces', 'open', 'qnames')
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+        self.pieces = []
+        # The tag of an element started by start, which can't be closed off until it is known
+        # whether it has any children.
+        self.open = None
+        # The prefixed name to write for each name, if any are in {namespace}name form.
+        self.qnames = None
+
+    def start(self, tag: str):
+        self.pieces.append('<' + tag)
+        self.open = tag
+
+    def children(self, children: list):
+        if len(children) and self.open is not None:
+            self.pieces.append('>')
+            self.open = None
+
+        for child in children:
+            self.element(child)
+
+    def end(self, tag: str):
+        if self.open is None:
+            self.pieces.append('</' + tag + '>')
+
+        else:
+            self.pieces.append(' />')
+            self.open = None
+
+    def element(self, element: Union[_XmlElement, tuple], namespaces: Dict[str, str] = None):
+        if type(element) is tuple:
+            element = _parse_dict_to_element(*element)
+
+        pieces = self.pieces
+        qnames = self.qnames
+        tag = element.tag if qnames is None else qnames[element.tag]
+        pieces.append('<' + tag)
+        if namespaces:
+            for uri, prefix in sorted(namespaces.items(), key=lambda x: x[1]):
+                pieces.append(f' xmlns:{prefix}="{escape(uri, _XML_ATTRIBUTE_ENTITIES)}"')
+
+        for k, v in element.attrib.items():
+            if qnames is not None:
+                k = qnames[k]
+
+            pieces.append(f' {k}="{escape(v, _XML_ATTRIBUTE_ENTITIES)}"')
+
+        if (text := element.text) or len(element.children):
+            pieces.append('>')
+            if text:
+                pieces.append(escape(text))
+
+            for child in element.children:
+                self.element(child)
+
+            pieces.append('</' + tag + '>')
+
+        else:
+            pieces.append(' />')
+
+        if len(pieces) > 4096:
+            self.flush()
+
+    def flush(self):
+        chunk = ''.join(self.pieces)
+        self.pieces.clear()
+        if not chunk.isascii():
+            # ET.tostring writes us-ascii, with character references for anything else.
+            chunk = chunk.encode('ascii', 'xmlcharrefreplace').decode('ascii')
+
+        self.stream.write(chunk)
 
 
 def _json_dict_to_element(
         data: Any,
         fa: bool,
         ave: bool = True
-) -> Tuple[dict, List[ET.Element], Optional[str]]:
+) -> Tuple[dict, list, Optional[str]]:
     text = None
     attributes = {}
     elements = []
 
     def add_element(key, val):
-        elements.append(current := ET.Element(str(key)))
+        elements.append(current := _XmlElement(str(key)))
         if val is not None:
             current.text = str(val)
 
@@ -427,11 +1373,8 @@ def _json_dict_to_element(
 
 def _parse_dict_to_element(tag: Any, val: dict, fa, ave):
     attributes, elements, text = _json_dict_to_element(val, fa, ave)
-    current = ET.Element(str(tag), attributes)
-    if len(elements):
-        for element in elements:
-            current.append(element)
-
+    current = _XmlElement(str(tag), attributes)
+    current.children = elements
     if text is not None:
         current.text = str(text)
 
@@ -448,17 +1391,18 @@ def _parse_list_in_list_to_elements(tag: Any, val: list, fa, ave):
     if __text is not None and ave:
         fa = True
 
+    # Kept so that each item is only converted once, whichever way the list turns out.
+    converted = []
     for v in val:
         if isinstance(v, dict):
-            attributes, elements, text = _json_dict_to_element(v, fa, ave)
+            converted.append(parts := _json_dict_to_element(v, fa, ave))
+            attributes, elements, text = parts
             if len(attributes) or len(elements):
                 if not building:
-                    current = ET.Element(str(tag))
+                    current = _XmlElement(str(tag))
                     building = True
 
-                for element in elements:
-                    current.append(element)
-
+                current.children.extend(elements)
                 current.attrib.update(attributes)
 
             if text:
@@ -466,20 +1410,17 @@ def _parse_list_in_list_to_elements(tag: Any, val: list, fa, ave):
 
     __text = _text if __text is None else __text
     if not building:
-        current = ET.Element(str(tag))
+        current = _XmlElement(str(tag))
 
     if __text is not None:
         current.text = str(__text)
 
     else:
         output = []
-        for v in val:
-            if isinstance(v, dict):
-                attributes, elements, text = _json_dict_to_element(v, fa, ave)
-                if len(attributes) or len(elements):
-                    output.append(current := ET.Element(str(tag), attributes))
-                    for element in elements:
-                        current.append(element)
+        for attributes, elements, text in converted:
+            if len(attributes) or len(elements):
+                output.append(current := _XmlElement(str(tag), attributes))
+                current.children.extend(elements)
 
         return output
 
@@ -489,11 +1430,10 @@ def _parse_list_in_list_to_elements(tag: Any, val: list, fa, ave):
 def _parse_dict_in_list_to_elements(tag: Any, val: dict, fa, ave):
     current = None
     attributes, elements, text = _json_dict_to_element(val, fa, ave)
-    if len(attributes) or len(elements) or len(text):
-        current = ET.Element(str(tag), attributes)
-        for element in elements:
-            current.append(element)
-
+    # A dict with nothing but an empty text still falls back to the list's default handling.
+    if len(attributes) or len(elements) or text is None or len(text):
+        current = _XmlElement(str(tag), attributes)
+        current.children = elements
         current.text = text
 
     return current
@@ -502,8 +1442,9 @@ def _parse_dict_in_list_to_elements(tag: Any, val: dict, fa, ave):
 def _parse_pair_to_elements(elements: list, attributes: dict, key: Any, val: Any, fa, ave,
                             default: callable):
     if isinstance(val, dict):
-        # Not much choice if it's a dictionary, a new element must be generated.
-        elements.append(_parse_dict_to_element(key, val, fa, ave))
+        # Not much choice if it's a dictionary, a new element must be generated. It is only
+        # converted once it is written, so that the whole tree is never held at once.
+        elements.append((key, val, fa, ave))
 
     elif isinstance(val, list):
         list_handler = {}
@@ -532,7 +1473,7 @@ def _parse_pair_to_elements(elements: list, attributes: dict, key: Any, val: Any
                 if k in attributes:
                     del attributes[k]
                     for _v in v:
-                        elements.append(current := ET.Element(k))
+                        elements.append(current := _XmlElement(k))
                         current.text = _v
 
     else:
@@ -567,21 +1508,207 @@ def wonky_json_to_json(data: str, different_quote: str = '\''):
     data = different_quote.join(around_escaped)
 
     # Now parse the json string. Good luck and hope this works every time.
-    return json.loads(data)
+    return _active_parsers['json'](data)
 
 
-def jsonl_to_json(data: str) -> list:
+def jsonl_to_json(data: Union[str, bytes]) -> list:
     """
-    Converts a JSONL string to a list of objects.
+    Converts a JSONL string to a list of objects. Blank lines, including any trailing newlines, are
+    skipped. To read large JSONL files without holding all of them in memory, see
+    :func:`iter_jsonl`.
 
     :param data: The JSONL string to convert.
     :return: A ``list`` containing the ``dict`` and ``list`` items stored in the JSONL string.
     """
-    return [json.loads(p) for p in data.split('\n')]
+    return [item for chunk in iter_jsonl(data) for item in chunk]
+
+
+def iter_jsonl(
+        source: TextSource,
+        chunk_size: int = 1 << 20,
+        workers: Optional[int] = None,
+        pool: PoolType = 'process'
+) -> Generator[list, None, None]:
+    """
+    Reads JSONL a chunk at a time. The data is split into ranges of about ``chunk_size`` bytes
+    which always end on a newline, so that each range can be decoded on its own, optionally in a
+    pool of workers. Chunks are yielded in the same order they appear in ``source``, and no more
+    than two chunks per worker are read ahead, so memory use stays bounded for large files. Blank
+    lines are skipped.
+
+    Example:
+
+    .. code-block:: python
+
+        from pathlib import Path
+
+        for chunk in iter_jsonl(Path('events.jsonl'), workers=os.cpu_count()):
+            for event in chunk:
+                ...
+
+    :param source: Where to read the JSONL from. This can be a ``str`` holding the JSONL itself, an
+        ``os.PathLike`` path to a file (such as a ``pathlib.Path``), a text or binary file object,
+        an ``mmap.mmap``, or ``bytes``. Files opened here are closed when reading finishes, while
+        file objects passed in are left open.
+    :param chunk_size: About how many bytes (or characters, for a ``str`` or text file object) to
+        decode at once. Each chunk is extended to the end of the line it stops in.
+    :param workers: If specified, the number of workers to decode chunks in. Decoding is CPU-bound,
+        so a process pool is needed for this to scale.
+    :param pool: The kind of pool to use for workers, either ``'process'`` or ``'thread'``. Workers
+        in a process pool are only sent where each chunk is when ``source`` is a path, rather than
+        the chunk itself.
+    :return: A generator yielding a ``list`` of the items on each chunk of lines.
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1.')
+
+    if workers is None:
+        with _open_jsonl_chunks(source, chunk_size, False) as chunks:
+            for chunk in chunks:
+                yield _load_jsonl_chunk(chunk)
+
+        return
+
+    if workers < 1:
+        raise ValueError('There must be at least one worker to decode with.')
+
+    if pool == 'process':
+        executor = ProcessPoolExecutor(workers)
+
+    elif pool == 'thread':
+        executor = ThreadPoolExecutor(workers)
+
+    else:
+        raise ValueError(f'Invalid pool type specified. ({pool!r})')
+
+    # Keep a couple of chunks queued for each worker so that they never sit idle, but don't read
+    # further ahead than that.
+    pending = deque()
+    with executor, _open_jsonl_chunks(source, chunk_size, pool == 'process') as chunks:
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(_load_jsonl_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+
+            while len(pending):
+                yield pending.popleft().result()
+
+        finally:
+            # If the caller stopped early, there's no need to finish the remaining chunks.
+            for future in pending:
+                future.cancel()
+
+
+@contextmanager
+def _open_jsonl_chunks(source: TextSource, chunk_size: int, by_range: bool) \
+        -> Iterator[Iterator[Union[str, bytes, Tuple[str, int, int]]]]:
+    """
+    Splits JSONL into chunks of whole lines.
+
+    :param by_range: Whether chunks of a file at a path should be given as ``(path, start, end)``
+        so that they can be read wherever they are decoded, rather than being read here.
+    """
+    if isinstance(source, os.PathLike):
+        path = os.fspath(source)
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                # Empty files can't be mapped.
+                yield iter(())
+
+            else:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    ranges = _jsonl_ranges(mapped, chunk_size)
+                    if by_range:
+                        yield ((path, start, end) for start, end in ranges)
+
+                    else:
+                        yield (mapped[start:end] for start, end in ranges)
+
+    elif isinstance(source, (str, mmap.mmap, bytes, bytearray, memoryview)):
+        if isinstance(source, memoryview):
+            # Views can't be searched, so there's no way around copying one.
+            source = source.tobytes()
+
+        yield (source[start:end] for start, end in _jsonl_ranges(source, chunk_size))
+
+    else:
+        yield _read_jsonl_chunks(source, chunk_size)
+
+
+def _jsonl_ranges(data: Union[str, bytes, bytearray, mmap.mmap], chunk_size: int) \
+        -> Iterator[Tuple[int, int]]:
+    newline = '\n' if isinstance(data, str) else b'\n'
+    size = len(data)
+    start = 0
+    while start < size:
+        if (end := start + chunk_size) >= size:
+            end = size
+
+        elif (end := data.find(newline, end - 1)) < 0:
+            end = size
+
+        else:
+            end += 1
+
+        yield start, end
+        start = end
+
+
+def _read_jsonl_chunks(file: IO, chunk_size: int) -> Iterator[Union[str, bytes]]:
+    while len(chunk := file.read(chunk_size)):
+        # Finish off the line the chunk stopped in.
+        if chunk[-1:] not in ('\n', b'\n'):
+            chunk += file.readline()
+
+        yield chunk
+
+
+def _load_jsonl_chunk(chunk: Union[str, bytes, Tuple[str, int, int]]) -> list:
+    if type(chunk) is tuple:
+        path, start, end = chunk
+        with open(path, 'rb') as file:
+            file.seek(start)
+            chunk = file.read(end - start)
+
+    parse = _active_parsers['json']
+    # Not splitlines, which would also split on characters JSON strings may hold, such as U+2028.
+    lines = chunk.split('\n' if isinstance(chunk, str) else b'\n')
+    return [parse(line) for line in lines if len(line) and not line.isspace()]
+
+
+def json_to_jsonl(data: Iterable[Union[list, dict]], stream: Union[IO[str], os.PathLike] = None,
+                  batch_size: int = 1024, append: bool = False) -> Optional[str]:
+    """
+    Converts items to JSONL, with one item on each line.
+
+    :param data: The items to convert. These are consumed lazily, so they may come from a
+        generator.
+    :param stream: The text stream or ``os.PathLike`` path to write to. Lines are written a batch
+        at a time, each ending in a newline, so that more lines can follow them. If not given, the
+        JSONL is returned as a ``str`` instead, without a trailing newline.
+    :param batch_size: How many lines to write at once.
+    :param append: Whether to add to the end of the file at a path given as ``stream``, rather than
+        replacing it. File objects are always written to wherever they are.
+    :return: A ``str`` of the items in ``data`` converted to JSONL if no ``stream`` was given,
+        otherwise ``None``.
+    """
+    if stream is None:
+        return '\n'.join(json.dumps(line) for line in data)
+
+    if batch_size < 1:
+        raise ValueError('batch_size must be at least 1.')
+
+    if isinstance(stream, os.PathLike):
+        with open(stream, 'a' if append else 'w', encoding='utf-8') as file:
+            return json_to_jsonl(data, file, batch_size)
 
+    lines = map(json.dumps, data)
+    while len(batch := list(islice(lines, batch_size))):
+        batch.append('')
+        stream.write('\n'.join(batch))
 
-def json_to_jsonl(data: List[Union[list, dict]]) -> str:
-    return '\n'.join(json.dumps(line) for line in data)
+    return None
 
 
 def list_to_string_list(data: list) -> str:
@@ -413,10 +413,14 @@ def align_to_list(order: Union[list, dict], to_align: dict, default: Any = None)
     if type(order) is dict:
         order = list(order.keys())
 
+    positions = {}
+    for i, k in enumerate(order):
+        positions.setdefault(k, i)
+
     output = [default] * len(order)
     for k, v in to_align.items():
-        if k in order:
-            output[order.index(k)] = v
+        if (i := positions.get(k)) is not None:
+            output[i] = v
 
     return output
 
@@ -1,15 +1,34 @@
+import asyncio
+import heapq
+import inspect
 import json
+import marshal
+import os
+import pickle
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from copy import deepcopy
+from datetime import datetime
 from enum import Enum, IntEnum
+from itertools import islice, zip_longest
+from time import perf_counter
 from typing import Mapping, Any, Literal, Union, List, Tuple, Optional, Iterator, Generator, \
-    Callable, Dict, Hashable, Iterable
+    Callable, Dict, Hashable, Iterable, AsyncIterable, AsyncGenerator
 from urllib.parse import parse_qs
 
-import yaml
+try:
+    import numpy as np
+
+except ImportError:
+    np = None
 
 from funk_py.modularity.decoration.enums import converts_enums, CarrierEnum, ignore, special_member
 from funk_py.modularity.logging import make_logger
-from funk_py.sorting.converters import csv_to_json, xml_to_json, wonky_json_to_json, jsonl_to_json
+from funk_py.sorting.converters import csv_to_json, xml_to_json, wonky_json_to_json, \
+    jsonl_to_json, parse_json, yaml_to_json, Projection, PoolType
 from funk_py.sorting.dict_manip import convert_tuplish_dict, get_subset_values, get_subset
 
 main_logger = make_logger('pieces', 'PIECES_LOG_LEVEL', default_level='warning')
@@ -26,6 +45,7 @@ OutputMapSpecifier = Literal['json', 'jsonl', 'json\'',
                              'tuple-dict',
                              'form-urlencoded',
                              'combinatorial', 'tandem', 'reduce', 'accumulate']
+SpillFormat = Literal['pickle', 'jsonl', 'marshal']
 PickProcessFunc = Callable[[list, list, dict], None]
 PickFinalFunc = Callable[[list, dict], None]
 
@@ -81,29 +101,23 @@ def _com_tan_start_and_list_func(ans: list, builder: list, static_builder: dict)
 def _acc_start_list_and_iter_func(ans: list, builder: list, static_builder: dict) -> None:
     if not len(builder):
         builder.append({})
-        for _ans in ans:
-            for k, v in _ans.items():
+
+    # Lists in results can be straight from the input, and the lists held here are extended later,
+    # so they are copied rather than shared.
+    for _ans in ans:
+        for k, v in _ans.items():
+            if k in builder[0]:
                 if isinstance(v, list):
-                    builder[0][k] = v
+                    builder[0][k].extend(v)
 
                 else:
-                    builder[0][k] = [v]
-
-    else:
-        for _ans in ans:
-            for k, v in _ans.items():
-                if k in builder[0]:
-                    if isinstance(v, list):
-                        builder[0][k].extend(v)
-
-                    else:
-                        builder[0][k].append(v)
+                    builder[0][k].append(v)
 
-                elif isinstance(v, list):
-                    builder[0][k] = v
+            elif isinstance(v, list):
+                builder[0][k] = v.copy()
 
-                else:
-                    builder[0][k] = [v]
+            else:
+                builder[0][k] = [v]
 
 
 def _com_iter_func(ans: list, builder: list, static_builder: dict) -> None:
@@ -166,6 +180,127 @@ def _acc_final_func(builder: list, static_builder: dict) -> None:
                 builder[0][k] = [v]
 
 
+# The typecode used for a column whose values are all of a type.
+_COLUMN_TYPECODES = {int: 'q', float: 'd'}
+
+
+class _Columns(dict):
+    """
+    The columns built by :func:`pick_columns`, by key. Each column is a typed ``array.array`` for as
+    long as its values are all ``int`` (that fit in 64 bits) or all ``float``, and a ``list``
+    otherwise. Being its own type marks columns as belonging to the pick, so that they can be taken
+    over rather than copied.
+    """
+    __slots__ = ()
+
+    def add(self, key: Any, value: Any, owned: bool = False):
+        """
+        Adds a value to a column, or all the values in a ``list`` or ``array.array`` to it.
+
+        :param key: The key of the column.
+        :param value: The value or values to add.
+        :param owned: Whether an ``array.array`` can be kept as the column itself, instead of being
+            copied.
+        """
+        column = self.get(key)
+        if type(value) is list or isinstance(value, array):
+            self._extend(key, column, value, owned)
+
+        elif not column:
+            # An empty column hasn't had a chance to be typed yet.
+            self[key] = self._new_column((value,))
+
+        elif type(column) is list:
+            column.append(value)
+
+        elif type(value) is _COLUMN_TYPES[column.typecode]:
+            try:
+                column.append(value)
+
+            except OverflowError:
+                self[key] = column.tolist() + [value]
+
+        else:
+            self[key] = column.tolist() + [value]
+
+    def _extend(self, key: Any, column: Optional[Union[array, list]], values: Union[array, list],
+                owned: bool):
+        if not column:
+            self[key] = values if owned and isinstance(values, array) else self._new_column(values)
+
+        elif type(column) is list:
+            column.extend(values)
+
+        elif isinstance(values, array):
+            if values.typecode == column.typecode:
+                column.extend(values)
+
+            else:
+                self[key] = column.tolist() + values.tolist()
+
+        elif all(type(v) is _COLUMN_TYPES[column.typecode] for v in values):
+            try:
+                column.fromlist(values)
+
+            except OverflowError:
+                self[key] = column.tolist() + values
+
+        else:
+            self[key] = column.tolist() + values
+
+    @staticmethod
+    def _new_column(values: Union[list, tuple, array]) -> Union[array, list]:
+        if isinstance(values, array):
+            return array(values.typecode, values)
+
+        if len(values) and (typecode := _COLUMN_TYPECODES.get(type(values[0]))) is not None:
+            _type = type(values[0])
+            if all(type(v) is _type for v in values):
+                try:
+                    return array(typecode, values)
+
+                except OverflowError:
+                    pass
+
+        return list(values)
+
+
+_COLUMN_TYPES = {typecode: _type for _type, typecode in _COLUMN_TYPECODES.items()}
+
+
+def _get_columns(builder: list) -> _Columns:
+    if not len(builder):
+        builder.append(_Columns())
+
+    elif type(builder[0]) is not _Columns:
+        # _PickFrame leaves an empty dict in place when the first thing it finds is a plain value.
+        builder[0] = _Columns(builder[0])
+
+    return builder[0]
+
+
+def _col_start_list_and_iter_func(ans: list, builder: list, static_builder: dict) -> None:
+    columns = _get_columns(builder)
+    for _ans in ans:
+        # Columns built by nested parts of the pick are only ever held by their results.
+        owned = type(_ans) is _Columns
+        for k, v in _ans.items():
+            columns.add(k, v, owned)
+
+
+def _col_final_func(builder: list, static_builder: dict) -> None:
+    if not len(builder) or type(builder[0]) is not _Columns:
+        # Nothing nested was found (though _PickFrame may have left an empty dict in place).
+        # Whatever takes this result adds the values to its own columns, which is cheaper than
+        # making columns of one value each here.
+        builder[:] = [static_builder]
+        return
+
+    columns = _get_columns(builder)
+    for k, v in static_builder.items():
+        columns.add(k, v)
+
+
 _PICK_TYPE_DEFS = {
     PickType.COMBINATORIAL: (
         _com_tan_start_and_list_func,
@@ -192,6 +327,13 @@ _PICK_TYPE_DEFS = {
         _acc_final_func,
     ),
 }
+# Used by pick_columns in place of PickType.ACCUMULATE's.
+_COLUMNAR_PICK_TYPE_DEF = (
+    _col_start_list_and_iter_func,
+    _col_start_list_and_iter_func,
+    _col_start_list_and_iter_func,
+    _col_final_func,
+)
 _PICK_TYPE_NAMES = {
     'combinatorial': _PICK_TYPE_DEFS[PickType.COMBINATORIAL],
     'tandem': _PICK_TYPE_DEFS[PickType.TANDEM],
@@ -205,13 +347,48 @@ def pick(
         _input: Any,
         list_handling_method: PickType = PickType.COMBINATORIAL
 ) -> list:
-    return _pick(output_map, _input, *_PICK_TYPE_DEFS[list_handling_method])
+    return _pick(output_map, _input, *_PICK_TYPE_DEFS[list_handling_method],
+                 profile=_pick_profile)
+
+
+def pick_columns(output_map: OutputMapType, _input: Any) -> Dict[str, Union[array, list]]:
+    """
+    Picks like :func:`pick` does with ``PickType.ACCUMULATE``, but returns the accumulated values
+    as columns, by key, ready to be handed to numeric code. A column of nothing but ``int`` values
+    that fit in 64 bits is an ``array.array`` of typecode ``'q'``, a column of nothing but
+    ``float`` values is an ``array.array`` of typecode ``'d'``, and any other column is a ``list``.
+
+    Columns are built in place as values are found, and columns from nested parts of the pick are
+    taken over rather than copied, so there is no second pass to convert them. Unlike with
+    :func:`pick`, a key that is only found once still gets a column.
+
+    Example:
+
+    .. code-block:: python
+
+        data = {'a': [{'b': 1, 'c': 'x'}, {'b': 2, 'c': 2.5}]}
+
+        pick_columns({'a': {'b': 'b', 'c': 'c'}}, data)
+        # {'b': array('q', [1, 2]), 'c': ['x', 2.5]}
+
+    :param output_map: The map which describes how incoming data should be parsed. See :func:`pick`.
+    :param _input: The incoming data.
+    :return: The columns, by key.
+    """
+    result = _pick(output_map, _input, *_COLUMNAR_PICK_TYPE_DEF, profile=_pick_profile)
+    if len(result) == 1 and type(result[0]) is _Columns:
+        return dict(result[0])
+
+    # A change of pick type at the very top of output_map leaves rows to be turned into columns.
+    builder = []
+    _col_start_list_and_iter_func(result, builder, {})
+    return dict(builder[0]) if len(builder) else {}
 
 
 def _pick_setup(
         output_map: OutputMapType,
         _input: Any
-) -> Tuple[Optional[OutputMapType], Any, list, bool, Optional[PickType]]:
+) -> Tuple[Optional[OutputMapType], Any, list, bool, Optional[str]]:
     if isinstance(output_map, list):
         # If the output_map is a list, that should mean the user specified a type of conversion to
         # enact on the input (as long as their output_map is valid).
@@ -230,9 +407,9 @@ def _pick_setup(
                 if (t := output_map[0]) in _PICK_TYPE_NAMES:
                     # This should handle cases where the user specifies changing modes during
                     # parsing.
-                    return output_map[-1], _input, [], False, _PICK_TYPE_NAMES[t]
+                    return output_map[-1], _input, [], False, t
 
-                worker = parse_type_as(output_map[0], _input, output_map[1:-1])
+                worker = parse_type_as(output_map[0], _input, output_map[1:-1], output_map[-1])
 
             except Exception as e:
                 main_logger.warning(f'User\'s expected parsing method failed. Exception raised: '
@@ -251,81 +428,102 @@ def _pick_setup(
     return output_map, _input, [], False, None
 
 
-def _find_and_follow_first_path_in_pick(
-        output_map_iter: Iterator,
-        worker: Any,
-        builder: list,
-        static_builder: dict
-) -> Tuple[Optional[OutputMapType], Any, bool]:
-    while True:
-        try:
-            path, instruction = next(output_map_iter)
-            if not isinstance(worker, dict):
-                main_logger.warning(f'An unexpected value was encountered in pick attempt. a path '
-                                    f'has now been skipped. value = {worker}')
-                return None, None, False
+# The stages a _PickFrame can be in.
+_PICK_LIST = 0   # Picking from each item in a list.
+_PICK_FIRST = 1  # Looking for the first path in the output_map which is present in a dict.
+_PICK_REST = 2   # Following the remaining paths in the output_map.
 
-            if path in worker:
-                if isinstance(instruction, str):
-                    static_builder[instruction] = worker[path]
-                    builder.append({})
-                    # The caller doesn't need to call anything, we did everything needed for the
-                    # first key.
-                    return None, None, False
 
-                else:
-                    # Rather than recursively calling a function from inside of this function, we
-                    # pass back the values that the caller needs to use to call the function itself.
-                    # This is done this way to limit how deep we go on the stack. It also means the
-                    # caller can decide which function to call on the values.
-                    if isinstance(worker, dict):
-                        return instruction, worker[path], False
-
-                    main_logger.warning(f'Path ended early. {repr(worker)} does not have keys.')
-                    return None, None, False
-
-        except StopIteration:
-            # Welp, the caller will have to return immediately, none of the paths requested were
-            # present.
-            return None, None, True
-
-
-def _pick_iter(
-        output_map_iter: Iterator,
-        worker: Any,
-        builder: list,
-        static_builder: dict,
-        func: Callable[[list, list, dict], None]
-) -> Generator[Tuple[Optional[OutputMapType], Any, bool], list, None]:
-    """
-    Finishes iterating after the first path was successfully followed. Expects the result of an
-    external function call to be sent to it if it yields an instruction.
-    """
-    if type(worker) is dict:
-        for path, instruction in output_map_iter:
-            if path in worker:
-                if isinstance(instruction, str):
-                    static_builder[instruction] = worker[path]
+class _PickFrame:
+    """
+    The state of a single level of :func:`_pick`. Each level is what would otherwise be a recursive
+    call, but frames are kept on an explicit stack instead, so that the depth of the Python stack
+    doesn't grow with the depth of the ``output_map`` or the input.
+    """
+    __slots__ = ('output_map', 'paths', 'worker', 'builder', 'static_builder', 'funcs', 'stage')
+
+    def __init__(self, output_map: OutputMapType, worker: Any, funcs: tuple):
+        self.output_map = output_map
+        self.worker = worker
+        self.funcs = funcs
+        self.builder = []
+        self.static_builder = {}
+        if isinstance(worker, list):
+            self.stage = _PICK_LIST
+            self.paths = iter(worker)
 
-                else:
-                    # Rather than recursively calling a function from inside of this function, we
-                    # pass back the values that the caller needs to use to call the function itself.
-                    # This is done this way to limit how deep we go on the stack. It also means the
-                    # caller can decide which function to call on the values.
-                    # The caller should send the result of the function back to us here so that we
-                    # can call func on it.
-                    result = yield instruction, worker[path], False
-                    try:
-                        func(result, builder, static_builder)
+        else:
+            self.stage = _PICK_FIRST
+            self.paths = iter(output_map.items())
 
-                    except Exception as e:
-                        main_logger.warning(f'There was an error when attempting to process a '
-                                            f'result. Exception raised: {e}')
+    def advance(self) -> Optional[Tuple[OutputMapType, Any]]:
+        """
+        Does as much work as possible without having to pick from something nested.
 
-    else:
-        main_logger.warning(f'Cannot follow a path in a non-dict. ({worker})')
+        :return: The ``output_map`` and input that need to be picked from before this frame can
+            continue, or ``None`` if this frame is finished (in which case its result is in
+            ``builder``).
+        """
+        if self.stage == _PICK_LIST:
+            for item in self.paths:
+                return self.output_map, item
+
+            return None
+
+        worker = self.worker
+        if self.stage == _PICK_FIRST:
+            for path, instruction in self.paths:
+                if not isinstance(worker, dict):
+                    main_logger.warning(f'An unexpected value was encountered in pick attempt. a '
+                                        f'path has now been skipped. value = {worker}')
+                    break
+
+                if path in worker:
+                    if isinstance(instruction, str):
+                        self.static_builder[instruction] = worker[path]
+                        self.builder.append({})
+                        break
+
+                    # The result will be passed to start_func, after which the frame moves on.
+                    return instruction, worker[path]
+
+            else:
+                # None of the paths requested were present.
+                return None
+
+            self.stage = _PICK_REST
+
+        if type(worker) is dict:
+            for path, instruction in self.paths:
+                if path in worker:
+                    if isinstance(instruction, str):
+                        self.static_builder[instruction] = worker[path]
+
+                    else:
+                        return instruction, worker[path]
+
+        else:
+            main_logger.warning(f'Cannot follow a path in a non-dict. ({worker})')
+
+        self.funcs[3](self.builder, self.static_builder)
+        return None
+
+    def receive(self, result: list):
+        """Adds the result of picking from something nested to this frame's builder."""
+        if self.stage == _PICK_LIST:
+            self.funcs[1](result, self.builder, self.static_builder)
+
+        elif self.stage == _PICK_FIRST:
+            self.funcs[0](result, self.builder, self.static_builder)
+            self.stage = _PICK_REST
 
-    yield None, None, True
+        else:
+            try:
+                self.funcs[2](result, self.builder, self.static_builder)
+
+            except Exception as e:
+                main_logger.warning(f'There was an error when attempting to process a result. '
+                                    f'Exception raised: {e}')
 
 
 def _pick(
@@ -334,886 +532,3150 @@ def _pick(
         start_func: PickProcessFunc,
         list_func: PickProcessFunc,
         iter_func: PickProcessFunc,
-        final_func: PickFinalFunc
+        final_func: PickFinalFunc,
+        pick_types: Mapping[str, tuple] = None,
+        profile: 'PickProfile' = None
 ) -> list:
     """
     The core of :func:`pick`. All pick types run through this method.
 
+    Rather than recursing into nested parts of ``output_map`` and ``_input``, each level is kept
+    as a :class:`_PickFrame` on an explicit stack, so deeply nested maps and payloads don't run
+    into Python's recursion limit.
+
     :param output_map: The map which describes how incoming data should be parsed.
     :param _input: The incoming data.
     :param start_func: The function that should be used when parsing a list of results for ingestion
         into the list being built.
+    :param list_func: The function that should be used to combine the results of picking from each
+        item in a list.
     :param iter_func: The function that should be used to parse a list of results during iteration
         over the ``output_map``.
     :param final_func: The function which should be called to finalize the result at the end of
         retrieving all possible data.
+    :param pick_types: The functions to switch to when ``output_map`` changes pick type, by name.
+        Defaults to ``_PICK_TYPE_NAMES``.
+    :param profile: The :class:`PickProfile` to record into, if any.
     :return:
     """
-    static_builder = {}
-    output_map, worker, builder, fail, new_mode = _pick_setup(output_map, _input)
-    if fail or len(builder):
-        return builder
+    if pick_types is None:
+        pick_types = _PICK_TYPE_NAMES
 
-    elif new_mode is not None:
-        start_func, list_func, iter_func, final_func = new_mode
+    stack = []
+    funcs = (start_func, list_func, iter_func, final_func)
+    path = ()
+    while True:
+        if profile is None:
+            output_map, worker, result, fail, new_mode = _pick_setup(output_map, _input)
 
-    __pick = lambda o_map, w: _pick(o_map, w, start_func, list_func, iter_func, final_func)  # noqa
+        else:
+            started = perf_counter()
+            output_map, worker, result, fail, new_mode = profile._setup(output_map, _input, path)
 
-    if isinstance(worker, list):
-        for item in worker:
-            list_func(__pick(output_map, item), builder, static_builder)
+        if fail or len(result):
+            # The result was decided during setup.
+            frame = None
 
-    else:
-        output_map_iter = iter(output_map.items())
-        *instruction, return_now = _find_and_follow_first_path_in_pick(
-            output_map_iter, worker, builder, static_builder)
-        if return_now:
-            return builder
+        elif profile is None:
+            frame = _PickFrame(output_map, worker,
+                               funcs if new_mode is None else pick_types[new_mode])
 
-        elif instruction[0] is not None:
-            # If instructions were given by _find_and_follow_first_path_in_pick, then we need to
-            # recursively call this function with the results.
-            start_func(__pick(*instruction), builder, static_builder)
+        else:
+            frame = _ProfiledPickFrame(output_map, worker,
+                                       funcs if new_mode is None else pick_types[new_mode],
+                                       path, started)
+
+        # Keep passing finished results back to the frames waiting on them until one of them needs
+        # something nested to be picked from.
+        while frame is None or (nested := frame.advance()) is None:
+            if frame is not None:
+                result = frame.builder
+                if profile is not None:
+                    profile._finish(frame)
+
+            if not len(stack):
+                return result
+
+            frame = stack.pop()
+            frame.receive(result)
+
+        stack.append(frame)
+        output_map, _input = nested
+        funcs = frame.funcs
+        if profile is not None:
+            path = frame.child_path
+
+
+class _ProfiledPickFrame(_PickFrame):
+    """A :class:`_PickFrame` which keeps track of where it is in the ``output_map``."""
+    __slots__ = ('path', 'child_path', 'started')
+
+    def __init__(self, output_map: OutputMapType, worker: Any, funcs: tuple, path: tuple,
+                 started: float):
+        super().__init__(output_map, worker, funcs)
+        self.path = path
+        self.started = started
+        if self.stage == _PICK_LIST:
+            self.child_path = path + ('[]',)
 
-        pick_iter = _pick_iter(output_map_iter, worker, builder, static_builder, iter_func)
+        else:
+            self.paths = self._follow(self.paths)
 
-        for *instruction, return_now in pick_iter:
-            if instruction[0] is not None:
-                # If instructions were given by pick_iter, then we need to recursively call this
-                # function and pass the results back to pick_iter.
-                pick_iter.send(__pick(*instruction))
+    def _follow(self, paths: Iterator[tuple]) -> Iterator[tuple]:
+        for path, instruction in paths:
+            self.child_path = self.path + (path,)
+            yield path, instruction
 
-        final_func(builder, static_builder)
 
-    return builder
+_pick_profile: Optional['PickProfile'] = None
 
 
-@converts_enums
-def parse_type_as(_type: PickInstruction, data: Any, args: list) -> Union[dict, list]:
-    switch = {
-        PickInstruction.JSON: lambda x: json.loads(x),
-        PickInstruction.JSONL: jsonl_to_json,
-        PickInstruction.JSON_SINGLE_QUOTE: wonky_json_to_json,
-        PickInstruction.XML: xml_to_json,
-        PickInstruction.XMLSA: lambda x: xml_to_json(x, True),
-        PickInstruction.ELIST: lambda x: x if isinstance(x, list) else [x],
-        PickInstruction.CSV: csv_to_json,
-        PickInstruction.LIST: lambda x: x.split(','),
-        PickInstruction.YAML: yaml.safe_load,
-        PickInstruction.FORM: parse_qs,
-    }
-
-    arg_switch = {
-        PickInstruction.TUPLE_DICT: _parse_and_execute_tuplish,
-    }
-
-    if _type in switch:
-        return switch[_type](data)
-
-    elif _type in arg_switch:
-        return arg_switch[_type](data, args)
+class PickProfile:
+    """
+    Records where the time goes in :func:`pick`, :func:`pick_columns` and picks made by
+    :func:`compile_pick`, while it is in use as a context manager:
 
-    raise ValueError('Invalid type specified.')
+    .. code-block:: python
 
+        with PickProfile() as profile:
+            pick(output_map, data)
 
-def _parse_and_execute_tuplish(data: Union[dict, list], args: list) -> dict:
-    if len(args):
-        args = args[0]
-        if isinstance(args, dict):
-            return convert_tuplish_dict(data, args.get('pair_name'),
-                                        args.get('key_name'), args.get('val_name'))
+        print(profile.report())
 
-        else:
-            raise ValueError('TUPLE_DICT given an invalid argument format.')
+    For each path into the ``output_map`` it records how many times something was picked from there,
+    the time spent doing so (including everything nested under it) and the rows produced. For each
+    path and ``PickInstruction`` it records how many times something was parsed, the time spent
+    parsing, the bytes (or characters) parsed and how many parses failed. Paths are tuples of keys,
+    where ``'[]'`` stands for the items of a list.
 
-    else:
-        return convert_tuplish_dict(data)
+    Picks made in other processes, such as by :func:`pick_many` with process pools, aren't recorded.
+    When no profile is in use, picking costs one check per call.
+    """
+    def __init__(self):
+        # path: [calls, seconds, rows]
+        self.paths: Dict[tuple, list] = {}
+        # (path, instruction): [calls, seconds, size, failures]
+        self.parses: Dict[Tuple[tuple, str], list] = {}
+        self._previous = None
+
+    def __enter__(self) -> 'PickProfile':
+        global _pick_profile
+        self._previous = _pick_profile
+        _pick_profile = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _pick_profile
+        _pick_profile = self._previous
+        self._previous = None
+
+    def _setup(self, output_map: OutputMapType, _input: Any, path: tuple) -> tuple:
+        started = perf_counter()
+        ans = _pick_setup(output_map, _input)
+        if isinstance(output_map, list) \
+                and (ans[3] or (ans[4] is None and ans[0] is not output_map)):
+            # Something was parsed (or at least, parsing was attempted).
+            instruction = output_map[0]
+            key = (path, instruction.value if isinstance(instruction, PickInstruction)
+                   else instruction)
+            if (stats := self.parses.get(key)) is None:
+                self.parses[key] = stats = [0, 0., 0, 0]
+
+            stats[0] += 1
+            stats[1] += perf_counter() - started
+            if isinstance(_input, (str, bytes)):
+                stats[2] += len(_input)
+
+            if ans[3]:
+                stats[3] += 1
+
+        return ans
+
+    def _finish(self, frame: _ProfiledPickFrame):
+        if (stats := self.paths.get(frame.path)) is None:
+            self.paths[frame.path] = stats = [0, 0., 0]
+
+        stats[0] += 1
+        stats[1] += perf_counter() - frame.started
+        stats[2] += len(frame.builder)
+
+    def clear(self):
+        """Forgets everything recorded so far."""
+        self.paths.clear()
+        self.parses.clear()
+
+    def as_dict(self) -> dict:
+        """
+        :return: Everything recorded, as a ``dict`` with the keys ``'paths'`` and ``'parses'``, each
+            holding a ``list`` of ``dict`` items, slowest first.
+        """
+        paths = [{'path': list(path), 'calls': calls, 'seconds': seconds, 'rows': rows}
+                 for path, (calls, seconds, rows) in self.paths.items()]
+        parses = [{'path': list(path), 'instruction': instruction, 'calls': calls,
+                   'seconds': seconds, 'size': size, 'failures': failures}
+                  for (path, instruction), (calls, seconds, size, failures) in self.parses.items()]
+        paths.sort(key=lambda p: p['seconds'], reverse=True)
+        parses.sort(key=lambda p: p['seconds'], reverse=True)
+        return {'paths': paths, 'parses': parses}
+
+    def to_json(self, **kwargs) -> str:
+        """
+        :param kwargs: Passed on to ``json.dumps``.
+        :return: :meth:`as_dict` as JSON.
+        """
+        return json.dumps(self.as_dict(), **kwargs)
 
+    def report(self) -> str:
+        """:return: Everything recorded, as plain-text tables, slowest first."""
+        data = self.as_dict()
+        lines = _format_table(('path', 'calls', 'seconds', 'rows'),
+                              [(_format_pick_path(p['path']), p['calls'], f'{p["seconds"]:.6f}',
+                                p['rows']) for p in data['paths']])
+        if len(data['parses']):
+            lines.append('')
+            lines.extend(_format_table(
+                ('path', 'instruction', 'calls', 'seconds', 'size', 'failures'),
+                [(_format_pick_path(p['path']), p['instruction'], p['calls'],
+                  f'{p["seconds"]:.6f}', p['size'], p['failures']) for p in data['parses']]))
 
-def fracture(
-        data: List[dict],
-        *keys: str,
-        inplace: bool = True
-) -> Generator[Tuple[dict, List[dict]], None, None]:
+        return '\n'.join(lines)
+
+
+def _format_pick_path(path: list) -> str:
+    return ' > '.join(str(key) for key in path) if len(path) else '<root>'
+
+
+def _format_table(headers: tuple, rows: List[tuple]) -> List[str]:
+    widths = [max([len(str(header))] + [len(str(row[i])) for row in rows])
+              for i, header in enumerate(headers)]
+    lines = ['  '.join(str(header).ljust(width) for header, width in zip(headers, widths)),
+             '  '.join('-' * width for width in widths)]
+    lines.extend('  '.join(str(value).ljust(width) for value, width in zip(row, widths)).rstrip()
+                 for row in rows)
+    return lines
+
+
+def iter_pick(
+        output_map: OutputMapType,
+        _input: Any,
+        list_handling_method: PickType = PickType.COMBINATORIAL
+) -> Generator[dict, None, None]:
     """
-    Separates a list of dictionaries into sets based on the values of a subset of keys and returns
-    each set one at a time.
+    Works like :func:`pick`, but yields the resulting rows one at a time instead of building the
+    whole list. For ``COMBINATORIAL``, ``TANDEM`` and ``REDUCE``, rows are combined only as they are
+    yielded, so memory use stays proportional to the size of the input rather than to the number of
+    combinations. ``ACCUMULATE`` always produces a single row, so it is simply built and yielded.
 
-    :param data: The list to fracture.
-    :type data: List[dict]
-    :param keys: The subset of keys which should be used to differentiate between items in ``data``.
-    :type keys: str
-    :param inplace: Whether values returned should literally be the original values from the list or
-        should be copies of those values, set to ``False`` if you wish to avoid mutating the
-        original values in ``data``.
-    :type inplace: bool
-    :return: A ``Generator`` which iterates through each subset of ``data`` one at a time, basing
-        the subsets off of ``keys``.
+    The rows yielded are the same, and in the same order, as those :func:`pick` would return.
+
+    :param output_map: The map which describes how incoming data should be parsed. See
+        :func:`pick`.
+    :param _input: The incoming data.
+    :param list_handling_method: How lists should be handled while picking. See :func:`pick`.
+    :return: A generator yielding each resulting row.
     """
-    # Choose the function we use to append values based on inplace.
-    # Choose it early since checking inplace inside the loop adds up on time.
-    if inplace:
-        def app_func(builder: List[dict], val: dict):
-            return builder.append(val)
+    parts = _pick(output_map, _input, *_LAZY_PICK_TYPE_DEFS[list_handling_method],
+                  pick_types=_LAZY_PICK_TYPE_NAMES)
+    yield from _LazyRows(parts)
 
-    else:
-        def app_func(builder: List[dict], val: dict):
-            return builder.append(deepcopy(val))
 
-    # Then just generate.
-    for subset in _iter_fracture(data, keys, app_func):
-        yield subset
+class _LazyRows:
+    """
+    Rows which are only built as they are iterated over, made up of plain ``dict`` rows and other
+    lazy rows, one after another. Every iteration produces new ``dict`` objects, so whoever iterates
+    is free to change them. ``empty`` is worked out up front so that checking it never requires
+    building a row.
+    """
+    __slots__ = ('parts', 'empty')
 
+    def __init__(self, parts: list):
+        self.parts = parts
+        self.empty = all(not isinstance(part, dict) and part.empty for part in parts)
 
-def _iter_fracture(
-        data: List[dict],
-        keys: Tuple[str, ...],
-        app_func: Callable[[List[dict], dict], None]
-) -> Generator[Tuple[dict, List[dict]], None, None]:
-    # The following two objects will be used to reduce repetitive calculations.
-    calc = [None] * len(data)
-    done = [False] * len(data)
-    source = iter(enumerate(data))
-    try:
-        i, val = next(source)
+    def __iter__(self) -> Iterator[dict]:
+        for part in self.parts:
+            if isinstance(part, dict):
+                yield part.copy()
 
-    except StopIteration:
-        return
+            else:
+                yield from part
 
-    builder = []
-    def1 = get_subset_values(val, *keys) if calc[i] is None else calc[i]
-    mark = get_subset(val, *keys)
-    app_func(builder, val)
-    for j, _val in enumerate(data[i + 1:]):
-        j += i + 1
-        calc[j] = def2 = get_subset_values(_val, *keys)
-        if def1 == def2:
-            app_func(builder, _val)
-            done[j] = True
 
-    yield mark, builder
+class _LazyProduct:
+    """The lazy equivalent of :func:`_com_iter_func`, producing rows in the same order."""
+    __slots__ = ('left', 'right', 'empty')
 
-    while True:
-        try:
-            i, val = next(source)
+    def __init__(self, left: _LazyRows, right: _LazyRows):
+        self.left = left
+        self.right = right
+        self.empty = left.empty
 
-        except StopIteration:
-            return
+    def __iter__(self) -> Iterator[dict]:
+        # Every row gets combined with the first of the new rows in place...
+        first = next(iter(self.right))
+        for row in self.left:
+            row.update(first)
+            yield row
 
-        if not done[i]:
-            builder = []
-            def1 = calc[i]
-            mark = get_subset(val, *keys)
-            app_func(builder, val)
-            for j, _val in enumerate(data[i + 1:]):
-                j += i + 1
-                if def1 == calc[j]:
-                    app_func(builder, _val)
-                    done[j] = True
+        # ...then every row gets a copy for each of the rest, row by row.
+        for row in self.left:
+            rest = iter(self.right)
+            next(rest)
+            for other in rest:
+                combined = row.copy()
+                combined.update(other)
+                yield combined
 
-            yield mark, builder
 
+class _LazyZip:
+    """The lazy equivalent of :func:`_tan_iter_func`."""
+    __slots__ = ('left', 'right', 'empty')
 
-# --------------------------------------------------------------------------------------------------
-# Aggregation
-# --------------------------------------------------------------------------------------------------
-_AA = 'ALWAYS_AGG'
-_SA = 'SIMPLE_AGG'
-_SC = 'SIMPLE_CHECK'
-_CLC = 'COMPLEX_LIST_CHECK'
-_CDC = 'COMPLEX_DICT_CHECK'
-AGG_DEF_TYPES = (_SA, _SC, _CLC, _CDC)
+    def __init__(self, left: _LazyRows, right: _LazyRows):
+        self.left = left
+        self.right = right
+        self.empty = left.empty and right.empty
 
+    def __iter__(self) -> Iterator[dict]:
+        for row, other in zip_longest(self.left, self.right):
+            if row is None:
+                yield other
 
-class AggDef(CarrierEnum):
-    """
-    A :class:`funk_py.modularity.decoration.enums.CarrierEnum` used to represent aggregation
-    definitions.
+            else:
+                if other is not None:
+                    row.update(other)
 
-    Members:
-    ^^^^^^^^^^^^^
-    **True Aggregation Definitions:**
+                yield row
 
-    The true aggregation definitions are definitions that strictly do real aggregation. They do not
-    decide winners or losers in comparisons. If desired, may be put in a list also containing a
-    dictionary of other keys mapped to check definitions (as defined in the next section) to set
-    requirements for an item's value to actually be aggregated at the target key. it is important to
-    note that if the conditions specified in such a dictionary disallow aggregating, but the item
-    itself isn't completely ruled out, the current status of the aggregation will replace the value,
-    and will not consider the new value.
 
-    - ``SUM``: Sum the values at keys of these types.
-    - ``AVG``: Average the values at keys of these types.
-    - ``MAX``: Replace the value with the max of the key in the new item vs the old value.
-    - ``MIN``: Replace the value with the min of the key in the new item vs the old value.
-    - ``LAST``: Keep the last value encountered for a key.
+class _LazyFinal:
+    """The lazy equivalent of :func:`_com_tan_final_func`, for a non-empty ``static_builder``."""
+    __slots__ = ('rows', 'static_builder', 'empty')
 
-    Each true aggregation definition has a corresponding *always* version. The *always* version of a
-    true aggregation definition will be evaluated whether the checks pass or not. These *always*
-    definitions are: ``SUM_ALWAYS``, ``AVG_ALWAYS``, ``MAX_ALWAYS``, ``MIN_ALWAYS``, and
-    ``LAST_ALWAYS``.
+    def __init__(self, rows: _LazyRows, static_builder: dict):
+        self.rows = rows
+        self.static_builder = static_builder
+        self.empty = False
 
-    **Check Definitions:**
+    def __iter__(self) -> Iterator[dict]:
+        if self.rows.empty:
+            yield self.static_builder.copy()
+            return
 
-    The check definitions are definitions that decide whether values are actually aggregated. When
-    used in a dictionary in a list with one of the true aggregation definitions, will only affect
-    the behavior of that true aggregation definition; however, when they are used at the surface
-    level in an overall aggregation definition, they determine whether an item will even be
-    considered for aggregation at all.
+        for row in self.rows:
+            row.update(self.static_builder)
+            yield row
 
-    - ``GREATER``: Requires the related key to have a corresponding value greater than the current
-      stored value in the aggregation. Will allow the first item to be added automatically, since
-      there will be nothing to compare to.
-    - ``LESSER``: Requires the related key to have a corresponding value less than the current
-      stored value in the aggregation. Will allow the first item to be added automatically, since
-      there will be nothing to compare to.
-    - ``EXISTS``: Requires the related key to actually exist and have a non-``None`` value. Items
-      will be ignored until an item meeting the criteria is encountered, and the rule will still
-      apply to items after that.
-    - ``NOT_EXISTS``: Requires the related key to not exist or to have a value of ``None``. Items
-      will be ignored until an item meeting the criteria is encountered, and the rule will still
-      apply to items after that.
-    - ``ONE_OF``: Requires the related key to have a corresponding value *found* within a specified
-      list of items in order to pass. Items will be ignored until an item meeting the criteria is
-      encountered, and the rule will still apply to items after that. This definition is special
-      insofar as it requires an argument representing a list of valid items.
-    - ``NOT_ONE_OF``: Requires the related key to have a corresponding value *not found* within a
-      specified list of items in order to pass. Items will be ignored until an item meeting the
-      criteria is encountered, and the rule will still apply to items after that. This definition
-      is special insofar as it requires an argument representing a list of valid items.
-    - ``GREATER_OF``: Requires the related key to have a corresponding value that when checked in a
-      specified mapping of items to integer values will have a value *higher* than the same check
-      for the previous value. If for some reason, the key's value is not in the provided map, the
-      item will be considered to lose. Will allow the first item to be added automatically, since
-      there will be nothing to compare to. This definition is special insofar as it requires an
-      argument representing a dictionary of items to integer values.
-      Example:
 
-          Given ``agg_def = GREATER_OF({'llama': 1, 'horse': 2, 'dog': 3})``:
+def _lazy_start_and_list_func(ans: list, builder: list, static_builder: dict) -> None:
+    builder.extend(ans)
 
-          - If the current stored value for the key is ``'horse'`` and the new value is ``'llama'``,
-            the new item will lose.
-          - If the current stored value for the key is ``'horse'`` and the new value is ``'horse'``
-            or ``'dog'``, the new item will win.
-
-    - ``LESSER_OF``: Requires the related key to have a corresponding value that when checked in a
-      specified mapping of items to integer values will have a value *lower* than the same check for
-      the previous value. If for some reason, the key's value is not in the provided map, the item
-      will be considered to lose. Will allow the first item to be added automatically, since there
-      will be nothing to compare to. This definition is special insofar as it requires an argument
-      representing a dictionary of items to integer values.
-      Example:
 
-          Given ``agg_def = GREATER_OF({'llama': 1, 'horse': 2, 'dog': 3})``:
+def _lazy_com_iter_func(ans: list, builder: list, static_builder: dict) -> None:
+    if not (right := _LazyRows(ans)).empty:
+        builder[:] = [_LazyProduct(_LazyRows(builder[:]), right)]
 
-          - If the current stored value for the key is ``'horse'`` and the new value is ``'horse'``
-            or ``'dog'``, the new item will lose.
-          - If the current stored value for the key is ``'horse'`` and the new value is ``'llama'``,
-            the new item will win.
 
-    """
-    # True Aggregation:
-    @ignore
-    @staticmethod
-    def _sum_func():
-        def sum_(value, other_value):
-            if other_value is None:
-                return value
+def _lazy_tan_iter_func(ans: list, builder: list, static_builder: dict) -> None:
+    if not (right := _LazyRows(ans)).empty:
+        builder[:] = [_LazyZip(_LazyRows(builder[:]), right)]
 
-            elif value is None:
-                return other_value
 
-            return value + other_value
+def _lazy_final_func(builder: list, static_builder: dict) -> None:
+    if len(static_builder):
+        builder[:] = [_LazyFinal(_LazyRows(builder[:]), static_builder)]
 
-        return sum_
 
-    SUM = special_member(type=_SA, eval=_sum_func, json='SUM')
-    SUM_ALWAYS = special_member(type=_AA, eval=_sum_func, json='SUM_ALWAYS')
+def _materializing(func: PickProcessFunc) -> PickProcessFunc:
+    """
+    Wraps one of the ``ACCUMULATE`` functions so that it can be given lazy rows, since it needs to
+    look inside every row anyway.
+    """
+    def wrapper(ans: list, builder: list, static_builder: dict) -> None:
+        func(list(_LazyRows(ans)), builder, static_builder)
 
-    @ignore
-    @staticmethod
-    def _avg_func():
-        sum_ = 0
-        count = 0
+    return wrapper
 
-        def avg(value, other_value):
-            nonlocal sum_
-            nonlocal count
-            count += 1
-            if value is None:
-                return sum_ / count
 
-            sum_ += value
-            return sum_ / count
+_LAZY_PICK_TYPE_DEFS = {
+    PickType.COMBINATORIAL: (
+        _lazy_start_and_list_func,
+        _lazy_start_and_list_func,
+        _lazy_com_iter_func,
+        _lazy_final_func,
+    ),
+    PickType.TANDEM: (
+        _lazy_start_and_list_func,
+        _lazy_start_and_list_func,
+        _lazy_tan_iter_func,
+        _lazy_final_func,
+    ),
+    PickType.REDUCE: (
+        _lazy_start_and_list_func,
+        _lazy_tan_iter_func,
+        _lazy_com_iter_func,
+        _lazy_final_func,
+    ),
+    PickType.ACCUMULATE: (
+        _materializing(_acc_start_list_and_iter_func),
+        _materializing(_acc_start_list_and_iter_func),
+        _materializing(_acc_start_list_and_iter_func),
+        _acc_final_func,
+    ),
+}
+_LAZY_PICK_TYPE_NAMES = {t.value: _LAZY_PICK_TYPE_DEFS[t] for t in PickType}
 
-        return avg
 
-    AVG = special_member(type=_SA, eval=_avg_func, json='AVG')
-    AVG_ALWAYS = special_member(type=_AA, eval=_avg_func, json='AVG_ALWAYS')
+class CompiledPick:
+    """
+    An ``output_map`` which has been validated and flattened into an execution plan by
+    :func:`compile_pick`. Calling it with an input gives the same result as calling :func:`pick`
+    with the original ``output_map`` and ``list_handling_method``, but without interpreting the map
+    again each time.
+    """
+    def __init__(self, output_map: OutputMapType, list_handling_method: PickType):
+        self.output_map = output_map
+        self.list_handling_method = list_handling_method
+        self._call = _compile_pick_call(output_map, _PICK_TYPE_DEFS[list_handling_method])
 
-    @ignore
-    @staticmethod
-    def _max_func():
-        def max_(value, other_value):
-            if other_value is None:
-                return value
+    def __call__(self, _input: Any) -> list:
+        if _pick_profile is not None:
+            # The plan can't say where it is in the output_map, but pick can, and gives the same
+            # result.
+            return _pick(self.output_map, _input, *_PICK_TYPE_DEFS[self.list_handling_method],
+                         profile=_pick_profile)
 
-            elif value is None:
-                return other_value
+        return self._call(_input)
 
-            return max(value, other_value)
+    def __reduce__(self):
+        # The plan itself is made of closures, which can't be pickled, so rebuild it instead.
+        return CompiledPick, (self.output_map, self.list_handling_method)
 
-        return max_
 
-    MAX = special_member(type=_SA, eval=_max_func, json='MAX')
-    MAX_ALWAYS = special_member(type=_AA, eval=_max_func, json='MAX_ALWAYS')
+def compile_pick(
+        output_map: OutputMapType,
+        list_handling_method: PickType = PickType.COMBINATORIAL
+) -> CompiledPick:
+    """
+    Validates ``output_map`` and flattens it into a reusable execution plan. This is worthwhile when
+    the same ``output_map`` will be used to pick from many inputs.
+
+    :param output_map: The map which describes how incoming data should be parsed. See
+        :func:`pick`.
+    :param list_handling_method: How lists should be handled while picking. See :func:`pick`.
+    :return: A :class:`CompiledPick` which can be called with an input to pick from it.
+    :raises TypeError: If ``output_map`` contains something which cannot be used as an instruction.
+    :raises ValueError: If ``output_map`` contains an empty list or an unknown
+        :class:`PickInstruction`.
+    """
+    return CompiledPick(output_map, list_handling_method)
 
-    @ignore
-    @staticmethod
-    def _min_func():
-        def min_(value, other_value):
-            if other_value is None:
-                return value
 
-            elif value is None:
-                return other_value
+def pick_many(
+        output_map: OutputMapType,
+        inputs: Iterable[Any],
+        list_handling_method: PickType = PickType.COMBINATORIAL,
+        workers: int = None,
+        pool: PoolType = 'process',
+        chunk_size: int = 64
+) -> Generator[list, None, None]:
+    """
+    Picks from each of many inputs using the same ``output_map``. The map is only compiled once
+    (see :func:`compile_pick`), and results are yielded in the same order as ``inputs``.
+
+    :param output_map: The map which describes how incoming data should be parsed. See
+        :func:`pick`.
+    :param inputs: The inputs to pick from. These are consumed lazily, so they may come from a
+        generator.
+    :param list_handling_method: How lists should be handled while picking. See :func:`pick`.
+    :param workers: If specified, the number of workers to spread inputs across. When
+        ``output_map`` parses strings (JSON, XML, YAML, etc.) most of the work is CPU-bound, so a
+        process pool is needed for this to scale.
+    :param pool: The kind of pool to use for workers, either ``'process'`` or ``'thread'``. Inputs
+        and results must be picklable to use a process pool.
+    :param chunk_size: The number of inputs to send to a worker at once. Larger chunks mean less
+        communication between workers, but more results held in memory while waiting for them.
+    :return: A generator yielding the result of picking from each input.
+    """
+    if workers is None:
+        plan = compile_pick(output_map, list_handling_method)
+        for _input in inputs:
+            yield plan(_input)
 
-            return min(value, other_value)
+        return
 
-        return min_
+    executor, func = _make_pick_executor(output_map, list_handling_method, workers, pool,
+                                         chunk_size)
+    # Keep a couple of chunks queued for each worker so that they never sit idle, but don't read
+    # further ahead than that, so that memory use stays bounded for large inputs.
+    pending = deque()
+    source = iter(inputs)
+    with executor:
+        try:
+            while len(chunk := list(islice(source, chunk_size))):
+                pending.append(executor.submit(func, chunk))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
 
-    MIN = special_member(type=_SA, eval=_min_func, json='MIN')
-    MIN_ALWAYS = special_member(type=_AA, eval=_min_func, json='MIN_ALWAYS')
+            while len(pending):
+                yield from pending.popleft().result()
 
-    @ignore
-    @staticmethod
-    def _last_func():
-        def last(value, other_value):
-            return other_value if value is None else value
+        finally:
+            # If the caller stopped early, there's no need to finish the remaining chunks.
+            for future in pending:
+                future.cancel()
 
-        return last
 
-    LAST = special_member(type=_SA, eval=_min_func, json='LAST')
-    LAST_ALWAYS = special_member(type=_AA, eval=_last_func, json='LAST_ALWAYS')
+async def pick_many_async(
+        output_map: OutputMapType,
+        inputs: AsyncIterable[Any],
+        list_handling_method: PickType = PickType.COMBINATORIAL,
+        workers: int = 1,
+        pool: PoolType = 'thread',
+        chunk_size: int = 1
+) -> AsyncGenerator[list, None]:
+    """
+    Picks from each of many inputs arriving from an asynchronous source, such as pages fetched over
+    HTTP or messages read from a queue, using the same ``output_map``. Picking happens in a pool of
+    workers rather than in the event loop, so waiting for the next input and picking from the ones
+    already received overlap instead of taking turns. Results are yielded in the same order as
+    ``inputs``.
+
+    No more than two chunks per worker are waiting to be picked from at once. When that many are
+    waiting, no more inputs are read until the oldest is finished, so a fast source can't build up
+    an unbounded backlog.
+
+    Example:
+
+    .. code-block:: python
+
+        async def fetch_pages():
+            async with aiohttp.ClientSession() as session:
+                for url in urls:
+                    async with session.get(url) as response:
+                        yield await response.text()
+
+        async for rows in pick_many_async(['json', output_map], fetch_pages(), workers=4,
+                                          pool='process'):
+            ...
+
+    :param output_map: The map which describes how incoming data should be parsed. See
+        :func:`pick`.
+    :param inputs: The inputs to pick from.
+    :param list_handling_method: How lists should be handled while picking. See :func:`pick`.
+    :param workers: The number of workers to spread inputs across. See :func:`pick_many`.
+    :param pool: The kind of pool to use for workers, either ``'thread'`` or ``'process'``. A
+        thread is enough to keep the event loop free, but when ``output_map`` parses strings most of
+        the work is CPU-bound, so a process pool is needed to pick from several inputs at once.
+    :param chunk_size: The number of inputs to send to a worker at once. Inputs are held back until
+        a chunk is full (or ``inputs`` runs out), so larger chunks trade latency for less
+        communication between workers.
+    :return: An asynchronous generator yielding the result of picking from each input.
+    """
+    executor, func = _make_pick_executor(output_map, list_handling_method, workers, pool,
+                                         chunk_size)
+    loop = asyncio.get_running_loop()
+    pending = deque()
+    try:
+        chunk = []
+        async for _input in inputs:
+            chunk.append(_input)
+            if len(chunk) < chunk_size:
+                continue
 
-    # Checks (Simple):
-    @ignore
-    @staticmethod
-    def greater_func():
-        def gt(value, other_value):
-            if other_value is None:
-                return True
+            pending.append(loop.run_in_executor(executor, func, chunk))
+            chunk = []
+            if len(pending) >= workers * 2:
+                for result in await pending.popleft():
+                    yield result
 
-            elif value is None:
-                return False
+            # Pass on whatever is already finished, without waiting for anything else.
+            while len(pending) and pending[0].done():
+                for result in pending.popleft().result():
+                    yield result
 
-            return value >= other_value
+        if len(chunk):
+            pending.append(loop.run_in_executor(executor, func, chunk))
 
-        return gt
+        while len(pending):
+            for result in await pending.popleft():
+                yield result
 
-    GREATER = special_member(type=_SC, eval=greater_func, json='GREATER')
+    finally:
+        # If the caller stopped early, there's no need to finish the remaining chunks. Waiting for
+        # the workers to stop would block the event loop, so they're left to stop on their own.
+        for future in pending:
+            future.cancel()
 
-    @ignore
-    @staticmethod
-    def lesser_func():
-        def lt(value, other_value):
-            if other_value is None:
-                return True
+        executor.shutdown(wait=False)
 
-            elif value is None:
-                return False
 
-            return value <= other_value
+def _make_pick_executor(
+        output_map: OutputMapType,
+        list_handling_method: PickType,
+        workers: int,
+        pool: PoolType,
+        chunk_size: int
+) -> Tuple[Executor, Callable[[list], List[list]]]:
+    """
+    Starts the workers used by :func:`pick_many` and :func:`pick_many_async`.
 
-        return lt
+    :return: The executor, and the function that picks from a chunk of inputs in it.
+    """
+    if workers < 1:
+        raise ValueError('There must be at least one worker to pick with.')
 
-    LESSER = special_member(type=_SC, eval=lesser_func, json='LESSER')
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1.')
 
-    @ignore
-    @staticmethod
-    def exists_func():
-        return lambda value, other_value: value is not None
+    if pool == 'process':
+        executor = ProcessPoolExecutor(workers, initializer=_start_pick_worker,
+                                       initargs=(output_map, list_handling_method))
+        func = _pick_in_worker
 
-    EXISTS = special_member(type=_SC, eval=exists_func, json='EXISTS')
+    elif pool == 'thread':
+        executor = ThreadPoolExecutor(workers)
+        plan = compile_pick(output_map, list_handling_method)
+        func = lambda chunk: [plan(_input) for _input in chunk]  # noqa
 
-    @ignore
-    @staticmethod
-    def not_exists_func():
-        return lambda value, other_value: value is None
+    else:
+        raise ValueError(f'Invalid pool type specified. ({pool!r})')
 
-    NOT_EXISTS = special_member(type=_SC, eval=not_exists_func, json='NOT_EXISTS')
+    return executor, func
 
-    @staticmethod
-    def ONE_OF(items: Union[list, set]):
-        """
-        Requires the related key to have a corresponding value *found* within a specified list of
-        items in order to pass. Items will be ignored until an item meeting the criteria is
-        encountered, and the rule will still apply to items after that. This definition is special
-        insofar as it requires an argument representing a list of valid items.
 
-        This can be represented in a JSON form by ``['ONE_OF', {key1: int, key2: int, ...}]``.
+# The plan used by worker processes when picking in parallel. It is compiled once when each worker
+# starts, so that it doesn't need to be sent along with every chunk.
+_worker_pick: Optional[CompiledPick] = None
 
-        :param items: The items to compare against.
-        """
-        _items = set(items)
-        return {
-            'type': _CLC,
-            'eval': lambda: lambda value, other_value: value in _items,
-            'json': ['ONE_OF', list(items)]
-        }
 
-    @staticmethod
-    def NOT_ONE_OF(items: Union[list, set]):
-        """
-        Requires the related key to have a corresponding value *not found* within a specified list
-        of items in order to pass. Items will be ignored until an item meeting the criteria is
-        encountered, and the rule will still apply to items after that. This definition is special
-        insofar as it requires an argument representing a list of valid items.
+def _start_pick_worker(output_map: OutputMapType, list_handling_method: PickType):
+    global _worker_pick
+    _worker_pick = compile_pick(output_map, list_handling_method)
 
-        This can be represented in a JSON form by ``['NOT_ONE_OF', {key1: int, key2: int, ...}]``.
 
-        :param items: The items to compare against.
-        """
-        _items = set(items)
-        return {
-            'type': _CLC,
-            'eval': lambda: lambda value, other_value: value not in _items,
-            'json': ['NOT_ONE_OF', list(items)]
-        }
+def _pick_in_worker(chunk: list) -> List[list]:
+    return [_worker_pick(_input) for _input in chunk]
 
-    @staticmethod
-    def GREATER_OF(mapping: Dict[Any, int]):
-        """
-        Requires the related key to have a corresponding value that when checked in a specified
-        mapping of items to integer values will have a value *higher* than the same check for the
-        previous value. If for some reason, the key's value is not in the provided map, the item
-        will be considered to lose. Will allow the first item to be added automatically, since there
-        will be nothing to compare to. This definition is special insofar as it requires an argument
-        representing a dictionary of items to integer values.
 
-        This can be represented in a JSON form by ``['GREATER_OF', {key1: int, key2: int, ...}]``.
+_PICK_INSTRUCTION_VALUES = {m.value: m for m in PickInstruction}
 
-        :param mapping: The mapping to use for evaluating values.
-        """
-        _min = min(mapping.values()) - 1
 
-        def eval(value, other_value) -> bool:
-            if other_value is None:
-                return True
+def _compile_pick_call(output_map: OutputMapType, funcs: tuple) -> Callable[[Any], list]:
+    """
+    Compiles ``output_map`` into a function which gives the same result as
+    ``_pick(output_map, _input, *funcs)``.
+    """
+    if isinstance(output_map, str):
+        return lambda _input: [{output_map: _input}]
 
-            # Maybe the user mapped None, so give it a shot.
-            return mapping.get(value, _min) >= mapping.get(other_value, _min)
+    elif isinstance(output_map, list):
+        return _compile_pick_instruction(output_map, funcs)
 
-        return {'type': _CDC, 'eval': lambda: eval, 'json': ['GREATER_OF', mapping]}
+    elif isinstance(output_map, Mapping):
+        return _compile_pick_body(output_map, funcs)
 
-    @staticmethod
-    def LESSER_OF(mapping: Dict[Any, int]):
-        """
-        Requires the related key to have a corresponding value that when checked in a specified
-        mapping of items to integer values will have a value *lower* than the same check for the
-        previous value. If for some reason, the key's value is not in the provided map, the item
-        will be considered to lose. Will allow the first item to be added automatically, since there
-        will be nothing to compare to. This definition is special insofar as it requires an argument
-        representing a dictionary of items to integer values.
+    raise TypeError(f'output_map contains an invalid instruction. ({output_map!r})')
 
-        This can be represented in a JSON form by ``['LESSER_OF', {key1: int, key2: int, ...}]``.
 
-        :param mapping: The mapping to use for evaluating values.
-        :return:
-        """
-        _max = max(mapping.values()) + 1
+def _compile_pick_instruction(output_map: list, funcs: tuple) -> Callable[[Any], list]:
+    if not len(output_map):
+        raise ValueError('output_map contains an empty list.')
 
-        def eval(value, other_value) -> bool:
-            if other_value is None:
-                return True
+    head = output_map[0]
+    args = output_map[1:-1]
+    if head in _PICK_TYPE_NAMES:
+        instruction = None
+        next_funcs = _PICK_TYPE_NAMES[head]
 
-            # Maybe the user mapped None, so give it a shot.
-            return mapping.get(value, _max) <= mapping.get(other_value, _max)
+    else:
+        instruction = head if isinstance(head, PickInstruction) \
+            else _PICK_INSTRUCTION_VALUES.get(head)
+        if instruction not in _PARSERS and instruction not in _ARG_PARSERS:
+            raise ValueError(f'output_map contains an invalid instruction type. ({head!r})')
+
+        next_funcs = funcs
+
+    # Whatever follows the instruction is only passed to _pick_setup again if it is used on the
+    # items of a list.
+    next_call = _compile_pick_call(output_map[-1], next_funcs)
+    body = _compile_pick_body(output_map[-1], next_funcs, next_call)
+    list_func = funcs[1]
+    iterates_lists = head != 'e-list'
+
+    def call(_input: Any) -> list:
+        if iterates_lists and isinstance(_input, list):
+            builder = []
+            static_builder = {}
+            for item in _input:
+                list_func(call(item), builder, static_builder)
 
-        return {'type': _CDC, 'eval': lambda: eval, 'json': ['LESSER_OF', mapping]}
+            return builder
 
+        if instruction is None:
+            return body(_input)
 
-SimpAggDef = Literal['SUM', 'AVG', 'MAX', 'MIN', 'LAST']
-AlwaysAggDef = Literal['SUM_ALWAYS', 'AVG_ALWAYS', 'MAX_ALWAYS', 'MIN_ALWAYS', 'LAST_ALWAYS']
-SimpAggCheckDef = Literal['SUM', 'AVG', 'MAX', 'MIN', 'GREATER', 'LESSER', 'EXISTS', 'NOT_EXISTS']
-SimpCheckDef = Literal['GREATER', 'LESSER', 'EXISTS', 'NOT_EXISTS']
-CompCheckDef = Union[List[Union[Literal['ONE_OF', 'NOT_ONE_OF'], List[Any]]],
-                     List[Union[Literal['GREATER_OF', 'LESSER_OF'], Dict[Hashable, int]]]]
-CheckDef = Union[SimpCheckDef, CompCheckDef]
-CompAggDef = List[Union[SimpAggDef, Dict[Hashable, CheckDef]]]
-CompAlwaysAggDef = List[Union[AlwaysAggDef, Dict[Hashable, CheckDef]]]
+        try:
+            worker = _parse_type_as(instruction, _input, args, output_map[-1])
 
-PlainAggDef = Dict[Hashable, Union[SimpAggCheckDef, CompAggDef, CompAlwaysAggDef, CheckDef]]
-TrueAggDef = Dict[Any, Union[AggDef, List[Union[AggDef, Dict[Any, AggDef]]]]]
+        except Exception as e:
+            main_logger.warning(f'User\'s expected parsing method failed. Exception raised: {e}')
+            return []
 
+        return body(worker)
 
-AGG_DEF_MAP = {
-    'SUM': AggDef.SUM,
-    'AVG': AggDef.AVG,
-    'MAX': AggDef.MAX,
-    'MIN': AggDef.MIN,
-    'LAST': AggDef.LAST,
-    'SUM_ALWAYS': AggDef.SUM_ALWAYS,
-    'AVG_ALWAYS': AggDef.AVG_ALWAYS,
-    'MAX_ALWAYS': AggDef.MAX_ALWAYS,
-    'MIN_ALWAYS': AggDef.MIN_ALWAYS,
-    'LAST_ALWAYS': AggDef.LAST_ALWAYS,
-    'GREATER': AggDef.GREATER,
-    'LESSER': AggDef.LESSER,
-    'EXISTS': AggDef.EXISTS,
-    'NOT_EXISTS': AggDef.NOT_EXISTS,
-    'ONE_OF': AggDef.ONE_OF,
-    'NOT_ONE_OF': AggDef.NOT_ONE_OF,
-    'GREATER_OF': AggDef.GREATER_OF,
-    'LESSER_OF': AggDef.LESSER_OF,
-}
-SIMPLE_AGG_DEFS = {'SUM', 'AVG', 'MAX', 'MIN', 'LAST'}
-ALWAYS_AGG_DEFS = {'SUM_ALWAYS', 'AVG_ALWAYS', 'MAX_ALWAYS', 'MIN_ALWAYS', 'LAST_ALWAYS'}
-SIMPLE_CHECKS = {'GREATER', 'LESSER', 'EXISTS', 'NOT_EXISTS'}
-COMPLEX_DICT_CHECKS = {'GREATER_OF', 'LESSER_OF'}
-COMPLEX_LIST_CHECKS = {'ONE_OF', 'NOT_ONE_OF'}
+    return call
+
+
+def _compile_pick_body(
+        output_map: OutputMapType,
+        funcs: tuple,
+        call: Callable[[Any], list] = None
+) -> Callable[[Any], list]:
+    """
+    Compiles the part of :func:`_pick` which follows :func:`_pick_setup`. ``call`` is used on the
+    items of lists, and defaults to the body itself.
+    """
+    start_func, list_func, iter_func, final_func = funcs
+    if isinstance(output_map, Mapping):
+        first_paths = tuple(
+            (path, instruction, None) if isinstance(instruction, str)
+            else (path, None, _compile_pick_call(instruction, funcs))
+            for path, instruction in output_map.items()
+        )
+
+    else:
+        first_paths = None
+
+    def body(worker: Any) -> list:
+        builder = []
+        static_builder = {}
+        if isinstance(worker, list):
+            for item in worker:
+                list_func(call(item), builder, static_builder)
+
+            return builder
+
+        if first_paths is None:
+            # _pick would fail the same way when trying to follow a path.
+            raise AttributeError(f'\'{type(output_map).__name__}\' object has no attribute '
+                                 f'\'items\'')
+
+        if not len(first_paths):
+            return builder
+
+        if not isinstance(worker, dict):
+            main_logger.warning(f'An unexpected value was encountered in pick attempt. a path has '
+                                f'now been skipped. value = {worker}')
+            main_logger.warning(f'Cannot follow a path in a non-dict. ({worker})')
+            final_func(builder, static_builder)
+            return builder
+
+        # Follow the first path present, which starts the builder.
+        for i, (path, key, child) in enumerate(first_paths):
+            if path in worker:
+                if key is not None:
+                    static_builder[key] = worker[path]
+                    builder.append({})
+
+                else:
+                    start_func(child(worker[path]), builder, static_builder)
+
+                break
+
+        else:
+            return builder
+
+        if type(worker) is dict:
+            for path, key, child in first_paths[i + 1:]:
+                if path in worker:
+                    if key is not None:
+                        static_builder[key] = worker[path]
+
+                    else:
+                        result = child(worker[path])
+                        try:
+                            iter_func(result, builder, static_builder)
+
+                        except Exception as e:
+                            main_logger.warning(f'There was an error when attempting to process a '
+                                                f'result. Exception raised: {e}')
+
+        else:
+            main_logger.warning(f'Cannot follow a path in a non-dict. ({worker})')
+
+        final_func(builder, static_builder)
+        return builder
+
+    if call is None:
+        call = body
+
+    return body
+
+
+def _parse_and_execute_tuplish(data: Union[dict, list], args: list) -> dict:
+    if len(args):
+        args = args[0]
+        if isinstance(args, dict):
+            return convert_tuplish_dict(data, args.get('pair_name'),
+                                        args.get('key_name'), args.get('val_name'))
+
+        else:
+            raise ValueError('TUPLE_DICT given an invalid argument format.')
+
+    else:
+        return convert_tuplish_dict(data)
+
+
+def _parse_xml_sans_attributes(data: str) -> Union[dict, list]:
+    return xml_to_json(data, True)
+
+
+def _parse_elist(data: Any) -> list:
+    return data if isinstance(data, list) else [data]
+
+
+def _parse_list(data: str) -> list:
+    return data.split(',')
+
+
+# The parsers for each instruction are only looked up, never rebuilt, while picking.
+_PARSERS = {
+    PickInstruction.JSON: parse_json,
+    PickInstruction.JSONL: jsonl_to_json,
+    PickInstruction.JSON_SINGLE_QUOTE: wonky_json_to_json,
+    PickInstruction.XML: xml_to_json,
+    PickInstruction.XMLSA: _parse_xml_sans_attributes,
+    PickInstruction.ELIST: _parse_elist,
+    PickInstruction.CSV: csv_to_json,
+    PickInstruction.LIST: _parse_list,
+    PickInstruction.YAML: yaml_to_json,
+    PickInstruction.FORM: parse_qs,
+}
+_ARG_PARSERS = {
+    PickInstruction.TUPLE_DICT: _parse_and_execute_tuplish,
+}
+# Instructions which are worth caching the results of. The rest are cheaper to run than to look up.
+_CACHEABLE_PARSE_TYPES = {
+    PickInstruction.JSON, PickInstruction.JSONL, PickInstruction.JSON_SINGLE_QUOTE,
+    PickInstruction.XML, PickInstruction.XMLSA, PickInstruction.CSV, PickInstruction.YAML,
+    PickInstruction.FORM,
+}
+# Instructions whose results may hold the same object in more than one place (YAML anchors and
+# aliases). marshal would turn those into separate copies, so these are copied with deepcopy.
+_SHARING_PARSE_TYPES = {PickInstruction.YAML}
+
+
+class ParseCache:
+    """
+    A bounded, least-recently-used cache for the results of parsing strings with
+    :func:`parse_type_as`. Useful when the same embedded JSON, XML, YAML, etc. turns up again and
+    again in many inputs. Enable it with :func:`enable_parse_cache`.
+
+    Results are cached against the instruction and the string itself. Since whoever receives a
+    result may change it, every lookup returns a fresh copy. Where possible, results are stored
+    with :mod:`marshal`, which is much faster to load than :func:`copy.deepcopy` is to copy. YAML
+    results are always copied with :func:`copy.deepcopy` instead, since :mod:`marshal` would split
+    objects shared through anchors and aliases into separate copies.
+
+    :param max_size: The most results to hold at once.
+    """
+    def __init__(self, max_size: int = 1024):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1.')
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def clear(self):
+        """Forgets every cached result and resets the counters."""
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def parse(self, _type: PickInstruction, data: Union[str, bytes],
+              parser: Callable[[Any], Any]) -> Any:
+        """
+        Retrieves the result of parsing ``data`` as ``_type``, using ``parser`` if it hasn't been
+        parsed yet.
+        """
+        key = (_type, data)
+        with self._lock:
+            if (stored := self._results.get(key)) is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+
+            else:
+                self.misses += 1
+
+        if stored is not None:
+            marshalled, result = stored
+            return marshal.loads(result) if marshalled else deepcopy(result)
+
+        result = parser(data)
+        if _type in _SHARING_PARSE_TYPES:
+            stored = (False, deepcopy(result))
+
+        else:
+            try:
+                stored = (True, marshal.dumps(result))
+
+            except ValueError:
+                # Something in the result can't be marshalled.
+                stored = (False, deepcopy(result))
+
+        with self._lock:
+            self._results[key] = stored
+            if len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+        return result
+
+
+_parse_cache: Optional[ParseCache] = None
+
+
+def enable_parse_cache(max_size: int = 1024) -> ParseCache:
+    """
+    Starts caching the results of parsing strings with :func:`parse_type_as` (and so with
+    :func:`pick` and everything built on it).
+
+    :param max_size: The most results to hold at once.
+    :return: The :class:`ParseCache` now in use, so that its ``hits`` and ``misses`` can be checked.
+    """
+    global _parse_cache
+    _parse_cache = ParseCache(max_size)
+    return _parse_cache
+
+
+def disable_parse_cache():
+    """Stops caching the results of parsing strings, and drops any results already cached."""
+    global _parse_cache
+    _parse_cache = None
+
+
+def get_parse_cache() -> Optional[ParseCache]:
+    """:return: The :class:`ParseCache` in use, or ``None`` if caching is disabled."""
+    return _parse_cache
+
+
+def _parse_xml_projected(data: str, projection: Projection) -> dict:
+    return xml_to_json(data, False, projection)
+
+
+def _parse_xml_sans_attributes_projected(data: str, projection: Projection) -> dict:
+    return xml_to_json(data, True, projection)
+
+
+# Strings at least this long are parsed with a projection of the output_map they are picked with, or
+# never if None.
+_projection_min_size: Optional[int] = None
+_PROJECTED_PARSERS = {
+    PickInstruction.JSON: parse_json,
+    PickInstruction.XML: _parse_xml_projected,
+    PickInstruction.XMLSA: _parse_xml_sans_attributes_projected,
+}
+
+
+def enable_projected_parsing(min_size: int = 64 * 1024):
+    """
+    Starts parsing large JSON and XML strings met by :func:`pick` (and everything built on it) with
+    only the keys that the ``output_map`` asks for. Everything else is dropped as soon as it has
+    been read, so memory follows the size of what is picked rather than the size of the input.
+    Results are the same either way.
+
+    This pays off when little of a large input is picked. Picking a few keys from each of many small
+    objects can be slower than parsing in full, since those keys are found in Python. Projected
+    parses are never cached, since what they hold depends on the ``output_map``.
+
+    :param min_size: The shortest string worth projecting. Shorter strings are parsed in full, which
+        is faster when there is little to skip.
+    """
+    if min_size < 0:
+        raise ValueError('min_size cannot be negative.')
+
+    global _projection_min_size
+    _projection_min_size = min_size
+
+
+def disable_projected_parsing():
+    """Stops parsing strings with projections of the ``output_map``. This is the default."""
+    global _projection_min_size
+    _projection_min_size = None
+
+
+def _pick_projection(output_map: OutputMapType) -> Projection:
+    """
+    Works out which parts of some data ``output_map`` could pick from, for
+    :func:`funk_py.sorting.converters.parse_json` and
+    :func:`funk_py.sorting.converters.xml_to_json`.
+
+    :param output_map: The map that will be picked from the data.
+    :return: The projection, or ``None`` if all of the data could be needed.
+    """
+    if isinstance(output_map, Mapping):
+        return {path: _pick_projection(instruction) for path, instruction in output_map.items()}
+
+    if isinstance(output_map, list) and len(output_map) \
+            and (output_map[0] in _PICK_TYPE_NAMES or output_map[0] == 'e-list'):
+        # Neither changing pick type nor expecting a list changes which keys are followed.
+        return _pick_projection(output_map[-1])
+
+    # Anything else is either kept as-is or parsed again, so all of it is needed.
+    return None
+
+
+@converts_enums
+def parse_type_as(_type: PickInstruction, data: Any, args: list,
+                  output_map: OutputMapType = None) -> Union[dict, list]:
+    return _parse_type_as(_type, data, args, output_map)
+
+
+def _parse_type_as(_type: PickInstruction, data: Any, args: list,
+                   output_map: OutputMapType = None) -> Union[dict, list]:
+    if (parser := _PARSERS.get(_type)) is not None:
+        if (_projection_min_size is not None and output_map is not None
+                and _type in _PROJECTED_PARSERS and isinstance(data, (str, bytes))
+                and len(data) >= _projection_min_size):
+            return _PROJECTED_PARSERS[_type](data, _pick_projection(output_map))
+
+        if (_parse_cache is not None and _type in _CACHEABLE_PARSE_TYPES
+                and isinstance(data, (str, bytes))):
+            return _parse_cache.parse(_type, data, parser)
+
+        return parser(data)
+
+    elif (parser := _ARG_PARSERS.get(_type)) is not None:
+        return parser(data, args)
+
+    raise ValueError('Invalid type specified.')
+
+
+def fracture(
+        data: Iterable[dict],
+        *keys: str,
+        inplace: bool = True,
+        ordered: bool = True,
+        presorted: bool = False,
+        max_idle: int = None,
+        max_rows: int = None,
+        spill_rows: int = None,
+        spill_partitions: int = 16,
+        spill_format: SpillFormat = 'pickle',
+        spill_dir: str = None
+) -> Generator[Tuple[dict, List[dict]], None, None]:
+    """
+    Separates a list of dictionaries into sets based on the values of a subset of keys and returns
+    each set one at a time. Items are bucketed by the values at ``keys`` in a single pass, so the
+    time taken grows linearly with the length of ``data``.
+
+    By default, no set is returned until all of ``data`` has been consumed. If ``data`` is an
+    unbounded iterator, or simply too large to hold in memory, ``presorted``, ``max_idle`` or
+    ``max_rows`` can be used to decide when a set is closed so that it can be returned right away.
+    Any sets which are still open once ``data`` is exhausted will be returned at the end. Should an
+    item arrive for a set that was already closed, it will begin a new set with the same values.
+
+    If the number of distinct sets is too large to hold in memory at all, ``spill_rows`` can be
+    used to move items out to temporary files once more than that many items are held. Items are
+    hash-partitioned across ``spill_partitions`` files, and then each file is read back and split
+    into sets one at a time. Since sets come back one partition at a time, ``ordered`` must be
+    ``False`` to spill. Items read back from disk are always copies of the originals.
+
+    :param data: The list (or any other iterable) to fracture.
+    :type data: Iterable[dict]
+    :param keys: The subset of keys which should be used to differentiate between items in ``data``.
+    :type keys: str
+    :param inplace: Whether values returned should literally be the original values from the list or
+        should be copies of those values, set to ``False`` if you wish to avoid mutating the
+        original values in ``data``.
+    :type inplace: bool
+    :param ordered: Whether subsets must be returned in the order their first item was encountered
+        in ``data``. If ``False``, subsets may be returned in whatever order is cheapest to produce,
+        and once all of ``data`` has been consumed, each subset is let go of as soon as it has been
+        returned rather than being held until every subset has been.
+    :type ordered: bool
+    :param presorted: Whether ``data`` is already sorted (or at least grouped) by ``keys``. If
+        ``True``, a set is closed as soon as an item with different values is encountered, so only
+        one set is ever held at a time.
+    :type presorted: bool
+    :param max_idle: If specified, a set is closed once this many items have been encountered
+        without any of them belonging to it.
+    :type max_idle: int
+    :param max_rows: If specified, the maximum number of items that may be held across all open
+        sets. When it is exceeded, the sets which have gone the longest without receiving an item
+        are closed until the limit is met again.
+    :type max_rows: int
+    :param spill_rows: If specified, the number of items which may be held in memory before items
+        are written out to temporary files.
+    :type spill_rows: int
+    :param spill_partitions: The number of temporary files items should be hash-partitioned into
+        when spilling. Each partition should be small enough to fit in memory.
+    :type spill_partitions: int
+    :param spill_format: The format to use for the temporary files. ``'pickle'`` handles any
+        picklable items, ``'marshal'`` is more compact and faster but only handles built-in types,
+        and ``'jsonl'`` only handles JSON-compatible items with string keys.
+    :type spill_format: SpillFormat
+    :param spill_dir: The directory temporary files should be created in. Defaults to the system's
+        temporary directory.
+    :type spill_dir: str
+    :return: A ``Generator`` which iterates through each subset of ``data`` one at a time, basing
+        the subsets off of ``keys``.
+    """
+    # Choose the function we use to append values based on inplace.
+    # Choose it early since checking inplace inside the loop adds up on time.
+    if inplace:
+        def app_func(builder: List[dict], val: dict):
+            return builder.append(val)
+
+    else:
+        def app_func(builder: List[dict], val: dict):
+            return builder.append(deepcopy(val))
+
+    # Then just generate.
+    if spill_rows is not None:
+        if ordered:
+            raise ValueError('Subsets cannot be returned in order when spilling to disk. Specify '
+                             'ordered=False to spill.')
+
+        subsets = ((mark, builder) for _, mark, builder in _iter_partitioned_groups(
+            data, keys, app_func, spill_rows, spill_partitions, spill_format, spill_dir))
+
+    elif presorted:
+        subsets = _iter_sorted_fracture(data, keys, app_func)
+
+    elif max_idle is not None or max_rows is not None:
+        if max_idle is not None and max_idle < 1:
+            raise ValueError('max_idle must be at least 1.')
+
+        subsets = _iter_bounded_fracture(data, keys, app_func, max_idle, max_rows)
+
+    else:
+        subsets = _iter_fracture(data, keys, app_func, ordered)
+
+    for subset in subsets:
+        yield subset
+
+
+_LIST_KEY = object()
+_DICT_KEY = object()
+
+
+def _canonicalize_key(value: Any) -> Hashable:
+    """
+    Converts a value which may contain unhashable members into a hashable value that compares equal
+    to the canonicalized form of any other value that would have been ``==`` to ``value``. Markers
+    are included for lists and dicts so that they cannot collide with tuples or frozensets holding
+    the same members. Sets become frozensets, which they are already ``==`` to.
+    """
+    if isinstance(value, tuple):
+        return tuple(_canonicalize_key(v) for v in value)
+
+    elif isinstance(value, list):
+        return _LIST_KEY, tuple(_canonicalize_key(v) for v in value)
+
+    elif isinstance(value, dict):
+        return _DICT_KEY, frozenset((k, _canonicalize_key(v)) for k, v in value.items())
+
+    elif isinstance(value, set):
+        return frozenset(value)
+
+    return value
+
+
+def _iter_fracture(
+        data: Iterable[dict],
+        keys: Tuple[str, ...],
+        app_func: Callable[[List[dict], dict], None],
+        ordered: bool = True
+) -> Generator[Tuple[dict, List[dict]], None, None]:
+    # dicts retain insertion order, so the buckets come back out in the order in which each subset
+    # was first encountered.
+    groups = {}
+    for val in data:
+        key = get_subset_values(val, *keys)
+        try:
+            group = groups.get(key)
+
+        except TypeError:
+            # Something inside of the identifying values can't be hashed. Rather than falling back
+            # to comparing items against one another, convert the values to an equivalent
+            # hashable form.
+            key = _canonicalize_key(key)
+            group = groups.get(key)
+
+        if group is None:
+            groups[key] = group = (get_subset(val, *keys), [])
+
+        app_func(group[1], val)
+
+    if ordered:
+        for group in groups.values():
+            yield group
+
+    else:
+        # Popping from the end of a dict is cheap, and drops the buckets' only other reference as
+        # each one is handed over, so memory can be freed while the rest are still being used.
+        while len(groups):
+            yield groups.popitem()[1]
+
+
+def _get_fracture_key(val: dict, keys: Tuple[str, ...]) -> Hashable:
+    key = get_subset_values(val, *keys)
+    try:
+        hash(key)
+
+    except TypeError:
+        key = _canonicalize_key(key)
+
+    return key
+
+
+def _iter_sorted_fracture(
+        data: Iterable[dict],
+        keys: Tuple[str, ...],
+        app_func: Callable[[List[dict], dict], None]
+) -> Generator[Tuple[dict, List[dict]], None, None]:
+    # Since the data is grouped already, the only thing that needs to be remembered is the set
+    # currently being built. Values are compared directly, so there is no need to hash them.
+    source = iter(data)
+    try:
+        val = next(source)
+
+    except StopIteration:
+        return
+
+    current = get_subset_values(val, *keys)
+    builder = []
+    mark = get_subset(val, *keys)
+    app_func(builder, val)
+    for val in source:
+        if (key := get_subset_values(val, *keys)) != current:
+            yield mark, builder
+            current = key
+            builder = []
+            mark = get_subset(val, *keys)
+
+        app_func(builder, val)
+
+    yield mark, builder
+
+
+def _iter_bounded_fracture(
+        data: Iterable[dict],
+        keys: Tuple[str, ...],
+        app_func: Callable[[List[dict], dict], None],
+        max_idle: Optional[int],
+        max_rows: Optional[int]
+) -> Generator[Tuple[dict, List[dict]], None, None]:
+    # Each open set is kept as [mark, builder, index of the last item added]. Sets are moved to the
+    # end of groups whenever they receive an item, so the set at the front of groups is always the
+    # one that has been idle the longest. That keeps deciding which sets to close cheap.
+    groups = OrderedDict()
+    held = 0
+    for i, val in enumerate(data):
+        key = _get_fracture_key(val, keys)
+        if (group := groups.get(key)) is None:
+            groups[key] = group = [get_subset(val, *keys), [], i]
+
+        else:
+            groups.move_to_end(key)
+            group[2] = i
+
+        app_func(group[1], val)
+        held += 1
+
+        if max_idle is not None:
+            while len(groups) and i - next(iter(groups.values()))[2] >= max_idle:
+                _, (mark, builder, _) = groups.popitem(last=False)
+                held -= len(builder)
+                yield mark, builder
+
+        if max_rows is not None:
+            while held > max_rows:
+                _, (mark, builder, _) = groups.popitem(last=False)
+                held -= len(builder)
+                yield mark, builder
+
+    for mark, builder, _ in groups.values():
+        yield mark, builder
+
+
+def _dump_jsonl(obj: Any, file):
+    file.write(json.dumps(obj).encode())
+    file.write(b'\n')
+
+
+def _load_jsonl(file) -> Generator[Any, None, None]:
+    for line in file:
+        yield json.loads(line)
+
+
+def _load_repeatedly(load: Callable) -> Callable:
+    def loader(file) -> Generator[Any, None, None]:
+        while True:
+            try:
+                yield load(file)
+
+            except EOFError:
+                return
+
+    return loader
+
+
+_SPILL_FORMATS = {
+    'pickle': (lambda obj, file: pickle.dump(obj, file, pickle.HIGHEST_PROTOCOL),
+               _load_repeatedly(pickle.load)),
+    'marshal': (marshal.dump, _load_repeatedly(marshal.load)),
+    'jsonl': (_dump_jsonl, _load_jsonl),
+}
+
+
+class _SpillPartitions:
+    """
+    A set of temporary run files that records are hash-partitioned across. The files (and the
+    directory holding them) are removed once the ``_SpillPartitions`` is closed.
+    """
+    def __init__(self, partitions: int, spill_format: SpillFormat = 'pickle',
+                 directory: str = None):
+        if spill_format not in _SPILL_FORMATS:
+            raise ValueError(f'Unknown spill format {spill_format!r}. Valid formats are '
+                             f'{list(_SPILL_FORMATS)}.')
+
+        if partitions < 1:
+            raise ValueError('There must be at least one partition to spill to.')
+
+        self._dump, self._load = _SPILL_FORMATS[spill_format]
+        self._dir = tempfile.TemporaryDirectory(dir=directory)
+        self._names = [os.path.join(self._dir.name, f'{i}.run') for i in range(partitions)]
+        self._files = [open(name, 'wb') for name in self._names]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __enter__(self) -> '_SpillPartitions':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(self, key: Hashable, record: Any):
+        self._dump(record, self._files[hash(key) % len(self._names)])
+
+    def read(self, partition: int) -> Generator[Any, None, None]:
+        """Finishes writing to, then reads back every record in a partition."""
+        if not (file := self._files[partition]).closed:
+            file.close()
+
+        with open(self._names[partition], 'rb') as file:
+            for record in self._load(file):
+                yield record
+
+    def close(self):
+        for file in self._files:
+            file.close()
+
+        self._dir.cleanup()
+
+
+def _iter_partitioned_groups(
+        data: Iterable[dict],
+        keys: Tuple[str, ...],
+        app_func: Callable[[List[dict], dict], None],
+        spill_rows: int,
+        partitions: int,
+        spill_format: SpillFormat,
+        spill_dir: Optional[str]
+) -> Generator[Tuple[int, dict, List[dict]], None, None]:
+    """
+    Groups items the same way as :func:`_iter_fracture`, but once more than ``spill_rows`` items
+    are held, every item is written out to a temporary partition instead. Yields the index of the
+    first item in each group along with the group so that callers can restore the original order
+    if they need to. Items read back from disk are not passed to ``app_func``, since they are
+    already copies.
+    """
+    # Each group is kept as (index of first item, mark, items, indexes of items).
+    groups = {}
+    source = enumerate(data)
+    for i, val in source:
+        key = _get_fracture_key(val, keys)
+        if (group := groups.get(key)) is None:
+            groups[key] = group = (i, get_subset(val, *keys), [], [])
+
+        app_func(group[2], val)
+        group[3].append(i)
+        if i >= spill_rows:
+            break
+
+    else:
+        # Everything fit, so there's no need to touch the disk.
+        for i, mark, builder, _ in groups.values():
+            yield i, mark, builder
+
+        return
+
+    with _SpillPartitions(partitions, spill_format, spill_dir) as spill:
+        # Every item is written with its original index so that the first item read back for each
+        # group still tells us where that group started.
+        for key, (_, _, builder, indexes) in groups.items():
+            for i, val in zip(indexes, builder):
+                spill.add(key, (i, val))
+
+        del groups
+
+        for i, val in source:
+            spill.add(_get_fracture_key(val, keys), (i, val))
+
+        for partition in range(len(spill)):
+            groups = {}
+            for i, val in spill.read(partition):
+                key = _get_fracture_key(val, keys)
+                if (group := groups.get(key)) is None:
+                    groups[key] = group = (i, get_subset(val, *keys), [])
+
+                group[2].append(val)
+
+            for group in groups.values():
+                yield group
+
+            del groups
+
+
+# --------------------------------------------------------------------------------------------------
+# Aggregation
+# --------------------------------------------------------------------------------------------------
+_AA = 'ALWAYS_AGG'
+_SA = 'SIMPLE_AGG'
+_SC = 'SIMPLE_CHECK'
+_CLC = 'COMPLEX_LIST_CHECK'
+_CDC = 'COMPLEX_DICT_CHECK'
+AGG_DEF_TYPES = (_SA, _SC, _CLC, _CDC)
+
+
+class AggDef(CarrierEnum):
+    """
+    A :class:`funk_py.modularity.decoration.enums.CarrierEnum` used to represent aggregation
+    definitions.
+
+    Members:
+    ^^^^^^^^^^^^^
+    **True Aggregation Definitions:**
+
+    The true aggregation definitions are definitions that strictly do real aggregation. They do not
+    decide winners or losers in comparisons. If desired, may be put in a list also containing a
+    dictionary of other keys mapped to check definitions (as defined in the next section) to set
+    requirements for an item's value to actually be aggregated at the target key. it is important to
+    note that if the conditions specified in such a dictionary disallow aggregating, but the item
+    itself isn't completely ruled out, the current status of the aggregation will replace the value,
+    and will not consider the new value.
+
+    - ``SUM``: Sum the values at keys of these types.
+    - ``AVG``: Average the values at keys of these types.
+    - ``MAX``: Replace the value with the max of the key in the new item vs the old value.
+    - ``MIN``: Replace the value with the min of the key in the new item vs the old value.
+    - ``LAST``: Keep the last value encountered for a key.
+
+    Each true aggregation definition has a corresponding *always* version. The *always* version of a
+    true aggregation definition will be evaluated whether the checks pass or not. These *always*
+    definitions are: ``SUM_ALWAYS``, ``AVG_ALWAYS``, ``MAX_ALWAYS``, ``MIN_ALWAYS``, and
+    ``LAST_ALWAYS``.
+
+    **Check Definitions:**
+
+    The check definitions are definitions that decide whether values are actually aggregated. When
+    used in a dictionary in a list with one of the true aggregation definitions, will only affect
+    the behavior of that true aggregation definition; however, when they are used at the surface
+    level in an overall aggregation definition, they determine whether an item will even be
+    considered for aggregation at all.
+
+    - ``GREATER``: Requires the related key to have a corresponding value greater than the current
+      stored value in the aggregation. Will allow the first item to be added automatically, since
+      there will be nothing to compare to.
+    - ``LESSER``: Requires the related key to have a corresponding value less than the current
+      stored value in the aggregation. Will allow the first item to be added automatically, since
+      there will be nothing to compare to.
+    - ``EXISTS``: Requires the related key to actually exist and have a non-``None`` value. Items
+      will be ignored until an item meeting the criteria is encountered, and the rule will still
+      apply to items after that.
+    - ``NOT_EXISTS``: Requires the related key to not exist or to have a value of ``None``. Items
+      will be ignored until an item meeting the criteria is encountered, and the rule will still
+      apply to items after that.
+    - ``ONE_OF``: Requires the related key to have a corresponding value *found* within a specified
+      list of items in order to pass. Items will be ignored until an item meeting the criteria is
+      encountered, and the rule will still apply to items after that. This definition is special
+      insofar as it requires an argument representing a list of valid items.
+    - ``NOT_ONE_OF``: Requires the related key to have a corresponding value *not found* within a
+      specified list of items in order to pass. Items will be ignored until an item meeting the
+      criteria is encountered, and the rule will still apply to items after that. This definition
+      is special insofar as it requires an argument representing a list of valid items.
+    - ``GREATER_OF``: Requires the related key to have a corresponding value that when checked in a
+      specified mapping of items to integer values will have a value *higher* than the same check
+      for the previous value. If for some reason, the key's value is not in the provided map, the
+      item will be considered to lose. Will allow the first item to be added automatically, since
+      there will be nothing to compare to. This definition is special insofar as it requires an
+      argument representing a dictionary of items to integer values.
+      Example:
+
+          Given ``agg_def = GREATER_OF({'llama': 1, 'horse': 2, 'dog': 3})``:
+
+          - If the current stored value for the key is ``'horse'`` and the new value is ``'llama'``,
+            the new item will lose.
+          - If the current stored value for the key is ``'horse'`` and the new value is ``'horse'``
+            or ``'dog'``, the new item will win.
+
+    - ``LESSER_OF``: Requires the related key to have a corresponding value that when checked in a
+      specified mapping of items to integer values will have a value *lower* than the same check for
+      the previous value. If for some reason, the key's value is not in the provided map, the item
+      will be considered to lose. Will allow the first item to be added automatically, since there
+      will be nothing to compare to. This definition is special insofar as it requires an argument
+      representing a dictionary of items to integer values.
+      Example:
+
+          Given ``agg_def = GREATER_OF({'llama': 1, 'horse': 2, 'dog': 3})``:
+
+          - If the current stored value for the key is ``'horse'`` and the new value is ``'horse'``
+            or ``'dog'``, the new item will lose.
+          - If the current stored value for the key is ``'horse'`` and the new value is ``'llama'``,
+            the new item will win.
+
+    """
+    def __reduce__(self):
+        # The functions held by members can't be pickled, but every member can be rebuilt from its
+        # JSON form, which can.
+        return _agg_def_from_json, (self.json,)
+
+    # True Aggregation:
+    @ignore
+    @staticmethod
+    def _sum_func():
+        def sum_(value, other_value):
+            if other_value is None:
+                return value
+
+            elif value is None:
+                return other_value
+
+            return value + other_value
+
+        return sum_
+
+    SUM = special_member(type=_SA, eval=_sum_func, json='SUM')
+    SUM_ALWAYS = special_member(type=_AA, eval=_sum_func, json='SUM_ALWAYS')
+
+    @ignore
+    @staticmethod
+    def _avg_func():
+        sum_ = 0
+        count = 0
+
+        def avg(value, other_value):
+            nonlocal sum_
+            nonlocal count
+            count += 1
+            if value is None:
+                return sum_ / count
+
+            sum_ += value
+            return sum_ / count
+
+        return avg
+
+    AVG = special_member(type=_SA, eval=_avg_func, json='AVG')
+    AVG_ALWAYS = special_member(type=_AA, eval=_avg_func, json='AVG_ALWAYS')
+
+    @ignore
+    @staticmethod
+    def _max_func():
+        def max_(value, other_value):
+            if other_value is None:
+                return value
+
+            elif value is None:
+                return other_value
+
+            return max(value, other_value)
+
+        return max_
+
+    MAX = special_member(type=_SA, eval=_max_func, json='MAX')
+    MAX_ALWAYS = special_member(type=_AA, eval=_max_func, json='MAX_ALWAYS')
+
+    @ignore
+    @staticmethod
+    def _min_func():
+        def min_(value, other_value):
+            if other_value is None:
+                return value
+
+            elif value is None:
+                return other_value
+
+            return min(value, other_value)
+
+        return min_
+
+    MIN = special_member(type=_SA, eval=_min_func, json='MIN')
+    MIN_ALWAYS = special_member(type=_AA, eval=_min_func, json='MIN_ALWAYS')
+
+    @ignore
+    @staticmethod
+    def _last_func():
+        def last(value, other_value):
+            return other_value if value is None else value
+
+        return last
+
+    LAST = special_member(type=_SA, eval=_min_func, json='LAST')
+    LAST_ALWAYS = special_member(type=_AA, eval=_last_func, json='LAST_ALWAYS')
+
+    # Checks (Simple):
+    @ignore
+    @staticmethod
+    def greater_func():
+        def gt(value, other_value):
+            if other_value is None:
+                return True
+
+            elif value is None:
+                return False
+
+            return value >= other_value
+
+        return gt
+
+    GREATER = special_member(type=_SC, eval=greater_func, json='GREATER')
+
+    @ignore
+    @staticmethod
+    def lesser_func():
+        def lt(value, other_value):
+            if other_value is None:
+                return True
+
+            elif value is None:
+                return False
+
+            return value <= other_value
+
+        return lt
+
+    LESSER = special_member(type=_SC, eval=lesser_func, json='LESSER')
+
+    @ignore
+    @staticmethod
+    def exists_func():
+        return lambda value, other_value: value is not None
+
+    EXISTS = special_member(type=_SC, eval=exists_func, json='EXISTS')
+
+    @ignore
+    @staticmethod
+    def not_exists_func():
+        return lambda value, other_value: value is None
+
+    NOT_EXISTS = special_member(type=_SC, eval=not_exists_func, json='NOT_EXISTS')
+
+    @staticmethod
+    def ONE_OF(items: Union[list, set]):
+        """
+        Requires the related key to have a corresponding value *found* within a specified list of
+        items in order to pass. Items will be ignored until an item meeting the criteria is
+        encountered, and the rule will still apply to items after that. This definition is special
+        insofar as it requires an argument representing a list of valid items.
+
+        This can be represented in a JSON form by ``['ONE_OF', {key1: int, key2: int, ...}]``.
+
+        :param items: The items to compare against.
+        """
+        _items = set(items)
+        return {
+            'type': _CLC,
+            'eval': lambda: lambda value, other_value: value in _items,
+            'json': ['ONE_OF', list(items)]
+        }
+
+    @staticmethod
+    def NOT_ONE_OF(items: Union[list, set]):
+        """
+        Requires the related key to have a corresponding value *not found* within a specified list
+        of items in order to pass. Items will be ignored until an item meeting the criteria is
+        encountered, and the rule will still apply to items after that. This definition is special
+        insofar as it requires an argument representing a list of valid items.
+
+        This can be represented in a JSON form by ``['NOT_ONE_OF', {key1: int, key2: int, ...}]``.
+
+        :param items: The items to compare against.
+        """
+        _items = set(items)
+        return {
+            'type': _CLC,
+            'eval': lambda: lambda value, other_value: value not in _items,
+            'json': ['NOT_ONE_OF', list(items)]
+        }
+
+    @staticmethod
+    def GREATER_OF(mapping: Dict[Any, int]):
+        """
+        Requires the related key to have a corresponding value that when checked in a specified
+        mapping of items to integer values will have a value *higher* than the same check for the
+        previous value. If for some reason, the key's value is not in the provided map, the item
+        will be considered to lose. Will allow the first item to be added automatically, since there
+        will be nothing to compare to. This definition is special insofar as it requires an argument
+        representing a dictionary of items to integer values.
+
+        This can be represented in a JSON form by ``['GREATER_OF', {key1: int, key2: int, ...}]``.
+
+        :param mapping: The mapping to use for evaluating values.
+        """
+        _min = min(mapping.values()) - 1
+
+        def eval(value, other_value) -> bool:
+            if other_value is None:
+                return True
+
+            # Maybe the user mapped None, so give it a shot.
+            return mapping.get(value, _min) >= mapping.get(other_value, _min)
+
+        return {'type': _CDC, 'eval': lambda: eval, 'json': ['GREATER_OF', mapping]}
+
+    @staticmethod
+    def LESSER_OF(mapping: Dict[Any, int]):
+        """
+        Requires the related key to have a corresponding value that when checked in a specified
+        mapping of items to integer values will have a value *lower* than the same check for the
+        previous value. If for some reason, the key's value is not in the provided map, the item
+        will be considered to lose. Will allow the first item to be added automatically, since there
+        will be nothing to compare to. This definition is special insofar as it requires an argument
+        representing a dictionary of items to integer values.
+
+        This can be represented in a JSON form by ``['LESSER_OF', {key1: int, key2: int, ...}]``.
+
+        :param mapping: The mapping to use for evaluating values.
+        :return:
+        """
+        _max = max(mapping.values()) + 1
+
+        def eval(value, other_value) -> bool:
+            if other_value is None:
+                return True
+
+            # Maybe the user mapped None, so give it a shot.
+            return mapping.get(value, _max) <= mapping.get(other_value, _max)
+
+        return {'type': _CDC, 'eval': lambda: eval, 'json': ['LESSER_OF', mapping]}
+
+
+SimpAggDef = Literal['SUM', 'AVG', 'MAX', 'MIN', 'LAST']
+AlwaysAggDef = Literal['SUM_ALWAYS', 'AVG_ALWAYS', 'MAX_ALWAYS', 'MIN_ALWAYS', 'LAST_ALWAYS']
+SimpAggCheckDef = Literal['SUM', 'AVG', 'MAX', 'MIN', 'GREATER', 'LESSER', 'EXISTS', 'NOT_EXISTS']
+SimpCheckDef = Literal['GREATER', 'LESSER', 'EXISTS', 'NOT_EXISTS']
+CompCheckDef = Union[List[Union[Literal['ONE_OF', 'NOT_ONE_OF'], List[Any]]],
+                     List[Union[Literal['GREATER_OF', 'LESSER_OF'], Dict[Hashable, int]]]]
+CheckDef = Union[SimpCheckDef, CompCheckDef]
+CompAggDef = List[Union[SimpAggDef, Dict[Hashable, CheckDef]]]
+CompAlwaysAggDef = List[Union[AlwaysAggDef, Dict[Hashable, CheckDef]]]
+
+PlainAggDef = Dict[Hashable, Union[SimpAggCheckDef, CompAggDef, CompAlwaysAggDef, CheckDef]]
+TrueAggDef = Dict[Any, Union[AggDef, List[Union[AggDef, Dict[Any, AggDef]]]]]
+
+
+AGG_DEF_MAP = {
+    'SUM': AggDef.SUM,
+    'AVG': AggDef.AVG,
+    'MAX': AggDef.MAX,
+    'MIN': AggDef.MIN,
+    'LAST': AggDef.LAST,
+    'SUM_ALWAYS': AggDef.SUM_ALWAYS,
+    'AVG_ALWAYS': AggDef.AVG_ALWAYS,
+    'MAX_ALWAYS': AggDef.MAX_ALWAYS,
+    'MIN_ALWAYS': AggDef.MIN_ALWAYS,
+    'LAST_ALWAYS': AggDef.LAST_ALWAYS,
+    'GREATER': AggDef.GREATER,
+    'LESSER': AggDef.LESSER,
+    'EXISTS': AggDef.EXISTS,
+    'NOT_EXISTS': AggDef.NOT_EXISTS,
+    'ONE_OF': AggDef.ONE_OF,
+    'NOT_ONE_OF': AggDef.NOT_ONE_OF,
+    'GREATER_OF': AggDef.GREATER_OF,
+    'LESSER_OF': AggDef.LESSER_OF,
+}
+# Reductions that the vectorized backend can use in place of an aggregator, keyed by the factory
+# the aggregator is built from. LAST is built from the same factory as MIN, so it reduces the same
+# way MIN does.
+_VECTOR_REDUCERS = {
+    AggDef.SUM.eval: 'sum',
+    AggDef.AVG.eval: 'avg',
+    AggDef.MAX.eval: 'max',
+    AggDef.MIN.eval: 'min',
+}
+SIMPLE_AGG_DEFS = {'SUM', 'AVG', 'MAX', 'MIN', 'LAST'}
+ALWAYS_AGG_DEFS = {'SUM_ALWAYS', 'AVG_ALWAYS', 'MAX_ALWAYS', 'MIN_ALWAYS', 'LAST_ALWAYS'}
+SIMPLE_CHECKS = {'GREATER', 'LESSER', 'EXISTS', 'NOT_EXISTS'}
+COMPLEX_DICT_CHECKS = {'GREATER_OF', 'LESSER_OF'}
+COMPLEX_LIST_CHECKS = {'ONE_OF', 'NOT_ONE_OF'}
+
+
+def _agg_def_from_json(json_: Union[str, list]) -> AggDef:
+    if isinstance(json_, list):
+        return _convert_comp_check(json_)
+
+    return AGG_DEF_MAP[json_]
 
 
 def convert_to_agg_def_dict(agg_def: PlainAggDef) -> TrueAggDef:
     """
-    Converts a ``PlainAggDef`` item to a ``TrueAggDef``. This is useful if you want to store an
-    aggregation definition as JSON.
+    Converts a ``PlainAggDef`` item to a ``TrueAggDef``. This is useful if you want to store an
+    aggregation definition as JSON.
+    """
+    builder = {}
+    for key, val in agg_def.items():
+        if type(val) is str and val in SIMPLE_AGG_DEFS.union(SIMPLE_CHECKS).union(ALWAYS_AGG_DEFS):
+            builder[key] = AGG_DEF_MAP[val]
+
+        elif isinstance(val, list):
+            builder[key] = _convert_comp_agg_def_or_check(val)
+
+        else:
+            raise TypeError('The given PlainAggDef includes an unknown AggDef string.')
+
+    return builder
+
+
+def _convert_comp_agg_def_or_check(
+        agg_def: Union[CompAggDef, CompCheckDef]
+) -> List[Union[AggDef, Dict[Hashable, AggDef]]]:
+    if len(agg_def) != 2:
+        raise TypeError('The given PlainAggDef has an invalid list. It\'s too long or too short.')
+
+    if agg_def[0] in SIMPLE_AGG_DEFS.union(ALWAYS_AGG_DEFS):
+        return _convert_comp_agg_def(agg_def)
+
+    elif agg_def[0] in COMPLEX_LIST_CHECKS.union(COMPLEX_DICT_CHECKS):
+        return _convert_comp_check(agg_def)
+
+    raise TypeError('The given PlainAggDef has an invalid list. It does not start with a '
+                    'simple aggregator or with a complex checker.')
+
+
+def _convert_comp_agg_def(
+        agg_def: Union[CompAggDef, CompAlwaysAggDef]
+) -> List[Union[AggDef, Dict[Hashable, AggDef]]]:
+    builder = {}
+    if isinstance(agg_def[1], dict):
+        for key, val in agg_def[1].items():
+            builder[key] = _convert_check(val)
+
+    else:
+        raise TypeError('The given PlainAggDef includes at least one broken CompAggDef.')
+
+    return [AGG_DEF_MAP[agg_def[0]], builder]
+
+
+def _convert_check(check: CheckDef):
+    if isinstance(check, list):
+        if len(check) != 2:
+            raise TypeError('The given PlainAggDef has an invalid list in a CompAggDef. It\'s too '
+                            'long or too short.')
+
+        if check[0] not in COMPLEX_DICT_CHECKS.union(COMPLEX_LIST_CHECKS):
+            raise TypeError('The given PlainAggDef has an invalid list in a CompAggDef.')
+
+        return _convert_comp_check(check)
+
+    elif check in SIMPLE_CHECKS:
+        return AGG_DEF_MAP[check]
+
+    raise TypeError('The given PlainAggDef has an unrecognized type of check.')
+
+
+def _convert_comp_check(check: CompCheckDef):
+    if check[0] in COMPLEX_LIST_CHECKS:
+        if isinstance(check[1], list):
+            return _safe_hash_for_comp_check(check)
+
+        raise TypeError('The given PlainAggDef has an invalid complex list check.')
+
+    elif isinstance(check[1], dict):
+        return _safe_hash_for_comp_check(check)
+
+    raise TypeError('The given PlainAggDef has an invalid complex dict check.')
+
+
+def _safe_hash_for_comp_check(check: CompCheckDef):
+    try:
+        return AGG_DEF_MAP[check[0]](check[1])
+
+    except TypeError as e:
+        # If there is an unhashable item in the list or unhashable key in the dict, it will raise
+        # an error (due to the inner workings of the complex list checks or dicts). Catch this case
+        # and return a more useful error.
+        if e.message.startswith('unhashable type:'):
+            raise TypeError('The given PlainAggDef has an invalid complex list or dict check '
+                            'containing an unhashable type.')
+
+        # If it wasn't an error due to hashing, just re-raise the same error.
+        raise e
+
+
+def convert_from_agg_def_dict(agg_def: TrueAggDef) -> PlainAggDef:
+    builder = {}
+    for key, _agg_def in agg_def.items():
+        if isinstance(_agg_def, list):
+            builder[key] = _convert_from_comp_agg_def_dict(_agg_def)
+            continue
+
+        try:
+            builder[key] = _agg_def.json
+
+        except AttributeError:
+            raise TypeError('An AggDef in a TrueAggDef did not have a json attribute.')
+
+    return builder
+
+
+def _convert_from_comp_agg_def_dict(agg_def: CompAggDef):
+    builder = {}
+    if len(agg_def) != 2:
+        raise TypeError('A TrueAggDef shouldn\'t have a list of length greater than two.')
+
+    if type(agg_def[0]) is not AggDef:
+        raise TypeError('The provided TrueAggDef had a non-AggDef element where an AggDef '
+                        'should have been.')
+
+    elif agg_def[0].type not in (_SA, _AA):
+        raise TypeError('The provided TrueAggDef had a check as the first part of a complex '
+                        'aggregate definition.')
+
+    _agg_def, mapping = agg_def
+    for key, _agg_def in mapping.items():
+        if type(_agg_def) is not AggDef:
+            raise TypeError('The provided TrueAggDef had a non-AggDef element where an AggDef '
+                            'should have been.')
+
+        elif _agg_def.type not in (_CDC, _CLC, _SC):
+            raise TypeError('The provided TrueAggDef had an aggregator in a complex aggregate '
+                            'definition.')
+
+        try:
+            builder[key] = _agg_def.json
+            continue
+
+        except AttributeError:
+            raise TypeError('An AggDef in the provided TrueAggDef did not have a json attribute.')
+
+    try:
+        return [agg_def[0].json, builder]
+
+    except AttributeError:
+        raise TypeError('An AggDef in the provided TrueAggDef did not have a json attribute.')
+
+
+def _get_closure_values(func: Callable) -> tuple:
+    return tuple(cell.cell_contents for cell in func.__closure__)
+
+
+def _set_closure_values(func: Callable, values: Iterable):
+    for cell, value in zip(func.__closure__, values):
+        cell.cell_contents = value
+
+
+_NO_VALUE = object()
+
+
+class _AggregationDefinition:
+    invalid_error = TypeError('An invalid agg_def was provided.')
+
+    def __init__(self, agg_def: TrueAggDef = None):
+        self.simple_agg_defs = {}
+        self.complex_agg_defs = {}
+        self.check_defs = {}
+        self.mutating_keys = set()
+        # The factories for any aggregators that hold state of their own (such as AVG's running sum
+        # and count). These must be rebuilt for every subset, while everything else can be shared.
+        self._stateful_simple = {}
+        self._stateful_complex = {}
+        # The flattened plan actually followed for each item. See _compile.
+        self._check_plan = ()
+        self._complex_plan = ()
+        self._simple_plan = ()
+        self._mutating_plan = ()
+
+        if agg_def is not None:
+            if not isinstance(agg_def, dict):
+                raise self.invalid_error
+
+            for key, _agg_def in agg_def.items():
+                self._add(key, _agg_def)
+
+            self._compile()
+
+    def _exists(self, agg_def: AggDef) -> str:
+        if agg_def.type not in AGG_DEF_TYPES:
+            raise ValueError('agg_def has an unknown AggDef type in it. It cannot be processed.')
+
+        return agg_def.type
+
+    def add(self, key: Any, agg_def: Union[AggDef, List[Union[AggDef, Dict[Any, AggDef]]]]):
+        self._add(key, agg_def)
+        self._compile()
+
+    def _add(self, key: Any, agg_def: Union[AggDef, List[Union[AggDef, Dict[Any, AggDef]]]]):
+        # Adds agg_def without compiling, so that a whole definition only needs compiling once.
+        if type(agg_def) is AggDef:
+            ad = self._exists(agg_def)
+            if ad == _SA:
+                self.simple_agg_defs[key] = eval = agg_def.eval()
+                self.mutating_keys.add(key)
+                if eval.__closure__ is not None:
+                    self._stateful_simple[key] = agg_def.eval
+
+            else:
+                self.check_defs[key] = agg_def.eval()
+
+        elif isinstance(agg_def, list):
+            if (len(agg_def) != 2 or type(agg_def_ := agg_def[0]) is not AggDef
+                    or not isinstance(agg_def[1], dict)):
+                raise self.invalid_error
+
+            ad = self._exists(agg_def_)  # noqa: agg_def_ cannot be referenced before its
+                                         # assignment. An error would be raised before getting here
+                                         # if it wasn't assigned.
+            if ad != _SA:
+                raise self.invalid_error
+
+            # Rely on the builder's type_checking to verify whether the inner agg_def is okay.
+            builder = _AggregationDefinition()
+            for _key, _agg_def in agg_def[1].items():
+                builder._add_inner(_key, _agg_def)
+
+            builder._compile()
+            self.complex_agg_defs[key] = (eval := agg_def_.eval(), builder)
+            self.mutating_keys.add(key)
+            if eval.__closure__ is not None:
+                self._stateful_complex[key] = agg_def_.eval
+
+        else:
+            raise self.invalid_error
+
+    def _add_inner(self, key: Any, agg_def: AggDef):
+        if type(agg_def) is AggDef:
+            ad = self._exists(agg_def)
+            if ad == _SA:
+                raise self.invalid_error
+
+            else:
+                self.check_defs[key] = agg_def.eval()
+
+        else:
+            raise self.invalid_error
+
+    def _compile(self):
+        """
+        Flattens the definition into tuples of ``(key, eval)`` (and, for complex aggregators, the
+        checks that must pass first), so that processing an item doesn't need to look anything up
+        in the definition's dictionaries.
+        """
+        self._check_plan = tuple(self.check_defs.items())
+        self._complex_plan = tuple((key, eval, checker._check_plan)
+                                   for key, (eval, checker) in self.complex_agg_defs.items())
+        self._simple_plan = tuple(self.simple_agg_defs.items())
+        self._mutating_plan = tuple(self.mutating_keys)
+
+    def spawn(self) -> '_AggregationDefinition':
+        """
+        Creates an ``_AggregationDefinition`` which shares this one's setup, but which has its own
+        aggregation state. This allows one definition to be used for many subsets without having to
+        interpret ``agg_def`` again for each of them.
+
+        :return: An ``_AggregationDefinition`` ready to process a new subset. If none of the
+            aggregators hold any state, this will simply be the same ``_AggregationDefinition``.
+        """
+        if not (len(self._stateful_simple) or len(self._stateful_complex)):
+            return self
+
+        clone = _AggregationDefinition()
+        clone.check_defs = self.check_defs
+        clone.mutating_keys = self.mutating_keys
+        clone._stateful_simple = self._stateful_simple
+        clone._stateful_complex = self._stateful_complex
+        clone.simple_agg_defs = self.simple_agg_defs.copy()
+        for key, factory in self._stateful_simple.items():
+            clone.simple_agg_defs[key] = factory()
+
+        clone.complex_agg_defs = self.complex_agg_defs.copy()
+        for key, factory in self._stateful_complex.items():
+            clone.complex_agg_defs[key] = (factory(), self.complex_agg_defs[key][1])
+
+        clone._compile()
+        return clone
+
+    def get_state(self) -> Dict[str, Dict[Any, tuple]]:
+        """
+        Retrieves the values held by any aggregators which carry state of their own, such as
+        ``AVG``'s running sum and count.
+
+        :return: A ``dict`` which can be passed to :meth:`set_state` on an
+            ``_AggregationDefinition`` spawned from the same definition to restore the state.
+        """
+        return {
+            'simple': {key: _get_closure_values(self.simple_agg_defs[key])
+                       for key in self._stateful_simple},
+            'complex': {key: _get_closure_values(self.complex_agg_defs[key][0])
+                        for key in self._stateful_complex},
+        }
+
+    def set_state(self, state: Dict[str, Dict[Any, Iterable]]):
+        """
+        Restores the values held by any aggregators which carry state of their own.
+
+        :param state: A ``dict`` generated by :meth:`get_state`.
+        """
+        for key, values in state.get('simple', {}).items():
+            _set_closure_values(self.simple_agg_defs[key], values)
+
+        for key, values in state.get('complex', {}).items():
+            _set_closure_values(self.complex_agg_defs[key][0], values)
+
+    def _eval_item(self, item: dict, current: dict) -> bool:
+        for key, eval in self._check_plan:
+            if not eval(item.get(key), current.get(key)):
+                return False
+
+        return True
+
+    def process_items(self, items: List[dict]):
+        """
+        Processes a list of items based on the ``_AggregationDefinition``'s setup.
+
+        :param items: The item list to process.
+        :return: The resulting dictionary.
+        """
+        current = None
+        for item in items:
+            current = self._process_item(item, current)
+
+        return current
+
+    def _process_item(self, item: dict, current: dict = None) -> dict:
+        """
+        Processes an item based on the ``_AggregationDefinition``'s setup.
+
+        :param item: The item to process.
+        :param current: The current builder. If ``None``, an empty dictionary will be generated.
+        :return: The resulting current dictionary.
+        """
+        if current is None:
+            current = {}
+
+        for key, eval in self._check_plan:
+            if not eval(item.get(key), current.get(key)):
+                return current
+
+        for key, eval, checks in self._complex_plan:
+            for check_key, check in checks:
+                if not check(item.get(check_key), current.get(check_key)):
+                    break
+
+            else:
+                current[key] = eval(item.get(key), current.get(key))
+
+        for key, eval in self._simple_plan:
+            current[key] = eval(item.get(key), current.get(key))
+
+        # Copy over everything in item that isn't being aggregated. Item is copied wholesale, and
+        # then any aggregated values it overwrote are put back. Along the way, work out how many
+        # keys current should have, so that keys left over from previous items only need to be
+        # searched for if there are any.
+        expected = len(item)
+        overwritten = []
+        for key in self._mutating_plan:
+            if key in current:
+                if key in item:
+                    overwritten.append((key, current[key]))
+
+                else:
+                    expected += 1
+
+            elif key in item:
+                # This key hasn't been given a value yet, and mustn't be taken from item either.
+                overwritten.append((key, _NO_VALUE))
+
+        current.update(item)
+        for key, val in overwritten:
+            if val is _NO_VALUE:
+                del current[key]
+                expected -= 1
+
+            else:
+                current[key] = val
+
+        if len(current) != expected:
+            for key in current.keys() - item.keys() - self.mutating_keys:
+                del current[key]
+
+        return current
+
+
+BatchProviderFunc = Callable[[Ldct], Mapping[tuple, Union[dict, Ldct, None]]]
+
+
+class BatchProvider:
+    """
+    Wraps a function which provides other data for many subsets at once, so that it can be used as
+    ``other_data`` in :func:`aggregate` or :meth:`Aggregator.results`. This allows lookups (such as
+    database queries) to be made once for many subsets rather than once for each.
+
+    The wrapped function will be given a list of the ids of subsets, each in the same form a
+    per-subset provider would be given (for instance ``{'name': value1, 'time': value2}`` if
+    ``identifiers`` is ``['name', 'time']``). It should return a mapping from a tuple of each id's
+    values (in the order of ``identifiers``) to either a single dictionary, a list of dictionaries,
+    or ``None``, exactly like a per-subset provider's return value. Ids missing from the mapping
+    are treated as having no other data.
+
+    The function may also be an ``async`` function. In that case, batches are sent off to an event
+    loop in a background thread as soon as they fill up, so lookups run while aggregation is still
+    in progress and several batches can be awaited at once.
+
+    Example:
+
+    .. code-block:: python
+
+        def lookup(ids):
+            rows = db.fetch_totals([id_['name'] for id_ in ids])
+            return {(row['name'],): row for row in rows}
+
+        result = aggregate(data, ['name'], agg_def, BatchProvider(lookup, batch_size=500))
+
+    :param func: The function to provide other data with.
+    :param batch_size: The maximum number of ids to give ``func`` at once. If ``None``, every id
+        will be given to it at once.
     """
-    builder = {}
-    for key, val in agg_def.items():
-        if type(val) is str and val in SIMPLE_AGG_DEFS.union(SIMPLE_CHECKS).union(ALWAYS_AGG_DEFS):
-            builder[key] = AGG_DEF_MAP[val]
+    def __init__(self, func: BatchProviderFunc, batch_size: int = None):
+        if batch_size is not None and batch_size < 1:
+            raise ValueError('batch_size must be at least 1.')
+
+        self.func = func
+        self.batch_size = batch_size
+        self.is_async = inspect.iscoroutinefunction(func)
+
+    def _start(self, identifiers: Tuple[str, ...]) -> '_BatchLookup':
+        return _BatchLookup(self, identifiers)
+
+
+class _BatchLookup:
+    """Collects the ids of subsets as they are found and sends them to a :class:`BatchProvider`."""
+    def __init__(self, provider: BatchProvider, identifiers: Tuple[str, ...]):
+        self._provider = provider
+        self._identifiers = identifiers
+        self._pending = []
+        self._batches = []
+        self._loop = None
+        self._thread = None
+
+    def add(self, id_: dict):
+        self._pending.append(id_)
+        if (t := self._provider.batch_size) is not None and len(self._pending) >= t:
+            self._dispatch()
+
+    def _dispatch(self):
+        batch = self._pending
+        self._pending = []
+        if not self._provider.is_async:
+            self._batches.append((batch, None))
+            return
 
-        elif isinstance(val, list):
-            builder[key] = _convert_comp_agg_def_or_check(val)
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+            self._thread.start()
+
+        self._batches.append(
+            (batch, asyncio.run_coroutine_threadsafe(self._provider.func(batch), self._loop)))
+
+    def results(self) -> List[Ldct]:
+        """
+        Waits for every lookup to finish.
+
+        :return: The other data for each id, in the order the ids were added.
+        """
+        if len(self._pending):
+            self._dispatch()
+
+        builder = []
+        try:
+            for batch, future in self._batches:
+                mapping = self._provider.func(batch) if future is None else future.result()
+                for id_ in batch:
+                    try:
+                        ans = mapping.get(get_subset_values(id_, *self._identifiers))
+
+                    except TypeError:
+                        # An id with unhashable values can't be in the mapping.
+                        ans = None
+
+                    builder.append(_normalize_other_data(ans))
+
+        finally:
+            self.close()
+
+        return builder
+
+    def close(self):
+        """
+        Cancels any lookups which are still running and stops the event loop running them. This is
+        called by :meth:`results`, but must also be called if :meth:`results` never will be, such
+        as when aggregation fails partway through. Calling it more than once does nothing.
+        """
+        if self._loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(_cancel_tasks(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = self._thread = None
+
+
+async def _cancel_tasks():
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+DataSourceOrProvider = Union[dict, Iterable[dict], Callable[[dict], Union[dict, Ldct, None]],
+                             BatchProvider]
+
+
+def aggregate(
+        data: Ldct,
+        identifiers: Ls,
+        agg_def: TrueAggDef,
+        other_data: DataSourceOrProvider = None,
+        *,
+        spill_rows: int = None,
+        spill_partitions: int = 16,
+        spill_format: SpillFormat = 'pickle',
+        spill_dir: str = None,
+        vectorize: bool = False,
+        workers: int = None,
+        chunk_size: int = None
+) -> List[dict]:
+    """
+    Aggregate values in data based on the provided unique identifiers and aggregation definition.
+    Items are folded into the result for their subset in a single pass. They are never copied or
+    mutated, so values which are not aggregated may be the same objects found in ``data``.
+
+    :param data: Dictionaries to aggregate.
+    :param identifiers: Unique identifiers that data should be aggregated across.
+    :param agg_def: The definition for aggregation.
+    :param other_data: Either another set of data to evaluate against or a provider of other items
+        to compare to. Can be useful when needing to compare against items in a database. If an
+        iterable of dictionaries is provided, those dictionaries will be appended to each subset of
+        dictionaries for evaluation. If a function is provided, it should accept a dictionary
+        representing the id (unique fingerprint) of each subset. For instance, if ``identifiers`` is
+        ``['name', 'time']``, then the function should be built to expect a dictionary of the form
+        ``{'name': value1, 'time': value2}``. This function can return either a single dictionary,
+        which would be appended to the end of its corresponding subset before evaluation, or it may
+        return a list of dictionaries, which would be used to extend its corresponding subset before
+        evaluation. Returning ``None`` from this function would be treated as no extra results, and
+        the corresponding subset wouldn't have any extra items added for evaluation. To look up
+        other data for many subsets at once, wrap a function in a :class:`BatchProvider`.
+    :param spill_rows: If specified, the number of items which may be held in memory before items
+        are written out to temporary files and aggregated one partition at a time. See
+        :func:`fracture` for details on spilling.
+    :param spill_partitions: The number of temporary files to partition items into when spilling.
+    :param spill_format: The format to use for the temporary files when spilling.
+    :param spill_dir: The directory temporary files should be created in when spilling.
+    :param vectorize: Whether to attempt to aggregate whole columns at once using NumPy. This is
+        only possible when NumPy is installed, ``other_data`` and ``spill_rows`` are not specified,
+        ``agg_def`` is made up entirely of ``SUM``, ``AVG``, ``MAX``, ``MIN``, and ``LAST`` with no
+        checks, and the values being aggregated are all ``int``, ``float``, or ``None``. Whenever
+        this is not possible, items will be aggregated normally instead. Results are the same
+        either way, though the order of keys within each result may differ.
+    :param workers: If specified, the number of processes to aggregate subsets across. Items are
+        first separated into subsets in this process, then the subsets are aggregated in a pool of
+        worker processes. Results are still returned in the order subsets were first encountered.
+        ``other_data`` is resolved in this process, so a provider function does not need to be
+        picklable, but the items themselves do. Cannot be combined with ``spill_rows``, and takes
+        precedence over ``vectorize``.
+    :param chunk_size: The number of subsets to send to a worker process at once. Larger chunks
+        spend less time pickling. Defaults to splitting subsets into four chunks per worker.
+    """
+    if workers is not None:
+        if spill_rows is not None:
+            raise ValueError('Aggregation cannot be run in worker processes while spilling to '
+                             'disk.')
+
+        return _parallel_aggregate(data, tuple(identifiers), agg_def, other_data, workers,
+                                   chunk_size)
+
+    if vectorize and other_data is None and spill_rows is None:
+        if not isinstance(data, list):
+            data = list(data)
+
+        if (builder := _vector_aggregate(data, tuple(identifiers), agg_def)) is not None:
+            return builder
+
+    definition = _AggregationDefinition(agg_def)
+    if spill_rows is None:
+        if isinstance(other_data, BatchProvider):
+            # Give the provider each id as soon as it's found, so that lookups can get started
+            # before all the data has been aggregated.
+            lookup = other_data._start(tuple(identifiers))
+            try:
+                states = _hash_aggregate(data, tuple(identifiers), definition, on_new=lookup.add)
+                return _finish_aggregation(list(states.values()), lookup.results())
+
+            finally:
+                # Don't leave the provider's event loop running if aggregation fails.
+                lookup.close()
+
+        states = list(_hash_aggregate(data, tuple(identifiers), definition).values())
+        return _finish_aggregation(states, _resolve_other_data(states, identifiers, other_data))
+
+    def app_func(_builder: List[dict], val: dict):
+        return _builder.append(val)
+
+    # Partitions come back in no particular order, so keep track of where each subset started in
+    # order to return results in the same order as if nothing had been spilled. Only the results
+    # are held on to, the subsets themselves are discarded one partition at a time.
+    states = []
+    for i, id_, subset in _iter_partitioned_groups(data, tuple(identifiers), app_func, spill_rows,
+                                                   spill_partitions, spill_format, spill_dir):
+        states.append((i, id_, (group := definition.spawn()), group.process_items(subset)))
+
+    states.sort(key=lambda state: state[0])
+    states = [state[1:] for state in states]
+    return _finish_aggregation(states, _resolve_other_data(states, identifiers, other_data))
+
+
+def _hash_aggregate(
+        data: Iterable[dict],
+        identifiers: Tuple[str, ...],
+        definition: _AggregationDefinition,
+        states: Dict[Hashable, list] = None,
+        on_new: Callable[[dict], None] = None
+) -> Dict[Hashable, list]:
+    """
+    Folds every item in ``data`` into the state for its subset in a single pass. Each state is kept
+    as ``[id, _AggregationDefinition, current result]``, and states are kept in the order their
+    subsets were first encountered. If given, ``on_new`` is called with the id of each new subset.
+    """
+    if states is None:
+        states = {}
+
+    for item in data:
+        key = get_subset_values(item, *identifiers)
+        try:
+            state = states.get(key)
+
+        except TypeError:
+            key = _canonicalize_key(key)
+            state = states.get(key)
+
+        if state is None:
+            states[key] = state = [get_subset(item, *identifiers), definition.spawn(), None]
+            if on_new is not None:
+                on_new(state[0])
+
+        state[2] = state[1]._process_item(item, state[2])
+
+    return states
+
+
+def _finish_aggregation(
+        states: List[Union[list, tuple]],
+        others: Optional[List[Ldct]]
+) -> List[dict]:
+    """
+    Folds other data into each subset's state (if there is any) and collects the results.
+
+    :param states: The state of each subset as ``(id, _AggregationDefinition, current result)``.
+    :param others: The other data for each subset, in the same order as ``states``, or ``None`` if
+        there is no other data.
+    """
+    builder = []
+    if others is None:
+        for _, _, result in states:
+            if len(result):
+                builder.append(result)
+
+        return builder
+
+    for (id_, group, result), other in zip(states, others):
+        for item in other:
+            result = group._process_item(item, result)
+
+        result.update(id_)
+        if len(result):
+            builder.append(result)
+
+    return builder
+
+
+def _resolve_other_data(
+        states: List[Union[list, tuple]],
+        identifiers: Iterable[str],
+        other_data: Optional[DataSourceOrProvider]
+) -> Optional[List[Ldct]]:
+    """Retrieves the other data for the subset of each state, in the same order as ``states``."""
+    if other_data is None:
+        return None
+
+    if isinstance(other_data, BatchProvider):
+        lookup = other_data._start(tuple(identifiers))
+        try:
+            for state in states:
+                lookup.add(state[0])
+
+            return lookup.results()
+
+        finally:
+            lookup.close()
+
+    return [_get_other_data_for_aggregation(state[0], other_data) for state in states]
+
+
+# The definition used by worker processes when aggregating in parallel. It is set once when each
+# worker starts, so that it doesn't need to be sent along with every subset.
+_worker_definition: Optional['_AggregationDefinition'] = None
+
+
+def _start_aggregation_worker(agg_def: TrueAggDef):
+    global _worker_definition
+    _worker_definition = _AggregationDefinition(agg_def)
+
+
+def _aggregate_in_worker(task: Tuple[dict, Ldct, Optional[Ldct]]) -> Optional[dict]:
+    id_, subset, other = task
+    result = (group := _worker_definition.spawn()).process_items(subset)
+    if other is not None:
+        for item in other:
+            result = group._process_item(item, result)
+
+        result.update(id_)
+
+    return result if len(result) else None
+
+
+def _parallel_aggregate(
+        data: Iterable[dict],
+        identifiers: Tuple[str, ...],
+        agg_def: TrueAggDef,
+        other_data: Optional[DataSourceOrProvider],
+        workers: int,
+        chunk_size: Optional[int]
+) -> List[dict]:
+    if workers < 1:
+        raise ValueError('There must be at least one worker to aggregate with.')
+
+    def app_func(builder: List[dict], val: dict):
+        return builder.append(val)
+
+    tasks = list(_iter_fracture(data, identifiers, app_func))
+    if (others := _resolve_other_data(tasks, identifiers, other_data)) is None:
+        tasks = [(id_, subset, None) for id_, subset in tasks]
+
+    else:
+        tasks = [(id_, subset, other) for (id_, subset), other in zip(tasks, others)]
+
+    if not len(tasks):
+        return []
+
+    if chunk_size is None:
+        chunk_size = max(1, len(tasks) // (workers * 4))
+
+    # Executor.map returns results in the same order as the tasks, regardless of which worker
+    # finishes first.
+    with ProcessPoolExecutor(workers, initializer=_start_aggregation_worker,
+                             initargs=(agg_def,)) as executor:
+        return [result for result in executor.map(_aggregate_in_worker, tasks,
+                                                  chunksize=chunk_size)
+                if result is not None]
+
+
+_MAX_EXACT_FLOAT_INT = 2 ** 53
+
+
+def _vector_aggregate(
+        data: Ldct,
+        identifiers: Tuple[str, ...],
+        agg_def: TrueAggDef
+) -> Optional[List[dict]]:
+    """
+    Aggregates ``data`` a column at a time using NumPy. Produces the same results as aggregating
+    item by item would.
+
+    :return: The results, or ``None`` if NumPy is not installed or either ``agg_def`` or the values
+        in ``data`` cannot be vectorized.
+    """
+    if np is None:
+        main_logger.info('NumPy is not installed, so aggregation cannot be vectorized.')
+        return None
+
+    if not len(agg_def):
+        return None
+
+    reducers = {}
+    for key, _agg_def in agg_def.items():
+        if (type(_agg_def) is not AggDef or _agg_def.type != _SA
+                or (reducer := _VECTOR_REDUCERS.get(_agg_def.eval)) is None):
+            return None
+
+        reducers[key] = reducer
+
+    # Factorize the identifying values, remembering the last item in each subset, since that is
+    # where the keys which aren't aggregated get their values from.
+    groups = {}
+    codes = []
+    last = []
+    for i, item in enumerate(data):
+        key = tuple([item.get(identifier) for identifier in identifiers])
+        try:
+            code = groups.get(key)
+
+        except TypeError:
+            key = _canonicalize_key(key)
+            code = groups.get(key)
+
+        if code is None:
+            groups[key] = code = len(last)
+            last.append(i)
 
         else:
-            raise TypeError('The given PlainAggDef includes an unknown AggDef string.')
+            last[code] = i
 
-    return builder
+        codes.append(code)
 
+    if not len(last):
+        return []
 
-def _convert_comp_agg_def_or_check(
-        agg_def: Union[CompAggDef, CompCheckDef]
-) -> List[Union[AggDef, Dict[Hashable, AggDef]]]:
-    if len(agg_def) != 2:
-        raise TypeError('The given PlainAggDef has an invalid list. It\'s too long or too short.')
+    codes = np.array(codes, dtype=np.intp)
+    sizes = np.bincount(codes, minlength=len(last))
+    columns = {}
+    for key, reducer in reducers.items():
+        if (column := _vector_reduce([item.get(key) for item in data], codes, sizes,
+                                     reducer)) is None:
+            return None
 
-    if agg_def[0] in SIMPLE_AGG_DEFS.union(ALWAYS_AGG_DEFS):
-        return _convert_comp_agg_def(agg_def)
+        columns[key] = column
 
-    elif agg_def[0] in COMPLEX_LIST_CHECKS.union(COMPLEX_DICT_CHECKS):
-        return _convert_comp_check(agg_def)
+    builder = []
+    for code, i in enumerate(last):
+        builder.append(result := {key: column[code] for key, column in columns.items()})
+        for key, val in data[i].items():
+            if key not in reducers:
+                result[key] = val
 
-    raise TypeError('The given PlainAggDef has an invalid list. It does not start with a '
-                    'simple aggregator or with a complex checker.')
+    return builder
 
 
-def _convert_comp_agg_def(
-        agg_def: Union[CompAggDef, CompAlwaysAggDef]
-) -> List[Union[AggDef, Dict[Hashable, AggDef]]]:
-    builder = {}
-    if isinstance(agg_def[1], dict):
-        for key, val in agg_def[1].items():
-            builder[key] = _convert_check(val)
+_VECTOR_TYPES = {int, float, type(None)}
 
-    else:
-        raise TypeError('The given PlainAggDef includes at least one broken CompAggDef.')
 
-    return [AGG_DEF_MAP[agg_def[0]], builder]
+def _vector_reduce(column: list, codes: Any, sizes: Any, reducer: str) -> Optional[list]:
+    # bool is excluded on purpose, since it doesn't behave like an int under max and min.
+    if not (kinds := set(map(type, column))) <= _VECTOR_TYPES:
+        return None
 
+    size = len(column)
+    try:
+        if type(None) in kinds:
+            present = np.fromiter((v is not None for v in column), dtype=bool, count=size)
+            values = np.array([0 if v is None else v for v in column], dtype=np.float64)
 
-def _convert_check(check: CheckDef):
-    if isinstance(check, list):
-        if len(check) != 2:
-            raise TypeError('The given PlainAggDef has an invalid list in a CompAggDef. It\'s too '
-                            'long or too short.')
+        else:
+            present = np.ones(size, dtype=bool)
+            values = np.array(column, dtype=np.float64)
 
-        if check[0] not in COMPLEX_DICT_CHECKS.union(COMPLEX_LIST_CHECKS):
-            raise TypeError('The given PlainAggDef has an invalid list in a CompAggDef.')
+    except OverflowError:
+        return None
 
-        return _convert_comp_check(check)
+    if np.isnan(values).any():
+        return None
 
-    elif check in SIMPLE_CHECKS:
-        return AGG_DEF_MAP[check]
+    if float not in kinds:
+        is_float = np.zeros(size, dtype=bool)
 
-    raise TypeError('The given PlainAggDef has an unrecognized type of check.')
+    elif int not in kinds:
+        is_float = present
 
+    else:
+        is_float = np.fromiter(map(float.__instancecheck__, column), dtype=bool, count=size)
+
+    # As long as the ints involved can be represented exactly as floats, summing them as floats
+    # gives exactly the same results Python would.
+    if int in kinds and np.abs(values[present & ~is_float]).sum() >= _MAX_EXACT_FLOAT_INT:
+        return None
+
+    n = len(sizes)
+    if reducer in ('sum', 'avg'):
+        # bincount adds weights in order, so floats are summed in the same order as they would be
+        # item by item.
+        sums = np.bincount(codes, weights=values, minlength=n)
+        if reducer == 'avg':
+            # Items without a value still count toward the average.
+            return (sums / sizes).tolist()
+
+        counts = np.bincount(codes, weights=present, minlength=n).tolist()
+        floats = np.bincount(codes, weights=is_float, minlength=n).tolist()
+        return [None if not c else (s if f else int(s))
+                for s, c, f in zip(sums.tolist(), counts, floats)]
+
+    # For max and min, the newest item wins any ties, so sort by subset, then value, then position,
+    # and take the last item of each subset. The value is then taken from the original column so
+    # that its type is kept.
+    positions = np.nonzero(present)[0]
+    if not len(positions):
+        return [None] * n
+
+    grouped = codes[positions]
+    _values = values[positions] if reducer == 'max' else -values[positions]
+    order = np.lexsort((positions, _values, grouped))
+    grouped = grouped[order]
+    ends = np.append(np.nonzero(np.diff(grouped))[0], len(grouped) - 1)
+    output = [None] * n
+    for code, i in zip(grouped[ends].tolist(), positions[order[ends]].tolist()):
+        output[code] = column[i]
 
-def _convert_comp_check(check: CompCheckDef):
-    if check[0] in COMPLEX_LIST_CHECKS:
-        if isinstance(check[1], list):
-            return _safe_hash_for_comp_check(check)
+    return output
 
-        raise TypeError('The given PlainAggDef has an invalid complex list check.')
 
-    elif isinstance(check[1], dict):
-        return _safe_hash_for_comp_check(check)
+def _get_other_data_for_aggregation(id_: dict, other_data: DataSourceOrProvider) -> Ldct:
+    if callable(other_data):
+        return _normalize_other_data(other_data(id_))
 
-    raise TypeError('The given PlainAggDef has an invalid complex dict check.')
+    elif isinstance(other_data, dict):
+        return [other_data]
 
+    return list(other_data)
 
-def _safe_hash_for_comp_check(check: CompCheckDef):
-    try:
-        return AGG_DEF_MAP[check[0]](check[1])
 
-    except TypeError as e:
-        # If there is an unhashable item in the list or unhashable key in the dict, it will raise
-        # an error (due to the inner workings of the complex list checks or dicts). Catch this case
-        # and return a more useful error.
-        if e.message.startswith('unhashable type:'):
-            raise TypeError('The given PlainAggDef has an invalid complex list or dict check '
-                            'containing an unhashable type.')
+def _normalize_other_data(ans: Union[dict, Ldct, None]) -> Ldct:
+    if ans is None:
+        return []
 
-        # If it wasn't an error due to hashing, just re-raise the same error.
-        raise e
+    elif isinstance(ans, list):
+        return ans
 
+    return [ans]
 
-def convert_from_agg_def_dict(agg_def: TrueAggDef) -> PlainAggDef:
-    builder = {}
-    for key, _agg_def in agg_def.items():
-        if isinstance(_agg_def, list):
-            builder[key] = _convert_from_comp_agg_def_dict(_agg_def)
-            continue
 
-        try:
-            builder[key] = _agg_def.json
+class Aggregator:
+    """
+    Aggregates values the same way as :func:`aggregate`, but accepts items in batches, so that
+    new items can be folded into existing results without aggregating everything from scratch.
+    The state of an ``Aggregator`` can be checkpointed (either with :meth:`checkpoint` or by
+    pickling it) and resumed later, even in a different process.
 
-        except AttributeError:
-            raise TypeError('An AggDef in a TrueAggDef did not have a json attribute.')
+    Example:
 
-    return builder
+    .. code-block:: python
 
+        aggregator = Aggregator(['name'], {'total': AggDef.SUM, 'count': AggDef.AVG})
+        aggregator.feed([{'name': 'llama', 'total': 1, 'count': 2}])
+        checkpoint = aggregator.checkpoint()
 
-def _convert_from_comp_agg_def_dict(agg_def: CompAggDef):
-    builder = {}
-    if len(agg_def) != 2:
-        raise TypeError('A TrueAggDef shouldn\'t have a list of length greater than two.')
+        # Later...
+        aggregator = Aggregator.from_checkpoint(checkpoint)
+        aggregator.feed([{'name': 'llama', 'total': 2, 'count': 4}])
 
-    if type(agg_def[0]) is not AggDef:
-        raise TypeError('The provided TrueAggDef had a non-AggDef element where an AggDef '
-                        'should have been.')
+        # aggregator.results() == [{'name': 'llama', 'total': 3, 'count': 3.0}]
 
-    elif agg_def[0].type not in (_SA, _AA):
-        raise TypeError('The provided TrueAggDef had a check as the first part of a complex '
-                        'aggregate definition.')
+    :param identifiers: Unique identifiers that items should be aggregated across.
+    :param agg_def: The definition for aggregation. Must be convertible with
+        :func:`convert_from_agg_def_dict` in order to checkpoint the ``Aggregator``.
+    """
+    def __init__(self, identifiers: Ls, agg_def: TrueAggDef):
+        self._identifiers = tuple(identifiers)
+        self._agg_def = agg_def
+        self._definition = _AggregationDefinition(agg_def)
+        self._states = {}
 
-    _agg_def, mapping = agg_def
-    for key, _agg_def in mapping.items():
-        if type(_agg_def) is not AggDef:
-            raise TypeError('The provided TrueAggDef had a non-AggDef element where an AggDef '
-                            'should have been.')
+    def __len__(self) -> int:
+        """The number of subsets currently being aggregated."""
+        return len(self._states)
 
-        elif _agg_def.type not in (_CDC, _CLC, _SC):
-            raise TypeError('The provided TrueAggDef had an aggregator in a complex aggregate '
-                            'definition.')
+    def feed(self, data: Iterable[dict]) -> 'Aggregator':
+        """
+        Folds items into the current results.
 
-        try:
-            builder[key] = _agg_def.json
-            continue
+        :param data: Dictionaries to aggregate.
+        :return: This ``Aggregator``, so that calls can be chained.
+        """
+        _hash_aggregate(data, self._identifiers, self._definition, self._states)
+        return self
 
-        except AttributeError:
-            raise TypeError('An AggDef in the provided TrueAggDef did not have a json attribute.')
+    def results(self, other_data: DataSourceOrProvider = None) -> List[dict]:
+        """
+        Gets the current results of aggregation. The ``Aggregator`` itself is not affected, so more
+        items can still be fed to it afterward.
 
-    try:
-        return [agg_def[0].json, builder]
+        :param other_data: Other items to evaluate against, exactly as in :func:`aggregate`. These
+            only affect the results returned by this call.
+        :return: A list with a result for each subset, in the order subsets were first encountered.
+        """
+        if other_data is None:
+            return _finish_aggregation([(id_, group, result.copy())
+                                        for id_, group, result in self._states.values()], None)
 
-    except AttributeError:
-        raise TypeError('An AggDef in the provided TrueAggDef did not have a json attribute.')
+        states = []
+        for id_, group, result in self._states.values():
+            # Folding other_data in would disturb any state held by the aggregators, so use a
+            # stand-in with a copy of that state instead.
+            (stand_in := self._definition.spawn()).set_state(group.get_state())
+            states.append((id_, stand_in, result.copy()))
 
+        return _finish_aggregation(states,
+                                   _resolve_other_data(states, self._identifiers, other_data))
 
-class _AggregationDefinition:
-    invalid_error = TypeError('An invalid agg_def was provided.')
+    def checkpoint(self) -> dict:
+        """
+        Captures the state of the ``Aggregator`` in a ``dict`` made up of plain values. If the
+        values being aggregated are JSON-compatible, so is the checkpoint.
 
-    def __init__(self, agg_def: TrueAggDef = None):
-        self.simple_agg_defs = {}
-        self.complex_agg_defs = {}
-        self.check_defs = {}
-        self.mutating_keys = set()
+        :return: A ``dict`` which can be passed to :meth:`from_checkpoint`.
+        """
+        return {
+            'identifiers': list(self._identifiers),
+            'agg_def': convert_from_agg_def_dict(self._agg_def),
+            'states': [[id_, result, group.get_state()]
+                       for id_, group, result in self._states.values()],
+        }
 
-        if agg_def is not None:
-            if not isinstance(agg_def, dict):
-                raise self.invalid_error
+    @classmethod
+    def from_checkpoint(cls, checkpoint: dict) -> 'Aggregator':
+        """
+        Resumes an ``Aggregator`` from a checkpoint.
 
-            for key, _agg_def in agg_def.items():
-                self.add(key, _agg_def)
+        :param checkpoint: A ``dict`` generated by :meth:`checkpoint`.
+        :return: An ``Aggregator`` in the same state as the one that was checkpointed.
+        """
+        aggregator = cls(checkpoint['identifiers'],
+                         convert_to_agg_def_dict(checkpoint['agg_def']))
+        for id_, result, state in checkpoint['states']:
+            (group := aggregator._definition.spawn()).set_state(state)
+            key = _get_fracture_key(id_, aggregator._identifiers)
+            aggregator._states[key] = [id_, group, dict(result)]
 
-    def _exists(self, agg_def: AggDef) -> str:
-        if agg_def.type not in AGG_DEF_TYPES:
-            raise ValueError('agg_def has an unknown AggDef type in it. It cannot be processed.')
+        return aggregator
 
-        return agg_def.type
+    def __getstate__(self) -> dict:
+        return self.checkpoint()
 
-    def add(self, key: Any, agg_def: Union[AggDef, List[Union[AggDef, Dict[Any, AggDef]]]]):
-        if type(agg_def) is AggDef:
-            ad = self._exists(agg_def)
-            if ad == _SA:
-                self.simple_agg_defs[key] = agg_def.eval()
-                self.mutating_keys.add(key)
+    def __setstate__(self, state: dict):
+        self.__dict__.update(Aggregator.from_checkpoint(state).__dict__)
 
-            else:
-                self.check_defs[key] = agg_def.eval()
 
-        elif isinstance(agg_def, list):
-            if (len(agg_def) != 2 or type(agg_def_ := agg_def[0]) is not AggDef
-                    or not isinstance(agg_def[1], dict)):
-                raise self.invalid_error
+class WindowDef(CarrierEnum):
+    """
+    A :class:`funk_py.modularity.decoration.enums.CarrierEnum` used to represent the windows used by
+    :class:`WindowedAggregator` and :func:`aggregate_windows`. Sizes may be numbers (if timestamps
+    are numbers) or ``timedelta`` objects (if timestamps are ``datetime`` objects).
 
-            ad = self._exists(agg_def_)  # noqa: agg_def_ cannot be referenced before its
-                                         # assignment. An error would be raised before getting here
-                                         # if it wasn't assigned.
-            if ad != _SA:
-                raise self.invalid_error
+    Members:
+    ^^^^^^^^^^^^^
+    - ``TUMBLING(size)``: Fixed-size windows which do not overlap. Each item falls into exactly one
+      window.
+    - ``SLIDING(size, step)``: Fixed-size windows which start every ``step``, so that each item
+      falls into every window covering its timestamp.
+    - ``SESSION(gap)``: Windows which last for as long as items for a subset keep arriving within
+      ``gap`` of one another. Each subset has its own sessions. Items are expected to arrive in
+      roughly the order of their timestamps.
+    """
+    @staticmethod
+    def TUMBLING(size: Any):
+        """
+        Fixed-size windows which do not overlap.
 
-            # Rely on the builder's type_checking to verify whether the inner agg_def is okay.
-            builder = _AggregationDefinition()
-            for _key, _agg_def in agg_def[1].items():
-                builder._add_inner(_key, _agg_def)
+        :param size: The length of each window.
+        """
+        return {'kind': 'tumbling', 'step': size}
 
-            self.complex_agg_defs[key] = (agg_def_.eval(), builder)
-            self.mutating_keys.add(key)
+    @staticmethod
+    def SLIDING(size: Any, step: Any):
+        """
+        Fixed-size windows which overlap, starting every ``step``.
 
-        else:
-            raise self.invalid_error
+        :param size: The length of each window.
+        :param step: The distance between the starts of consecutive windows.
+        """
+        return {'kind': 'sliding'}
 
-    def _add_inner(self, key: Any, agg_def: AggDef):
-        if type(agg_def) is AggDef:
-            ad = self._exists(agg_def)
-            if ad == _SA:
-                raise self.invalid_error
+    @staticmethod
+    def SESSION(gap: Any):
+        """
+        Windows which stay open while items keep arriving within ``gap`` of one another.
 
-            else:
-                self.check_defs[key] = agg_def.eval()
+        :param gap: The longest time between items in a single session.
+        """
+        return {'kind': 'session'}
 
-        else:
-            raise self.invalid_error
 
-    def _eval_item(self, item: dict, current: dict) -> bool:
-        _pass = True
-        for key, eval in self.check_defs.items():
-            _pass = eval(item.get(key), current.get(key))
-            if not _pass:
-                break
+class WindowedAggregator:
+    """
+    Aggregates values the same way as :func:`aggregate`, but separately for each window of time, as
+    defined by a :class:`WindowDef`. Meant for aggregating streams of items: the largest timestamp
+    seen so far (less ``allowed_lateness``) acts as a watermark, and any window ending at or before
+    the watermark is closed, returned, and forgotten. This keeps memory bounded no matter how long
+    the stream runs.
 
-        return _pass
+    Items arriving for a window which has already been closed are dropped, and counted in
+    :attr:`late_items`.
 
-    def process_items(self, items: List[dict]):
+    Example:
+
+    .. code-block:: python
+
+        aggregator = WindowedAggregator(['name'], {'total': AggDef.SUM}, 'time',
+                                        WindowDef.TUMBLING(300))
+        for batch in feed:
+            for result in aggregator.feed(batch):
+                # result == {'name': ..., 'total': ..., 'time': ...,
+                #            'window_start': ..., 'window_end': ...}
+                ...
+
+        remaining = aggregator.flush()
+
+    :param identifiers: Unique identifiers that items should be aggregated across.
+    :param agg_def: The definition for aggregation.
+    :param time_key: The key holding each item's timestamp.
+    :param window: The windows to aggregate in.
+    :param allowed_lateness: How far behind the largest timestamp seen an item may be and still be
+        added to its window. Defaults to no allowance.
+    :param start_key: The key to store the start of each window under in results.
+    :param end_key: The key to store the end of each window under in results. For sessions, this is
+        the last timestamp in the session plus the gap.
+    """
+    def __init__(
+            self,
+            identifiers: Ls,
+            agg_def: TrueAggDef,
+            time_key: Any,
+            window: WindowDef,
+            allowed_lateness: Any = None,
+            start_key: Any = 'window_start',
+            end_key: Any = 'window_end'
+    ):
+        if type(window) is not WindowDef or not hasattr(window, 'kind'):
+            raise TypeError('window must be created from one of the members of WindowDef.')
+
+        if window.kind == 'session':
+            if not window.gap > window.gap - window.gap:
+                raise ValueError('The gap of a session must be greater than zero.')
+
+        # Comparing against size - size lets sizes be either numbers or timedeltas.
+        elif not window.size > window.size - window.size:
+            raise ValueError('The size of a window must be greater than zero.')
+
+        elif not window.size - window.size < window.step <= window.size:
+            raise ValueError('The step of a sliding window must be greater than zero and no '
+                             'greater than its size.')
+
+        self._identifiers = tuple(identifiers)
+        self._definition = _AggregationDefinition(agg_def)
+        self._time_key = time_key
+        self._window = window
+        self._lateness = allowed_lateness
+        self._start_key = start_key
+        self._end_key = end_key
+        self._origin = None
+        self._watermark = None
+        self._late_items = 0
+        # For fixed windows, the states of each window's subsets are kept under the window's start,
+        # and a heap of (end, start) gives the next window to close. For sessions, the open session
+        # of each subset is kept under the subset's key, and the heap holds
+        # (expiry, tie-breaker, key) entries which are ignored if the session was extended since.
+        self._windows = {}
+        self._heap = []
+        self._counter = 0
+
+    @property
+    def late_items(self) -> int:
+        """The number of items which were dropped for arriving after their window closed."""
+        return self._late_items
+
+    def __len__(self) -> int:
+        """The number of windows (or sessions) currently open."""
+        return len(self._windows)
+
+    def feed(self, data: Iterable[dict]) -> List[dict]:
         """
-        Processes a list of items based on the ``_AggregationDefinition``'s setup.
+        Folds items into their windows, then closes any windows the watermark has passed.
 
-        :param items: The item list to process.
-        :return: The resulting dictionary.
+        :param data: Dictionaries to aggregate.
+        :return: The results of every window closed, ordered by the end of each window, then by
+            the order subsets were first encountered in that window.
         """
-        current = None
-        for item in items:
-            current = self._process_item(item, current)
+        builder = []
+        for item in data:
+            self._fold(item, builder)
+            self._close(builder)
 
-        return current
+        return builder
 
-    def _process_item(self, item: dict, current: dict = None) -> dict:
+    def flush(self) -> List[dict]:
         """
-        Processes an item based on the ``_AggregationDefinition``'s setup.
+        Closes every open window.
 
-        :param item: The item to process.
-        :param current: The current builder. If ``None``, an empty dictionary will be generated.
-        :return: The resulting current dictionary.
+        :return: The results of every window that was open, in the same order as :meth:`feed`.
         """
-        if current is None:
-            current = {}
+        builder = []
+        self._close(builder, True)
+        return builder
 
-        if self._eval_item(item, current):
-            for key, data in self.complex_agg_defs.items():
-                eval, checker = data
-                if checker._eval_item(item, current):
-                    current[key] = eval(item.get(key), current.get(key))
+    def _fold(self, item: dict, builder: List[dict]):
+        if (t := item.get(self._time_key)) is None:
+            main_logger.warning(f'An item without a timestamp was encountered during windowed '
+                                f'aggregation and will be skipped. item = {item}')
+            return
 
-            for key, eval in self.simple_agg_defs.items():
-                current[key] = eval(item.get(key), current.get(key))
+        if self._origin is None:
+            self._origin = datetime(1970, 1, 1, tzinfo=t.tzinfo) if isinstance(t, datetime) else 0
 
-            # Make a copy of the mutating keys so that it can be expanded to contain any non-mutated
-            # keys in item. We don't simply want to copy item's items in case it is missing any of
-            # the mutated values, which mustn't be deleted.
-            new_keys = self.mutating_keys.copy()
-            new_keys.update(item.keys())
+        if self._watermark is None or t > self._watermark:
+            self._watermark = t
 
-            # Go through the items in item and if they aren't a member of mutating keys, update
-            # current with them.
-            for key, val in item.items():
-                if key not in self.mutating_keys:
-                    new_keys.add(key)
-                    current[key] = val
+        key = _get_fracture_key(item, self._identifiers)
+        window = self._window
+        if window.kind == 'session':
+            self._fold_session(item, t, key, builder)
+            return
 
-            # Remove the keys that should no longer exist from current.
-            for key in list(current.keys()):
-                if key not in new_keys:
-                    del current[key]
+        watermark = self._get_watermark()
+        start = self._origin + ((t - self._origin) // window.step) * window.step
+        folded = False
+        while (end := start + window.size) > t:
+            # Windows only get older from here, so once one has closed, the rest have as well.
+            if end <= watermark:
+                break
 
-        return current
+            if (subsets := self._windows.get(start)) is None:
+                self._windows[start] = subsets = {}
+                heapq.heappush(self._heap, (end, start))
 
+            self._fold_into(subsets, key, item)
+            folded = True
+            start -= window.step
 
-DataSourceOrProvider = Union[dict, Iterable[dict], Callable[[dict], Union[dict, Ldct, None]]]
+        # Only items which made it into no window at all are late.
+        if not folded:
+            self._late_items += 1
 
+    def _fold_session(self, item: dict, t: Any, key: Hashable, builder: List[dict]):
+        gap = self._window.gap
+        # Close any sessions the watermark has already passed first, so that they are returned
+        # before a session this item ends.
+        self._close(builder)
+        if (session := self._windows.get(key)) is not None and t - session[1] > gap:
+            # The item is too far after the session's last item to belong to it, so the session is
+            # over.
+            self._emit_session(key, builder)
+            session = None
 
-def aggregate(
-        data: Ldct,
+        if session is None:
+            if t + gap < self._get_watermark():
+                self._late_items += 1
+                return
+
+            self._windows[key] = session = [t, t, {}]
+
+        elif t > session[1]:
+            session[1] = t
+
+        elif t < session[0]:
+            session[0] = t
+
+        self._fold_into(session[2], key, item)
+        self._counter += 1
+        heapq.heappush(self._heap, (session[1] + gap, self._counter, key))
+
+    def _fold_into(self, subsets: Dict[Hashable, list], key: Hashable, item: dict):
+        if (state := subsets.get(key)) is None:
+            subsets[key] = state = [self._definition.spawn(), None]
+
+        state[1] = state[0]._process_item(item, state[1])
+
+    def _get_watermark(self) -> Any:
+        return self._watermark if self._lateness is None else self._watermark - self._lateness
+
+    def _close(self, builder: List[dict], everything: bool = False):
+        if not len(self._heap):
+            return
+
+        watermark = self._get_watermark()
+        if self._window.kind == 'session':
+            while len(self._heap) and (everything or self._heap[0][0] < watermark):
+                end, _, key = heapq.heappop(self._heap)
+                if (session := self._windows.get(key)) is not None \
+                        and session[1] + self._window.gap == end:
+                    self._emit_session(key, builder)
+
+            return
+
+        while len(self._heap) and (everything or self._heap[0][0] <= watermark):
+            end, start = heapq.heappop(self._heap)
+            for _, current in self._windows.pop(start).values():
+                if len(current):
+                    current[self._start_key] = start
+                    current[self._end_key] = end
+                    builder.append(current)
+
+    def _emit_session(self, key: Hashable, builder: List[dict]):
+        start, last, subsets = self._windows.pop(key)
+        for _, current in subsets.values():
+            if len(current):
+                current[self._start_key] = start
+                current[self._end_key] = last + self._window.gap
+                builder.append(current)
+
+
+def aggregate_windows(
+        data: Iterable[dict],
         identifiers: Ls,
         agg_def: TrueAggDef,
-        other_data: DataSourceOrProvider = None,
+        time_key: Any,
+        window: WindowDef,
+        start_key: Any = 'window_start',
+        end_key: Any = 'window_end'
 ) -> List[dict]:
     """
-    Aggregate values in data based on the provided unique identifiers and aggregation definition.
+    Aggregate values in data separately for each window of time, as defined by ``window``. Unlike
+    :class:`WindowedAggregator`, no items are ever treated as late, since all of ``data`` is
+    available up front.
 
     :param data: Dictionaries to aggregate.
     :param identifiers: Unique identifiers that data should be aggregated across.
     :param agg_def: The definition for aggregation.
-    :param other_data: Either another set of data to evaluate against or a provider of other items
-        to compare to. Can be useful when needing to compare against items in a database. If an
-        iterable of dictionaries is provided, those dictionaries will be appended to each subset of
-        dictionaries for evaluation. If a function is provided, it should accept a dictionary
-        representing the id (unique fingerprint) of each subset. For instance, if ``identifiers`` is
-        ``['name', 'time']``, then the function should be built to expect a dictionary of the form
-        ``{'name': value1, 'time': value2}``. This function can return either a single dictionary,
-        which would be appended to the end of its corresponding subset before evaluation, or it may
-        return a list of dictionaries, which would be used to extend its corresponding subset before
-        evaluation. Returning ``None`` from this function would be treated as no extra results, and
-        the corresponding subset wouldn't have any extra items added for evaluation.
+    :param time_key: The key holding each item's timestamp.
+    :param window: The windows to aggregate in.
+    :param start_key: The key to store the start of each window under in results.
+    :param end_key: The key to store the end of each window under in results.
+    :return: The results of every window, ordered by the end of each window, then by the order
+        subsets were first encountered in that window.
     """
+    aggregator = WindowedAggregator(identifiers, agg_def, time_key, window,
+                                    start_key=start_key, end_key=end_key)
     builder = []
-    if other_data is None:
-        for _, subset in fracture(data, *identifiers, inplace=False):
-            result = _AggregationDefinition(agg_def).process_items(subset)
-            if len(result):
-                builder.append(result)
-
-        return builder
-
-    for id_, subset in fracture(data, *identifiers, inplace=False):
-        subset = subset + _get_other_data_for_aggregation(id_, other_data)
-        result = _AggregationDefinition(agg_def).process_items(subset)
-        result.update(id_)
-        if len(result):
-            builder.append(result)
-
+    # Make sure items arrive in order, since the watermark would otherwise pass the windows of any
+    # items behind it. Once they do, no item can be late, and windows can be closed as soon as they
+    # are over.
+    for item in sorted(data, key=lambda item: (item.get(time_key) is None, item.get(time_key))):
+        aggregator._fold(item, builder)
+        aggregator._close(builder)
+
+    builder.extend(aggregator.flush())
     return builder
 
 
-def _get_other_data_for_aggregation(id_: dict, other_data: DataSourceOrProvider) -> Ldct:
-    if callable(other_data):
-        ans = other_data(id_)
-        if ans is None:
-            return []
-
-        elif isinstance(ans, list):
-            return ans
-
-        return [ans]
-
-    elif isinstance(other_data, dict):
-        return [other_data]
-
-    return list(other_data)
-
-
 def translate(data: List[dict], translators: Mapping[Any, Callable[[dict], Any]],
               default: Any = ..., inplace: bool = True) -> List[dict]:
     """
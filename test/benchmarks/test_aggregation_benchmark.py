@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from funk_py.sorting.pieces import AggDef, _AggregationDefinition, aggregate
+
+
+ID = 'id'
+NAME = 'name'
+TOTAL = 'total'
+COUNT = 'count'
+HIGH = 'high'
+FLAG = 'flag'
+ROWS = 100000
+
+
+def interpreted_process_item(definition: _AggregationDefinition, item: dict,
+                             current: dict = None) -> dict:
+    # How items were processed before definitions were compiled into plans. Kept here so that the
+    # gain from compiling can be measured.
+    if current is None:
+        current = {}
+
+    _pass = True
+    for key, eval in definition.check_defs.items():
+        _pass = eval(item.get(key), current.get(key))
+        if not _pass:
+            break
+
+    if _pass:
+        for key, (eval, checker) in definition.complex_agg_defs.items():
+            _pass = True
+            for _key, _eval in checker.check_defs.items():
+                _pass = _eval(item.get(_key), current.get(_key))
+                if not _pass:
+                    break
+
+            if _pass:
+                current[key] = eval(item.get(key), current.get(key))
+
+        for key, eval in definition.simple_agg_defs.items():
+            current[key] = eval(item.get(key), current.get(key))
+
+        new_keys = definition.mutating_keys.copy()
+        new_keys.update(item.keys())
+        for key, val in item.items():
+            if key not in definition.mutating_keys:
+                new_keys.add(key)
+                current[key] = val
+
+        for key in list(current.keys()):
+            if key not in new_keys:
+                del current[key]
+
+    return current
+
+
+def compiled_process_item(definition: _AggregationDefinition, item: dict,
+                          current: dict = None) -> dict:
+    return definition._process_item(item, current)
+
+
+@pytest.fixture(scope='module')
+def rows():
+    random.seed(42)
+    return [{ID: i % 50, NAME: 'name' + str(i % 7), TOTAL: random.randint(0, 100),
+             COUNT: random.random(), HIGH: i, FLAG: i % 3 == 0 or None}
+            for i in range(ROWS)]
+
+
+@pytest.fixture(params=(
+    {TOTAL: AggDef.SUM, COUNT: AggDef.AVG, HIGH: AggDef.MAX},
+    {TOTAL: [AggDef.SUM, {FLAG: AggDef.EXISTS}], COUNT: AggDef.AVG, HIGH: AggDef.MAX},
+    {TOTAL: AggDef.SUM, FLAG: AggDef.EXISTS},
+), ids=('simple', 'complex', 'checked'))
+def agg_def(request): return request.param
+
+
+def fold(process_item, definition, rows):
+    # Spawn a fresh definition each time, so that state doesn't build up between rounds.
+    definition = definition.spawn()
+    current = None
+    for row in rows:
+        current = process_item(definition, row, current)
+
+    return current
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('process_item', (interpreted_process_item, compiled_process_item),
+                         ids=('interpreted', 'compiled'))
+def test_process_item_benchmark(process_item, agg_def, rows, benchmark):
+    definition = _AggregationDefinition(agg_def)
+    result = benchmark(fold, process_item, definition, rows)
+    assert result == fold(interpreted_process_item, definition, rows)
+    benchmark.extra_info['rows_per_sec'] = ROWS / benchmark.stats.stats.mean
+
+
+@pytest.mark.benchmark
+def test_aggregate_benchmark(agg_def, rows, benchmark):
+    benchmark(aggregate, rows, [ID], agg_def)
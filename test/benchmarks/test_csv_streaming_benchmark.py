@@ -0,0 +1,53 @@
+import tracemalloc
+
+import pytest
+
+from funk_py.sorting.converters import csv_to_json, iter_csv
+
+
+ROWS = 200000
+COLUMNS = 8
+
+
+@pytest.fixture(scope='module')
+def csv_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp('csv') / 'data.csv'
+    with open(path, 'w', newline='') as file:
+        file.write(','.join('k' + str(i) for i in range(COLUMNS)) + '\n')
+        for i in range(ROWS):
+            file.write(','.join(f' v{i}_{j} ' for j in range(COLUMNS)) + '\n')
+
+    return path
+
+
+def read_whole(path) -> int:
+    # How large CSV files had to be read before iter_csv, with the whole file in memory at once.
+    with open(path, newline='') as file:
+        return len(csv_to_json(file.read()))
+
+
+def read_streamed(path) -> int:
+    return sum(len(chunk) for chunk in iter_csv(path))
+
+
+def read_streamed_tuples(path) -> int:
+    return sum(len(rows) for _, rows in iter_csv(path, as_tuples=True))
+
+
+def peak_memory(func, *args) -> int:
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('read', (read_whole, read_streamed, read_streamed_tuples),
+                         ids=('whole', 'streamed', 'streamed-tuples'))
+def test_csv_streaming_benchmark(read, csv_path, benchmark):
+    assert benchmark(read, csv_path) == ROWS
+    benchmark.extra_info['rows_per_sec'] = ROWS / benchmark.stats.stats.mean
+    benchmark.extra_info['peak_bytes'] = peak_memory(read, csv_path)
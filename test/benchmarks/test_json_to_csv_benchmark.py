@@ -0,0 +1,73 @@
+import csv
+import io
+import os
+
+import pytest
+
+from funk_py.sorting.converters import json_to_csv, csv_to_json
+
+
+COLUMNS = 1000
+ROWS = 100000
+LEGACY_ROWS = 100
+HEADERS = ['column' + str(i) for i in range(COLUMNS)]
+
+
+class Rows:
+    # Makes each row as it is reached, rather than holding all rows in memory, while still being
+    # iterable more than once for headers='all'.
+    def __init__(self, count: int, step: int = 1):
+        self.count = count
+        self.step = step
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield {key: i for key in HEADERS[i % self.step::self.step]}
+
+
+def legacy_json_to_csv(data, stream):
+    # How json_to_csv worked before it used a key to position map. Every key of every row was found
+    # with order.index, so wide rows cost O(headers^2). Kept here so that the gain can be measured.
+    headers = set()
+    for row in data:
+        headers.update(row)
+
+    headers = list(headers)
+
+    writer = csv.writer(stream)
+    writer.writerow(headers)
+    for row in data:
+        output = [None] * len(headers)
+        for k, v in row.items():
+            if k in headers:
+                output[headers.index(k)] = v
+
+        writer.writerow(output)
+
+
+@pytest.fixture
+def stream():
+    with open(os.devnull, 'w', newline='') as file:
+        yield file
+
+
+@pytest.fixture(params=(1, 20), ids=('dense', 'sparse'))
+def step(request): return request.param
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('headers', ('all', 'first', HEADERS), ids=('all', 'first', 'given'))
+def test_json_to_csv_benchmark(headers, step, stream, benchmark):
+    benchmark.pedantic(json_to_csv, (Rows(ROWS, step), stream, headers), rounds=1)
+    benchmark.extra_info['cells_per_sec'] = ROWS * COLUMNS / benchmark.stats.stats.mean
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('convert', (legacy_json_to_csv, json_to_csv), ids=('legacy', 'keyed'))
+def test_align_benchmark(convert, step, stream, benchmark):
+    rows = list(Rows(LEGACY_ROWS, step))
+    benchmark(convert, rows, stream)
+    expected = io.StringIO()
+    legacy_json_to_csv(rows, expected)
+    # The legacy column order depends on set order, so only the rows themselves can be compared.
+    assert csv_to_json(json_to_csv(rows)) == csv_to_json(expected.getvalue())
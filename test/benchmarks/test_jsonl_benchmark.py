@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from funk_py.sorting.converters import iter_jsonl, json_to_jsonl
+
+
+RECORDS = 200000
+
+
+def make_records():
+    return ({'id': i, 'name': 'name' + str(i), 'values': [i / 2, None, True], 'text': 'x' * 40}
+            for i in range(RECORDS))
+
+
+@pytest.fixture(scope='module')
+def jsonl_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp('jsonl') / 'data.jsonl'
+    json_to_jsonl(make_records(), path)
+    return path
+
+
+def read_whole(path) -> int:
+    # How JSONL files had to be read before iter_jsonl, with every line split out at once.
+    with open(path) as file:
+        return len([line for line in file.read().split('\n') if line])
+
+
+def read_chunks(path, **kwargs) -> int:
+    return sum(len(chunk) for chunk in iter_jsonl(path, **kwargs))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('kwargs', (
+    None,
+    {},
+    {'workers': os.cpu_count(), 'pool': 'thread'},
+    {'workers': os.cpu_count(), 'pool': 'process'},
+), ids=('whole', 'chunks', 'threads', 'processes'))
+def test_jsonl_read_benchmark(kwargs, jsonl_path, benchmark):
+    if kwargs is None:
+        assert benchmark(read_whole, jsonl_path) == RECORDS
+
+    else:
+        assert benchmark(read_chunks, jsonl_path, **kwargs) == RECORDS
+
+    benchmark.extra_info['records_per_sec'] = RECORDS / benchmark.stats.stats.mean
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('batch_size', (None, 1, 1024), ids=('string', 'unbatched', 'batched'))
+def test_jsonl_write_benchmark(batch_size, tmp_path, benchmark):
+    path = tmp_path / 'out.jsonl'
+
+    def write():
+        with open(path, 'w') as file:
+            if batch_size is None:
+                file.write(json_to_jsonl(list(make_records())))
+
+            else:
+                json_to_jsonl(make_records(), file, batch_size)
+
+    benchmark(write)
+    benchmark.extra_info['records_per_sec'] = RECORDS / benchmark.stats.stats.mean
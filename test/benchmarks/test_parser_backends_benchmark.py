@@ -0,0 +1,78 @@
+import json
+import random
+from xml.etree import ElementTree as ET
+
+import pytest
+import yaml
+
+from funk_py.sorting.converters import available_parser_backends, set_parser_backend, \
+    use_fastest_parsers, parse_json, yaml_to_json, xml_to_json, jsonl_to_json
+
+
+ROWS = 2000
+
+
+@pytest.fixture(scope='module')
+def rows():
+    random.seed(42)
+    return [{'id': i, 'name': 'name' + str(i % 7), 'total': random.randint(0, 100),
+             'ratio': random.random(), 'flag': i % 3 == 0, 'tags': ['a', 'b', str(i)]}
+            for i in range(ROWS)]
+
+
+@pytest.fixture(scope='module')
+def xml_data(rows):
+    root = ET.Element('rows')
+    for row in rows:
+        element = ET.SubElement(root, 'row', id=str(row['id']))
+        for key in ('name', 'total', 'ratio'):
+            ET.SubElement(element, key).text = str(row[key])
+
+    return ET.tostring(root, encoding='unicode')
+
+
+def use_backend(kind, backend):
+    if backend not in available_parser_backends()[kind]:
+        pytest.skip(f'{backend} is not installed.')
+
+    set_parser_backend(kind, backend)
+
+
+@pytest.fixture
+def restore_backends():
+    yield
+    use_fastest_parsers()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('backend', ('orjson', 'ujson', 'json'))
+def test_json_benchmark(backend, rows, restore_backends, benchmark):
+    use_backend('json', backend)
+    data = json.dumps(rows)
+    assert benchmark(parse_json, data) == rows
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('backend', ('orjson', 'ujson', 'json'))
+def test_jsonl_benchmark(backend, rows, restore_backends, benchmark):
+    use_backend('json', backend)
+    data = '\n'.join(json.dumps(row) for row in rows)
+    assert benchmark(jsonl_to_json, data) == rows
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('backend', ('libyaml', 'pyyaml'))
+def test_yaml_benchmark(backend, rows, restore_backends, benchmark):
+    use_backend('yaml', backend)
+    data = yaml.safe_dump(rows)
+    assert benchmark(yaml_to_json, data) == rows
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('backend', ('lxml', 'etree'))
+def test_xml_benchmark(backend, xml_data, restore_backends, benchmark):
+    use_backend('xml', backend)
+    set_parser_backend('xml', 'etree')
+    expected = xml_to_json(xml_data)
+    use_backend('xml', backend)
+    assert benchmark(xml_to_json, xml_data) == expected
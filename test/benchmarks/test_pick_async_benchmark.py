@@ -0,0 +1,42 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from funk_py.sorting.pieces import pick, pick_many_async
+
+
+PAGES = 50
+LATENCY = 0.005
+OUTPUT_MAP = ['json', {'rows': {'id': 'id', 'price': 'price', 'name': 'name'}}]
+
+
+@pytest.fixture(scope='module')
+def pages():
+    random.seed(42)
+    return [json.dumps({'rows': [{'id': i, 'price': random.random(), 'name': 'item' + str(i)}
+                                 for i in range(2000)]}) for _ in range(PAGES)]
+
+
+async def fetch(pages):
+    for page in pages:
+        # Stands in for waiting on the network.
+        await asyncio.sleep(LATENCY)
+        yield page
+
+
+async def fetch_then_pick(pages) -> list:
+    # Waiting and picking take turns.
+    return [pick(OUTPUT_MAP, page) async for page in fetch(pages)]
+
+
+async def overlapped(pages) -> list:
+    return [rows async for rows in pick_many_async(OUTPUT_MAP, fetch(pages))]
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('func', (fetch_then_pick, overlapped), ids=('alternating', 'overlapped'))
+def test_async_pick_benchmark(func, pages, benchmark):
+    result = benchmark(lambda: asyncio.run(func(pages)))
+    assert result == [pick(OUTPUT_MAP, page) for page in pages]
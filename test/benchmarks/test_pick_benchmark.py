@@ -1443,3 +1443,41 @@ class TestAccumulate:
     def test_danger_dict_benchmark(self, danger_dict, benchmark):
         output_map, dict = danger_dict
         benchmark(pick, output_map, dict, self.pick_type)
+
+
+def make_deep_map(depth: int) -> Tuple[dict, dict]:
+    output_map = OUT_KEYS[0]
+    _dict = VALS1[0]
+    for i in range(depth):
+        if i % 2:
+            output_map = {KEYS[0]: output_map, KEYS[1]: OUT_KEYS[1] + str(i)}
+            _dict = {KEYS[0]: _dict, KEYS[1]: i}
+
+        else:
+            output_map = {KEYS[0]: output_map}
+            _dict = {KEYS[0]: _dict}
+
+    return output_map, _dict
+
+
+@pytest.fixture(params=(50, 500, 5000), ids=('depth 50', 'depth 500', 'depth 5000'))
+def deep_map(request): return make_deep_map(request.param)
+
+
+@pytest.fixture(params=tuple(PickType), ids=tuple(t.value for t in PickType))
+def pick_type(request): return request.param
+
+
+class TestDeepMaps:
+    @pytest.mark.benchmark
+    def test_deep_map_benchmark(self, deep_map, pick_type, benchmark):
+        output_map, _dict = deep_map
+        benchmark(pick, output_map, _dict, pick_type)
+
+    @pytest.mark.benchmark
+    def test_deep_lists_benchmark(self, pick_type, benchmark):
+        _input = {KEYS[0]: VALS1[0]}
+        for _ in range(2000):
+            _input = [_input]
+
+        benchmark(pick, {KEYS[0]: OUT_KEYS[0]}, _input, pick_type)
@@ -0,0 +1,33 @@
+import random
+from array import array
+
+import pytest
+
+from funk_py.sorting.pieces import pick, pick_columns, PickType
+
+
+ROWS = 100000
+OUTPUT_MAP = {'rows': {'id': 'id', 'price': 'price', 'name': 'name'}}
+
+
+@pytest.fixture(scope='module')
+def data():
+    random.seed(42)
+    return {'rows': [{'id': i, 'price': random.random() * 100, 'name': 'item' + str(i % 10)}
+                     for i in range(ROWS)]}
+
+
+def accumulate_then_convert(output_map, _input) -> dict:
+    # What had to be done before pick_columns, to get arrays that numeric code could use.
+    columns = pick(output_map, _input, PickType.ACCUMULATE)[0]
+    return {'id': array('q', columns['id']), 'price': array('d', columns['price']),
+            'name': columns['name']}
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('func', (accumulate_then_convert, pick_columns),
+                         ids=('accumulate then convert', 'columns'))
+def test_columns_benchmark(func, data, benchmark):
+    result = benchmark(func, OUTPUT_MAP, data)
+    assert result == accumulate_then_convert(OUTPUT_MAP, data)
+    benchmark.extra_info['rows_per_sec'] = ROWS / benchmark.stats.stats.mean
@@ -0,0 +1,27 @@
+import random
+
+import pytest
+
+from funk_py.sorting.pieces import pick, PickProfile
+
+
+ROWS = 100000
+OUTPUT_MAP = {'rows': {'id': 'id', 'price': 'price', 'name': 'name'}}
+
+
+@pytest.fixture(scope='module')
+def data():
+    random.seed(42)
+    return {'rows': [{'id': i, 'price': random.random() * 100, 'name': 'item' + str(i % 10)}
+                     for i in range(ROWS)]}
+
+
+def profiled_pick(output_map, _input) -> list:
+    with PickProfile():
+        return pick(output_map, _input)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('func', (pick, profiled_pick), ids=('disabled', 'enabled'))
+def test_profile_overhead_benchmark(func, data, benchmark):
+    assert benchmark(func, OUTPUT_MAP, data) == pick(OUTPUT_MAP, data)
@@ -0,0 +1,57 @@
+import json
+import random
+import tracemalloc
+
+import pytest
+
+from funk_py.sorting.converters import json_to_xml
+from funk_py.sorting.pieces import pick, enable_projected_parsing, disable_projected_parsing
+
+
+RECORDS = 20000
+DATA_KEY = 'data'
+# Pick two keys out of a payload of several megabytes.
+JSON_MAP = {DATA_KEY: ['json', {'meta': {'id': 'id', 'name': 'name'}}]}
+XML_MAP = {DATA_KEY: ['xml', {'root': {'meta': {'id': 'id', 'name': 'name'}}}]}
+
+
+@pytest.fixture(scope='module')
+def payload():
+    random.seed(42)
+    return {'meta': {'id': 1, 'name': 'feed'},
+            'records': [{'id': i, 'payload': {'text': 'lorem ipsum ' * 5,
+                                              'values': [random.random() for _ in range(10)]},
+                         'tags': ['a', 'b']} for i in range(RECORDS)]}
+
+
+@pytest.fixture(params=(False, True), ids=('full', 'projected'))
+def projected(request):
+    if request.param:
+        enable_projected_parsing(0)
+
+    yield request.param
+    disable_projected_parsing()
+
+
+def peak_memory(func, *args) -> int:
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.benchmark
+def test_json_projection_benchmark(payload, projected, benchmark):
+    _input = {DATA_KEY: json.dumps(payload)}
+    assert benchmark(pick, JSON_MAP, _input) == [{'id': 1, 'name': 'feed'}]
+    benchmark.extra_info['peak_bytes'] = peak_memory(pick, JSON_MAP, _input)
+
+
+@pytest.mark.benchmark
+def test_xml_projection_benchmark(payload, projected, benchmark):
+    _input = {DATA_KEY: json_to_xml({'root': payload})}
+    assert benchmark(pick, XML_MAP, _input) == [{'id': '1', 'name': 'feed'}]
+    benchmark.extra_info['peak_bytes'] = peak_memory(pick, XML_MAP, _input)
@@ -0,0 +1,53 @@
+import tracemalloc
+
+import pytest
+
+from funk_py.sorting.converters import iter_xml, xml_to_json
+
+
+RECORDS = 100000
+PATH = 'feed/records/record'
+
+
+@pytest.fixture(scope='module')
+def xml_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp('xml') / 'data.xml'
+    with open(path, 'w') as file:
+        file.write('<feed><meta>feed</meta><records>')
+        for i in range(RECORDS):
+            file.write(f'<record id="{i}"><name>name{i}</name>'
+                       f'<tags><tag>a</tag><tag>b</tag></tags></record>')
+
+        file.write('</records></feed>')
+
+    return path
+
+
+def read_whole(path, sans_attributes) -> int:
+    # How large XML files had to be read before iter_xml, with the whole tree in memory at once.
+    with open(path) as file:
+        return len(xml_to_json(file.read(), sans_attributes)['feed']['records']['record'])
+
+
+def read_streamed(path, sans_attributes) -> int:
+    return sum(1 for _ in iter_xml(path, PATH, sans_attributes))
+
+
+def peak_memory(func, *args) -> int:
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('sans_attributes', (False, True),
+                         ids=('with attributes', 'sans attributes'))
+@pytest.mark.parametrize('read', (read_whole, read_streamed), ids=('whole', 'streamed'))
+def test_xml_streaming_benchmark(read, sans_attributes, xml_path, benchmark):
+    assert benchmark(read, xml_path, sans_attributes) == RECORDS
+    benchmark.extra_info['records_per_sec'] = RECORDS / benchmark.stats.stats.mean
+    benchmark.extra_info['peak_bytes'] = peak_memory(read, xml_path, sans_attributes)
@@ -0,0 +1,56 @@
+import os
+import random
+import tracemalloc
+
+import pytest
+
+from funk_py.sorting.converters import json_to_xml
+
+
+RECORDS = 50000
+
+
+@pytest.fixture(scope='module')
+def records():
+    random.seed(42)
+    return [{'record': {'id': i, 'name': 'name' + str(i),
+                        'payload': {'values': [random.random() for _ in range(5)], 'text': 't'},
+                        'tags': ['a', 'b']}} for i in range(RECORDS)]
+
+
+@pytest.fixture
+def stream():
+    with open(os.devnull, 'w') as file:
+        yield file
+
+
+def write_string(records, favor_attributes, stream):
+    stream.write(json_to_xml({'feed': records}, favor_attributes))
+
+
+def write_stream(records, favor_attributes, stream):
+    json_to_xml({'feed': records}, favor_attributes, stream=stream)
+
+
+def write_records(records, favor_attributes, stream):
+    json_to_xml(iter(records), favor_attributes, stream=stream, root='feed')
+
+
+def peak_memory(func, *args) -> int:
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('favor_attributes', (False, True), ids=('elements', 'attributes'))
+@pytest.mark.parametrize('write', (write_string, write_stream, write_records),
+                         ids=('string', 'stream', 'records'))
+def test_xml_writer_benchmark(write, favor_attributes, records, stream, benchmark):
+    benchmark(write, records, favor_attributes, stream)
+    benchmark.extra_info['records_per_sec'] = RECORDS / benchmark.stats.stats.mean
+    benchmark.extra_info['peak_bytes'] = peak_memory(write, records, favor_attributes, stream)
@@ -1,10 +1,17 @@
+import asyncio
+import json
+import pickle
+import threading
 from collections import namedtuple
+from datetime import datetime, timedelta
 
 import pytest
 
 from funk_py.modularity.type_matching import thoroughly_check_equality
+from funk_py.sorting import pieces
 from funk_py.sorting.pieces import convert_to_agg_def_dict, AggDef, _AggregationDefinition, \
-    aggregate, convert_from_agg_def_dict
+    aggregate, convert_from_agg_def_dict, Aggregator, BatchProvider, WindowDef, \
+    WindowedAggregator, aggregate_windows
 
 
 KEY1 = 'key1'
@@ -108,6 +115,20 @@ class TestConvertToJson:
         assert convert_from_agg_def_dict(input_data), expected_output
 
 
+class TestPickle:
+    @pytest.mark.parametrize('agg_def', (AggDef.SUM, AggDef.AVG, AggDef.LAST, AggDef.GREATER,
+                                         AggDef.NOT_EXISTS),
+                             ids=('SUM', 'AVG', 'LAST', 'GREATER', 'NOT_EXISTS'))
+    def test_simple_members_keep_identity(self, agg_def):
+        assert pickle.loads(pickle.dumps(agg_def)) is agg_def
+
+    def test_complex_members(self, one_of, gtr_of):
+        agg_def = {KEY1: one_of.value(['llama', 'horse']),
+                   KEY2: [AggDef.SUM, {KEY3: gtr_of.value({'llama': 1, 'horse': 2})}]}
+        result = pickle.loads(pickle.dumps(agg_def))
+        assert convert_from_agg_def_dict(result) == convert_from_agg_def_dict(agg_def)
+
+
 class TestAggregationDefinition:
     def test_init_with_valid_dict(self, sum_, avg):
         agg_def = {KEY1: sum_.value, KEY2: avg.value}
@@ -148,6 +169,25 @@ class TestAggregationDefinition:
         with pytest.raises(TypeError, match='An invalid agg_def was provided.'):
             aggregator.add(KEY1, [sum_.value])
 
+    def test_init_compiles_once(self, sum_, gtr, monkeypatch):
+        calls = []
+        compile_ = _AggregationDefinition._compile
+        monkeypatch.setattr(_AggregationDefinition, '_compile',
+                            lambda self: calls.append(self) or compile_(self))
+        aggregator = _AggregationDefinition({KEY1: sum_.value, KEY2: gtr.value,
+                                             KEY3: [sum_.value, {KEY2: gtr.value}]})
+        assert calls.count(aggregator) == 1
+        assert len(calls) == 2  # The inner definition for KEY3 is compiled once too.
+
+    def test_add_updates_plan(self, sum_, gtr):
+        aggregator = _AggregationDefinition({KEY1: sum_.value})
+        aggregator.add(KEY2, gtr.value)
+        aggregator.add(KEY3, [sum_.value, {KEY2: gtr.value}])
+        assert [key for key, _ in aggregator._simple_plan] == [KEY1]
+        assert [key for key, _ in aggregator._check_plan] == [KEY2]
+        assert [key for key, *_ in aggregator._complex_plan] == [KEY3]
+        assert [key for key, _ in aggregator._complex_plan[0][2]] == [KEY2]
+
     def test_process_items_with_valid_data(self, sum_, avg):
         agg_def = {TOTAL: sum_.value, COUNT: avg.value}
         aggregator = _AggregationDefinition(agg_def)
@@ -195,6 +235,22 @@ class TestAggregationDefinition:
 
         assert aggregator._eval_item(item, current) is False
 
+    def test_spawn_without_state_shares_definition(self, sum_, gtr):
+        aggregator = _AggregationDefinition({TOTAL: sum_.value, COUNT: gtr.value})
+        assert aggregator.spawn() is aggregator
+
+    def test_spawn_separates_state(self, sum_, avg, exist):
+        aggregator = _AggregationDefinition(
+            {TOTAL: sum_.value, COUNT: avg.value, KEY1: [avg.value, {KEY2: exist.value}]})
+        spawned1 = aggregator.spawn()
+        spawned2 = aggregator.spawn()
+        assert spawned1 is not spawned2
+        assert spawned1.process_items([{TOTAL: 1, COUNT: 2, KEY1: 4, KEY2: 0},
+                                       {TOTAL: 2, COUNT: 4, KEY1: 6, KEY2: 0}]) \
+               == {TOTAL: 3, COUNT: 3, KEY1: 5, KEY2: 0}
+        assert spawned2.process_items([{TOTAL: 5, COUNT: 10, KEY1: 1, KEY2: 0}]) \
+               == {TOTAL: 5, COUNT: 10, KEY1: 1, KEY2: 0}
+
 
 class TestAggregate:
     @pytest.fixture
@@ -299,3 +355,401 @@ class TestAggregate:
             {ID: 3, TOTAL: 7, COUNT: 4}
         ]
         assert result == expected_result
+
+    @pytest.mark.parametrize('spill_format', ('pickle', 'marshal', 'jsonl'))
+    def test_aggregate_with_spill(self, common_agg_def, spill_format, tmp_path):
+        data = [{ID: i % 37, TOTAL: i, COUNT: i % 5} for i in range(1_000)]
+        identifiers = [ID]
+        expected_result = aggregate(data, identifiers, common_agg_def)
+        result = aggregate(data, identifiers, common_agg_def, spill_rows=50, spill_partitions=3,
+                           spill_format=spill_format, spill_dir=str(tmp_path))
+        assert result == expected_result
+        assert list(tmp_path.iterdir()) == []
+
+    def test_aggregate_with_spill_and_other_data(self, common_agg_def):
+        data = [
+            {ID: 1, TOTAL: 10, COUNT: 2}, {ID: 1, TOTAL: 20, COUNT: 3},
+            {ID: 2, TOTAL: 15, COUNT: 5}
+        ]
+        identifiers = [ID]
+        other_data = {TOTAL: 5, COUNT: 1}
+        result = aggregate(data, identifiers, common_agg_def, other_data, spill_rows=1)
+        expected_result = [{ID: 1, TOTAL: 35, COUNT: 2.0}, {ID: 2, TOTAL: 20, COUNT: 3.0}]
+        assert result == expected_result
+
+    def test_aggregate_does_not_mutate_data(self, common_agg_def):
+        data = [
+            {ID: 1, TOTAL: 10, COUNT: 2}, {ID: 1, TOTAL: 20, COUNT: 3},
+            {ID: 2, TOTAL: 15, COUNT: 5}
+        ]
+        original = [item.copy() for item in data]
+        aggregate(data, [ID], common_agg_def, {TOTAL: 5, COUNT: 1})
+        assert data == original
+
+    def test_aggregate_with_workers(self, sum_, avg, exist):
+        data = [{ID: i % 23, TOTAL: i, COUNT: i % 5, KEY1: i % 3 or None} for i in range(500)]
+        identifiers = [ID]
+        agg_def = {TOTAL: sum_.value, COUNT: [avg.value, {KEY1: exist.value}]}
+        result = aggregate(data, identifiers, agg_def, workers=2, chunk_size=3)
+        assert result == aggregate(data, identifiers, agg_def)
+
+    def test_aggregate_with_workers_and_other_data_as_callable(self, common_agg_def):
+        data = [
+            {ID: 1, TOTAL: 10, COUNT: 2}, {ID: 1, TOTAL: 20, COUNT: 3},
+            {ID: 2, TOTAL: 15, COUNT: 5}, {ID: 3, TOTAL: 7, COUNT: 4},
+        ]
+        identifiers = [ID]
+
+        # Local functions can't be pickled, so this also makes sure the provider is only ever
+        # called from this process.
+        def other_data_provider(item_id):
+            return {TOTAL: 2, COUNT: 1} if item_id.get(ID) == 2 else None
+
+        result = aggregate(data, identifiers, common_agg_def, other_data_provider, workers=2)
+        assert result == aggregate(data, identifiers, common_agg_def, other_data_provider)
+
+    def test_aggregate_with_workers_and_no_data(self, common_agg_def):
+        assert aggregate([], [ID], common_agg_def, workers=2) == []
+
+    def test_aggregate_with_workers_and_spill(self, common_agg_def):
+        with pytest.raises(ValueError):
+            aggregate([], [ID], common_agg_def, workers=2, spill_rows=10)
+
+
+class TestBatchProvider:
+    DATA = [
+        {ID: 1, TOTAL: 10, COUNT: 2}, {ID: 1, TOTAL: 20, COUNT: 3},
+        {ID: 2, TOTAL: 15, COUNT: 5}, {ID: 3, TOTAL: 7, COUNT: 4},
+        {ID: 4, TOTAL: 1, COUNT: 1},
+    ]
+    OTHER = {
+        (1,): [{TOTAL: 5, COUNT: 1}, {TOTAL: 3, COUNT: 2}],
+        (2,): {TOTAL: 2, COUNT: 1},
+        (3,): None,
+    }
+
+    @pytest.fixture
+    def agg_def(self, sum_, avg): return {TOTAL: sum_.value, COUNT: avg.value}
+
+    @pytest.fixture
+    def expected(self, agg_def):
+        return aggregate(self.DATA, [ID], agg_def, lambda id_: self.OTHER.get((id_[ID],)))
+
+    @pytest.fixture
+    def calls(self): return []
+
+    @pytest.fixture
+    def lookup(self, calls):
+        def lookup(ids):
+            calls.append(ids)
+            return {key: val for key, val in self.OTHER.items()
+                    if key in {(id_[ID],) for id_ in ids}}
+
+        return lookup
+
+    def test_all_at_once(self, agg_def, expected, calls, lookup):
+        assert aggregate(self.DATA, [ID], agg_def, BatchProvider(lookup)) == expected
+        assert calls == [[{ID: 1}, {ID: 2}, {ID: 3}, {ID: 4}]]
+
+    def test_in_batches(self, agg_def, expected, calls, lookup):
+        assert aggregate(self.DATA, [ID], agg_def, BatchProvider(lookup, 3)) == expected
+        assert calls == [[{ID: 1}, {ID: 2}, {ID: 3}], [{ID: 4}]]
+
+    def test_async(self, agg_def, expected, calls, lookup):
+        async def async_lookup(ids):
+            await asyncio.sleep(0)
+            return lookup(ids)
+
+        assert aggregate(self.DATA, [ID], agg_def, BatchProvider(async_lookup, 1)) == expected
+        assert sorted(id_[ID] for batch in calls for id_ in batch) == [1, 2, 3, 4]
+
+    def test_async_stopped_on_error(self, agg_def):
+        finished = []
+
+        async def async_lookup(ids):
+            await asyncio.sleep(60)
+            finished.append(ids)
+            return {}
+
+        threads = threading.active_count()
+        with pytest.raises(TypeError):
+            aggregate([{ID: 1, TOTAL: 1, COUNT: 1}, {ID: 1, TOTAL: 'a', COUNT: 1}], [ID], agg_def,
+                      BatchProvider(async_lookup, 1))
+
+        # The lookup was cancelled, and the thread running it was stopped.
+        assert threading.active_count() == threads
+        assert finished == []
+
+    def test_with_spill(self, agg_def, expected, lookup):
+        assert aggregate(self.DATA, [ID], agg_def, BatchProvider(lookup, 2),
+                         spill_rows=2) == expected
+
+    def test_with_workers(self, agg_def, expected, lookup):
+        assert aggregate(self.DATA, [ID], agg_def, BatchProvider(lookup, 2), workers=2) == expected
+
+    def test_with_aggregator(self, agg_def, expected, lookup):
+        aggregator = Aggregator([ID], agg_def).feed(self.DATA)
+        assert aggregator.results(BatchProvider(lookup)) == expected
+
+    def test_invalid_batch_size(self, lookup):
+        with pytest.raises(ValueError):
+            BatchProvider(lookup, 0)
+
+
+class TestAggregator:
+    DATA = [
+        {ID: 1, TOTAL: 10, COUNT: 2, KEY1: 'llama'}, {ID: 2, TOTAL: 15, COUNT: 5},
+        {ID: 1, TOTAL: 20, COUNT: 3}, {ID: 3, TOTAL: 7, COUNT: 4},
+        {ID: 1, TOTAL: 5, COUNT: 1, KEY1: 'horse'}, {ID: 2, TOTAL: 25, COUNT: 10},
+    ]
+
+    @pytest.fixture
+    def agg_def(self, sum_, avg, exist):
+        return {TOTAL: sum_.value, COUNT: [avg.value, {KEY1: exist.value}]}
+
+    def test_feed_in_batches_matches_aggregate(self, agg_def):
+        aggregator = Aggregator([ID], agg_def)
+        aggregator.feed(self.DATA[:2]).feed(self.DATA[2:5]).feed(self.DATA[5:])
+        assert aggregator.results() == aggregate(self.DATA, [ID], agg_def)
+        assert len(aggregator) == 3
+
+    def test_results_do_not_disturb_state(self, agg_def):
+        aggregator = Aggregator([ID], agg_def)
+        aggregator.feed(self.DATA[:3])
+        other_data = {TOTAL: 5, COUNT: 1, KEY1: 'dog'}
+        assert aggregator.results(other_data) == aggregate(self.DATA[:3], [ID], agg_def,
+                                                           other_data)
+        aggregator.results()[0][TOTAL] = 1000
+        aggregator.feed(self.DATA[3:])
+        assert aggregator.results() == aggregate(self.DATA, [ID], agg_def)
+
+    def test_checkpoint_through_json(self, agg_def):
+        aggregator = Aggregator([ID], agg_def)
+        aggregator.feed(self.DATA[:3])
+        checkpoint = json.loads(json.dumps(aggregator.checkpoint()))
+        resumed = Aggregator.from_checkpoint(checkpoint)
+        resumed.feed(self.DATA[3:])
+        assert resumed.results() == aggregate(self.DATA, [ID], agg_def)
+
+    def test_pickle(self, agg_def):
+        aggregator = Aggregator([ID], agg_def)
+        aggregator.feed(self.DATA[:4])
+        resumed = pickle.loads(pickle.dumps(aggregator))
+        resumed.feed(self.DATA[4:])
+        assert resumed.results() == aggregate(self.DATA, [ID], agg_def)
+
+
+class TestWindowedAggregate:
+    TIME = 'time'
+    START = 'window_start'
+    END = 'window_end'
+    DATA = [
+        {ID: 1, TOTAL: 1, TIME: 1}, {ID: 2, TOTAL: 2, TIME: 3}, {ID: 1, TOTAL: 3, TIME: 7},
+        {ID: 1, TOTAL: 4, TIME: 12},
+    ]
+
+    def windowed(self, id_, total, start, end):
+        return {ID: id_, TOTAL: total, self.START: start, self.END: end}
+
+    @staticmethod
+    def strip_time(results):
+        for result in results:
+            del result[TestWindowedAggregate.TIME]
+
+        return results
+
+    def test_tumbling(self):
+        result = aggregate_windows(self.DATA, [ID], {TOTAL: AggDef.SUM}, self.TIME,
+                                   WindowDef.TUMBLING(5))
+        assert self.strip_time(result) == [
+            self.windowed(1, 1, 0, 5), self.windowed(2, 2, 0, 5), self.windowed(1, 3, 5, 10),
+            self.windowed(1, 4, 10, 15),
+        ]
+
+    def test_sliding(self):
+        result = aggregate_windows(self.DATA, [ID], {TOTAL: AggDef.SUM}, self.TIME,
+                                   WindowDef.SLIDING(10, 5))
+        assert self.strip_time(result) == [
+            self.windowed(1, 1, -5, 5), self.windowed(2, 2, -5, 5), self.windowed(1, 4, 0, 10),
+            self.windowed(2, 2, 0, 10), self.windowed(1, 7, 5, 15), self.windowed(1, 4, 10, 20),
+        ]
+
+    @pytest.mark.parametrize('window', [WindowDef.TUMBLING(5), WindowDef.SLIDING(10, 5)],
+                             ids=('TUMBLING', 'SLIDING'))
+    def test_out_of_order_items_are_not_late(self, window):
+        data = [self.DATA[3], self.DATA[0], self.DATA[2], self.DATA[1]]
+        result = aggregate_windows(data, [ID], {TOTAL: AggDef.SUM}, self.TIME, window)
+        expected = aggregate_windows(self.DATA, [ID], {TOTAL: AggDef.SUM}, self.TIME, window)
+        assert self.strip_time(result) == self.strip_time(expected)
+
+    def test_session(self):
+        result = aggregate_windows(self.DATA[::-1], [ID], {TOTAL: AggDef.SUM}, self.TIME,
+                                   WindowDef.SESSION(4))
+        assert self.strip_time(result) == [
+            self.windowed(1, 1, 1, 5), self.windowed(2, 2, 3, 7), self.windowed(1, 3, 7, 11),
+            self.windowed(1, 4, 12, 16),
+        ]
+
+    def test_datetimes(self):
+        data = [{ID: 1, TOTAL: 1, self.TIME: datetime(2024, 1, 1, 0, 3)},
+                {ID: 1, TOTAL: 2, self.TIME: datetime(2024, 1, 1, 0, 4)},
+                {ID: 1, TOTAL: 4, self.TIME: datetime(2024, 1, 1, 0, 7)}]
+        result = aggregate_windows(data, [ID], {TOTAL: AggDef.SUM}, self.TIME,
+                                   WindowDef.TUMBLING(timedelta(minutes=5)))
+        assert self.strip_time(result) == [
+            self.windowed(1, 3, datetime(2024, 1, 1), datetime(2024, 1, 1, 0, 5)),
+            self.windowed(1, 4, datetime(2024, 1, 1, 0, 5), datetime(2024, 1, 1, 0, 10)),
+        ]
+
+    def test_missing_timestamps_are_skipped(self):
+        data = self.DATA + [{ID: 1, TOTAL: 100}]
+        result = aggregate_windows(data, [ID], {TOTAL: AggDef.SUM}, self.TIME,
+                                   WindowDef.TUMBLING(5))
+        assert sum(item[TOTAL] for item in result) == 10
+
+    def test_feed_closes_windows(self):
+        aggregator = WindowedAggregator([ID], {TOTAL: AggDef.SUM}, self.TIME,
+                                        WindowDef.TUMBLING(5))
+        assert self.strip_time(aggregator.feed(self.DATA[:2])) == []
+        assert self.strip_time(aggregator.feed(self.DATA[2:3])) == [
+            self.windowed(1, 1, 0, 5), self.windowed(2, 2, 0, 5),
+        ]
+        assert len(aggregator) == 1
+        assert self.strip_time(aggregator.flush()) == [self.windowed(1, 3, 5, 10)]
+        assert len(aggregator) == 0
+
+    def test_late_items_are_dropped(self):
+        aggregator = WindowedAggregator([ID], {TOTAL: AggDef.SUM}, self.TIME,
+                                        WindowDef.TUMBLING(5))
+        aggregator.feed(self.DATA[:3])
+        assert aggregator.feed([{ID: 1, TOTAL: 50, self.TIME: 2}]) == []
+        assert aggregator.late_items == 1
+        assert self.strip_time(aggregator.flush()) == [self.windowed(1, 3, 5, 10)]
+
+    def test_partly_late_items_are_not_dropped(self):
+        aggregator = WindowedAggregator([ID], {TOTAL: AggDef.SUM}, self.TIME,
+                                        WindowDef.SLIDING(10, 5))
+        aggregator.feed([{ID: 1, TOTAL: 1, self.TIME: 0}, {ID: 1, TOTAL: 2, self.TIME: 12}])
+        # [0, 10) has closed, but [5, 15) is still open.
+        assert aggregator.feed([{ID: 1, TOTAL: 4, self.TIME: 9}]) == []
+        assert aggregator.late_items == 0
+        assert self.strip_time(aggregator.flush()) == [
+            self.windowed(1, 6, 5, 15), self.windowed(1, 2, 10, 20),
+        ]
+
+    def test_allowed_lateness(self):
+        aggregator = WindowedAggregator([ID], {TOTAL: AggDef.SUM}, self.TIME,
+                                        WindowDef.TUMBLING(5), allowed_lateness=5)
+        assert aggregator.feed(self.DATA[:3]) == []
+        assert aggregator.feed([{ID: 1, TOTAL: 50, self.TIME: 2}]) == []
+        assert aggregator.late_items == 0
+        assert self.strip_time(aggregator.feed(self.DATA[3:])) == [
+            self.windowed(1, 51, 0, 5), self.windowed(2, 2, 0, 5),
+        ]
+
+    def test_memory_is_bounded(self):
+        aggregator = WindowedAggregator([ID], {TOTAL: AggDef.SUM}, self.TIME,
+                                        WindowDef.SLIDING(10, 2))
+        for i in range(1000):
+            aggregator.feed([{ID: i % 3, TOTAL: 1, self.TIME: i}])
+            assert len(aggregator) <= 6
+
+    def test_invalid_window(self):
+        with pytest.raises(TypeError):
+            WindowedAggregator([ID], {TOTAL: AggDef.SUM}, self.TIME, WindowDef.TUMBLING)
+
+    @pytest.mark.parametrize('window', (
+        WindowDef.TUMBLING(0),
+        WindowDef.TUMBLING(-5),
+        WindowDef.SLIDING(0, 0),
+        WindowDef.SLIDING(10, 0),
+        WindowDef.SLIDING(10, -5),
+        WindowDef.SLIDING(10, 11),
+        WindowDef.SESSION(0),
+        WindowDef.SESSION(timedelta(seconds=-1)),
+    ), ids=('tumbling zero', 'tumbling negative', 'sliding zero', 'zero step', 'negative step',
+            'step over size', 'session zero', 'session negative'))
+    def test_invalid_window_sizes(self, window):
+        with pytest.raises(ValueError):
+            WindowedAggregator([ID], {TOTAL: AggDef.SUM}, self.TIME, window)
+
+    def test_timedelta_windows_are_checked(self):
+        WindowedAggregator([ID], {TOTAL: AggDef.SUM}, self.TIME,
+                           WindowDef.SLIDING(timedelta(minutes=10), timedelta(minutes=5)))
+        with pytest.raises(ValueError):
+            WindowedAggregator([ID], {TOTAL: AggDef.SUM}, self.TIME,
+                               WindowDef.SLIDING(timedelta(minutes=10), timedelta(0)))
+
+
+class TestVectorizedAggregate:
+    @pytest.fixture(autouse=True)
+    def numpy(self): return pytest.importorskip('numpy')
+
+    @pytest.fixture
+    def agg_def(self):
+        return {KEY1: AggDef.SUM, KEY2: AggDef.AVG, KEY3: AggDef.MAX, KEY4: AggDef.MIN,
+                TOTAL: AggDef.LAST}
+
+    @pytest.fixture
+    def data(self):
+        values = [1, 2.5, None, -4, 7.0, 1.0, 0, 3, 1]
+        data = []
+        for i in range(200):
+            item = {ID: i % 7, COUNT: i}
+            for j, key in enumerate((KEY1, KEY2, KEY3, KEY4, TOTAL)):
+                if (i + j) % 5:
+                    item[key] = values[(i * (j + 1)) % len(values)]
+
+            data.append(item)
+
+        return data
+
+    @staticmethod
+    def assert_same(expected, result):
+        assert result == expected
+        # Results should match in type as well (for instance, sums of ints should remain ints).
+        for e_item, r_item in zip(expected, result):
+            for key, val in e_item.items():
+                assert type(r_item[key]) is type(val)
+
+    def test_matches_row_engine(self, agg_def, data):
+        self.assert_same(aggregate(data, [ID], agg_def),
+                         aggregate(data, [ID], agg_def, vectorize=True))
+
+    def test_matches_row_engine_with_multiple_identifiers(self, agg_def, data):
+        self.assert_same(aggregate(data, [ID, KEY4], agg_def),
+                         aggregate(data, [ID, KEY4], agg_def, vectorize=True))
+
+    def test_no_data(self, agg_def):
+        assert aggregate([], [ID], agg_def, vectorize=True) == []
+
+    def test_all_none(self, agg_def):
+        data = [{ID: 1, KEY1: None}, {ID: 1}]
+        self.assert_same(aggregate(data, [ID], agg_def),
+                         aggregate(data, [ID], agg_def, vectorize=True))
+
+    def test_checks_fall_back(self, data, monkeypatch):
+        agg_def = {KEY1: AggDef.SUM, KEY2: [AggDef.AVG, {KEY3: AggDef.EXISTS}]}
+        monkeypatch.setattr(pieces, '_vector_reduce', None)
+        # If the vectorized backend was attempted, calling _vector_reduce would raise an error.
+        assert aggregate(data, [ID], agg_def, vectorize=True) == aggregate(data, [ID], agg_def)
+
+    @pytest.mark.parametrize('value', (True, float('nan'), 2 ** 60),
+                             ids=('bool', 'nan', 'large int'))
+    def test_unsupported_values_fall_back(self, agg_def, data, value):
+        data[3][KEY1] = value
+        data[5][KEY3] = value
+        expected = aggregate(data, [ID], agg_def)
+        result = aggregate(data, [ID], agg_def, vectorize=True)
+        assert thoroughly_check_equality(result, expected)
+
+    def test_strings_fall_back(self, agg_def, data):
+        for item in data:
+            if item.get(KEY3) is not None:
+                item[KEY3] = str(item[KEY3])
+
+        assert aggregate(data, [ID], agg_def, vectorize=True) == aggregate(data, [ID], agg_def)
+
+    def test_without_numpy(self, agg_def, data, monkeypatch):
+        monkeypatch.setattr(pieces, 'np', None)
+        assert aggregate(data, [ID], agg_def, vectorize=True) == aggregate(data, [ID], agg_def)
@@ -1,10 +1,22 @@
+import io
+import json
+import math
+import mmap
+import os
+import subprocess
+import sys
 from collections import namedtuple
 from xml.etree import ElementTree as ET
 
 import pytest
+import yaml
 
 from funk_py.modularity.basic_structures import Speed
-from funk_py.sorting.converters import csv_to_json, xml_to_json
+from funk_py.sorting import converters
+from funk_py.sorting.converters import csv_to_json, xml_to_json, parse_json, yaml_to_json, \
+    jsonl_to_json, wonky_json_to_json, available_parser_backends, get_parser_backends, \
+    set_parser_backend, use_stdlib_parsers, use_fastest_parsers, iter_csv, \
+    json_to_csv, iter_xml, json_to_xml, iter_jsonl, json_to_jsonl
 
 
 XmlTDef = namedtuple('XmlTDef', ('sans_attributes', 'input', 'output', 'speed'))
@@ -27,6 +39,28 @@ PS_6_000 = Speed(3_000, 0.5)
 PS_8_000 = Speed(4_000, 0.5)
 
 
+# Every test which parses is run with each parser, so that results never depend on which parsers
+# happen to be installed.
+BACKENDS = (('stdlib', None), ('orjson', 'json'), ('ujson', 'json'), ('libyaml', 'yaml'),
+            ('lxml', 'xml'))
+
+
+@pytest.fixture(params=BACKENDS, ids=[b[0] for b in BACKENDS])
+def parser_backend(request):
+    backend, kind = request.param
+    use_stdlib_parsers()
+    if kind is not None:
+        if backend not in available_parser_backends()[kind]:
+            use_fastest_parsers()
+            pytest.skip(f'{backend} is not installed.')
+
+        set_parser_backend(kind, backend)
+
+    yield backend
+    use_fastest_parsers()
+
+
+@pytest.mark.usefixtures('parser_backend')
 class TestXmlToJson:
     @pytest.fixture
     def xml_builder(self):
@@ -357,3 +391,741 @@ class TestCsvToJson:
     
     def test_quoted_csv_quotes_inside(self, quoted_csv_quotes_inside):
         assert csv_to_json(quoted_csv_quotes_inside.input) == quoted_csv_quotes_inside.output
+
+
+class TestIterCsv:
+    CSV = ' k0 , k1,k2\nv0 , v1 ,"v2, v3"\n' + 'v4,v5,v6\n' * 9
+    ROWS = [{'k0': 'v0', 'k1': 'v1', 'k2': 'v2, v3'}] + [{'k0': 'v4', 'k1': 'v5', 'k2': 'v6'}] * 9
+
+    @pytest.fixture(params=('str', 'text file', 'binary file', 'path', 'bytes', 'mmap'))
+    def source(self, request, tmp_path):
+        if request.param == 'str':
+            yield self.CSV
+
+        elif request.param == 'text file':
+            yield io.StringIO(self.CSV, newline='')
+
+        elif request.param == 'binary file':
+            yield io.BytesIO(self.CSV.encode())
+
+        else:
+            path = tmp_path / 'data.csv'
+            path.write_bytes(self.CSV.encode())
+            if request.param == 'path':
+                yield path
+
+            elif request.param == 'bytes':
+                yield path.read_bytes()
+
+            else:
+                with open(path, 'rb') as file, \
+                        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    yield mapped
+
+    def test_reads_every_source(self, source):
+        assert [row for chunk in iter_csv(source) for row in chunk] == self.ROWS
+
+    def test_yields_chunks(self):
+        chunks = list(iter_csv(self.CSV, chunk_size=4))
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        assert [row for chunk in chunks for row in chunk] == self.ROWS
+
+    def test_is_lazy(self):
+        source = io.StringIO(self.CSV + 'v7,v8,v9\n' * 10_000)
+        chunks = iter_csv(source, chunk_size=2)
+        assert next(chunks) == self.ROWS[:2]
+        assert source.tell() < len(source.getvalue())
+
+    def test_as_tuples_shares_headers(self):
+        chunks = list(iter_csv(self.CSV, chunk_size=4, as_tuples=True))
+        assert chunks[0][0] == ('k0', 'k1', 'k2')
+        assert all(headers is chunks[0][0] for headers, _ in chunks)
+        assert [row for _, rows in chunks for row in rows] == \
+            [tuple(row.values()) for row in self.ROWS]
+
+    @pytest.mark.parametrize('strip', (True, False), ids=('strip', 'no strip'))
+    def test_as_tuples_fits_rows_to_headers(self, strip):
+        data = 'a,b\n1,2\n3,4,5\n6\n'
+        _, rows = next(iter_csv(data, as_tuples=True, strip=strip))
+        assert rows == [('1', '2'), ('3', '4'), ('6', None)]
+        assert next(iter_csv(data, strip=strip)) == [{'a': '1', 'b': '2'}, {'a': '3', 'b': '4'},
+                                                      {'a': '6'}]
+
+    def test_no_strip(self):
+        chunk = next(iter_csv(self.CSV, strip=False))
+        assert chunk[0] == {' k0 ': 'v0 ', ' k1': ' v1 ', 'k2': 'v2, v3'}
+
+    def test_dialect(self):
+        chunk = next(iter_csv('a\tb\n1\t2\n', dialect='excel-tab'))
+        assert chunk == [{'a': '1', 'b': '2'}]
+
+    def test_fmtparams(self):
+        assert next(iter_csv('a;b\n1;2\n', delimiter=';')) == [{'a': '1', 'b': '2'}]
+
+    def test_empty(self):
+        assert list(iter_csv('')) == []
+        assert list(iter_csv(b'')) == []
+        assert csv_to_json('') == []
+
+    def test_headers_only(self):
+        assert list(iter_csv('a,b\n')) == []
+
+    def test_leaves_file_open(self):
+        source = io.BytesIO(self.CSV.encode())
+        list(iter_csv(source))
+        assert not source.closed
+
+    def test_bad_chunk_size(self):
+        with pytest.raises(ValueError):
+            next(iter_csv(self.CSV, chunk_size=0))
+
+    def test_matches_csv_to_json(self):
+        assert [row for chunk in iter_csv(self.CSV) for row in chunk] == csv_to_json(self.CSV)
+
+
+class TestJsonToCsv:
+    ROWS = [{'b': 1, 'a': 'x, y'}, {'a': 2, 'c': None}, {'d': 'q"r', 'b': 3}]
+
+    def test_columns_in_first_seen_order(self):
+        assert json_to_csv(self.ROWS) == 'b,a,c,d\r\n1,"x, y",,\r\n,2,,\r\n3,,,"q""r"\r\n'
+
+    def test_round_trip(self):
+        rows = [{k: str(v) for k, v in row.items()} for row in self.ROWS]
+        headers = ['b', 'a', 'c', 'd']
+        assert csv_to_json(json_to_csv(rows)) == \
+            [{h: row.get(h, '') for h in headers} for row in rows]
+
+    def test_first_row_headers(self):
+        assert json_to_csv(iter(self.ROWS), headers='first') == 'b,a\r\n1,"x, y"\r\n,2\r\n3,\r\n'
+
+    def test_given_headers(self):
+        assert json_to_csv(iter(self.ROWS), headers=('d', 'a')) == \
+            'd,a\r\n,"x, y"\r\n,2\r\n"q""r",\r\n'
+
+    def test_repeated_given_headers(self):
+        # Wide enough that the rows are sparse.
+        headers = ['a'] + ['h' + str(i) for i in range(10)] + ['a']
+        assert json_to_csv([{'a': 1}], headers=headers) == ','.join(headers) + '\r\n1' + \
+            ',' * 11 + '1\r\n'
+
+    def test_sparse_and_dense_rows_agree(self):
+        headers = ['k' + str(i) for i in range(40)]
+        rows = [{h: i for h in headers[:n]} for i, n in enumerate((1, 5, 9, 10, 11, 40))]
+        lines = json_to_csv(rows).split('\r\n')[1:-1]
+        assert lines == [','.join([str(i)] * n + [''] * (40 - n))
+                         for i, n in enumerate((1, 5, 9, 10, 11, 40))]
+
+    def test_writes_to_stream(self):
+        stream = io.StringIO()
+        assert json_to_csv(self.ROWS, stream) is None
+        assert stream.getvalue() == json_to_csv(self.ROWS)
+
+    def test_writes_to_file(self, tmp_path):
+        path = tmp_path / 'data.csv'
+        with open(path, 'w', newline='') as file:
+            json_to_csv(self.ROWS, file)
+
+        assert path.read_bytes().decode() == json_to_csv(self.ROWS)
+
+    def test_dialect(self):
+        assert json_to_csv([{'a': 1, 'b': 2}], dialect='excel-tab') == 'a\tb\r\n1\t2\r\n'
+        assert json_to_csv([{'a': 1, 'b': 2}], lineterminator='\n') == 'a,b\n1,2\n'
+
+    def test_empty(self):
+        assert json_to_csv([]) == ''
+        assert json_to_csv(iter(()), headers='first') == ''
+
+    def test_all_headers_needs_reiterable_data(self):
+        with pytest.raises(TypeError):
+            json_to_csv(iter(self.ROWS))
+
+    @pytest.mark.parametrize('headers', ('all', 'first', ['a']))
+    def test_rejects_non_dicts(self, headers):
+        with pytest.raises(TypeError):
+            json_to_csv([{'a': 1}, ['a']], headers=headers)
+
+        with pytest.raises(TypeError):
+            json_to_csv([['a']], headers=headers)
+
+    def test_bad_headers(self):
+        with pytest.raises(ValueError):
+            json_to_csv(self.ROWS, headers='some')
+
+
+@pytest.mark.usefixtures('parser_backend')
+class TestParserBackends:
+    def test_stdlib_always_available(self):
+        backends = available_parser_backends()
+        assert 'json' in backends['json']
+        assert 'pyyaml' in backends['yaml']
+        assert 'etree' in backends['xml']
+
+    def test_set_backend_is_reported(self, parser_backend):
+        expected = {'json': 'json', 'yaml': 'pyyaml', 'xml': 'etree'}
+        for backend, kind in BACKENDS:
+            if backend == parser_backend and kind is not None:
+                expected[kind] = backend
+
+        assert get_parser_backends() == expected
+
+    def test_fastest_is_first(self):
+        use_fastest_parsers()
+        assert get_parser_backends() == {kind: backends[0]
+                                         for kind, backends in available_parser_backends().items()}
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            set_parser_backend('toml', 'json')
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            set_parser_backend('json', 'not a parser')
+
+    def test_falls_back_to_stdlib(self, monkeypatch):
+        def broken(data): raise RuntimeError('broken')
+
+        monkeypatch.setitem(converters._PARSER_BACKENDS['json'], 'broken', broken)
+        set_parser_backend('json', 'broken')
+        assert get_parser_backends()['json'] == 'broken'
+        assert parse_json('{"a": [1, 2]}') == {'a': [1, 2]}
+
+    def test_errors_come_from_stdlib(self):
+        with pytest.raises(json.JSONDecodeError):
+            parse_json('{"a": ')
+
+    def test_stdlib_from_environment(self):
+        # The variable is only read on import, so check it in a fresh interpreter rather than
+        # reloading the module every other test shares.
+        src = os.path.dirname(os.path.dirname(os.path.dirname(converters.__file__)))
+        env = dict(os.environ, FUNK_PY_STDLIB_PARSERS='1',
+                   PYTHONPATH=os.pathsep.join(filter(None, (src, os.environ.get('PYTHONPATH')))))
+        code = 'from funk_py.sorting.converters import get_parser_backends\n' \
+               'print(get_parser_backends())'
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True,
+                                text=True, check=True)
+        assert result.stdout.strip() == str({'json': 'json', 'yaml': 'pyyaml', 'xml': 'etree'})
+
+
+@pytest.mark.usefixtures('parser_backend')
+class TestJson:
+    VALUE = {KEYS[0]: [1, 2.5, None, True, False], KEYS[1]: {KEYS[2]: 'ünïcödé \u2603'},
+             KEYS[3]: []}
+
+    def test_parse_json(self):
+        assert parse_json(json.dumps(self.VALUE)) == self.VALUE
+
+    def test_parse_json_bytes(self):
+        assert parse_json(json.dumps(self.VALUE).encode()) == self.VALUE
+
+    def test_key_order_kept(self):
+        assert list(parse_json(json.dumps(self.VALUE))) == list(self.VALUE)
+
+    @pytest.mark.parametrize('_input,output', (
+        ('123456789012345678901234567890', 123456789012345678901234567890),
+        ('-18446744073709551617', -18446744073709551617),
+        ('{"a": 1, "a": 2}', {'a': 2}),
+        ('1e400', float('inf')),
+    ), ids=('big int', 'big negative int', 'duplicate keys', 'huge float'))
+    def test_matches_stdlib(self, _input, output):
+        assert parse_json(_input) == output == json.loads(_input)
+
+    def test_nan(self):
+        assert math.isnan(parse_json('NaN'))
+
+    def test_jsonl(self):
+        lines = [self.VALUE, [1, 2], {}]
+        assert jsonl_to_json('\n'.join(json.dumps(line) for line in lines)) == lines
+
+    @pytest.mark.parametrize('_input', (
+        '[1]\n{}\n',
+        '[1]\n\n{}\n\n',
+        '[1]\r\n{}\r\n',
+        ' [1]\n \n{}',
+    ), ids=('trailing newline', 'blank lines', 'crlf', 'whitespace'))
+    def test_jsonl_blank_lines(self, _input):
+        assert jsonl_to_json(_input) == jsonl_to_json(_input.encode()) == [[1], {}]
+
+    def test_wonky_json(self):
+        assert wonky_json_to_json("{'a': ['b', 'c\\'d', 'e\"f']}") == {'a': ['b', "c'd", 'e"f']}
+
+
+@pytest.mark.usefixtures('parser_backend')
+class TestIterJsonl:
+    ITEMS = [{'k0': i, 'k1': 'v' * (i % 7), 'k2': [None, True, i / 2]} for i in range(50)] + \
+        ['\u2028\u00e9', 123456789012345678901234567890]
+    DATA = '\n'.join(json.dumps(item, ensure_ascii=False) for item in ITEMS) + '\n'
+
+    @pytest.fixture(params=('str', 'bytes', 'memoryview', 'text file', 'binary file', 'path',
+                            'mmap'))
+    def source(self, request, tmp_path):
+        if request.param == 'str':
+            yield self.DATA
+
+        elif request.param == 'bytes':
+            yield self.DATA.encode()
+
+        elif request.param == 'memoryview':
+            yield memoryview(self.DATA.encode())
+
+        elif request.param == 'text file':
+            yield io.StringIO(self.DATA)
+
+        elif request.param == 'binary file':
+            yield io.BytesIO(self.DATA.encode())
+
+        else:
+            path = tmp_path / 'data.jsonl'
+            path.write_bytes(self.DATA.encode())
+            if request.param == 'path':
+                yield path
+
+            else:
+                with open(path, 'rb') as file, \
+                        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    yield mapped
+
+    @pytest.mark.parametrize('chunk_size', (1, 7, 100, 1 << 20))
+    def test_reads_every_source(self, source, chunk_size):
+        chunks = list(iter_jsonl(source, chunk_size))
+        assert [item for chunk in chunks for item in chunk] == self.ITEMS
+        if chunk_size == 1:
+            assert len(chunks) == len(self.ITEMS)
+
+    @pytest.mark.parametrize('pool', ('thread', 'process'))
+    def test_workers(self, tmp_path, pool):
+        path = tmp_path / 'data.jsonl'
+        path.write_text(self.DATA, encoding='utf-8')
+        for source in (path, self.DATA):
+            chunks = iter_jsonl(source, 100, workers=2, pool=pool)
+            assert [item for chunk in chunks for item in chunk] == self.ITEMS
+
+    def test_stops_early(self):
+        chunks = iter_jsonl(self.DATA, 1, workers=2, pool='thread')
+        assert next(chunks) == self.ITEMS[:1]
+        chunks.close()
+
+    def test_chunks_end_on_lines(self):
+        for chunk in iter_jsonl('[1]\n[2, 3]\n\n[4]', 4):
+            assert len(chunk) in (0, 1)
+
+    def test_empty(self, tmp_path):
+        path = tmp_path / 'empty.jsonl'
+        path.touch()
+        assert list(iter_jsonl(path)) == []
+        assert list(iter_jsonl('')) == []
+        assert jsonl_to_json('\n') == []
+
+    def test_leaves_file_open(self):
+        source = io.BytesIO(self.DATA.encode())
+        list(iter_jsonl(source))
+        assert not source.closed
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            list(iter_jsonl('[1]\n[2'))
+
+    @pytest.mark.parametrize('kwargs', (
+        {'chunk_size': 0},
+        {'workers': 0},
+        {'workers': 1, 'pool': 'fiber'},
+    ), ids=('chunk size', 'workers', 'pool'))
+    def test_bad_arguments(self, kwargs):
+        with pytest.raises(ValueError):
+            next(iter_jsonl(self.DATA, **kwargs))
+
+
+class TestJsonToJsonl:
+    ITEMS = [{'a': 1, 'b': [None, 'c']}, [1.5], 'd\ne', {}]
+
+    def test_str(self):
+        assert json_to_jsonl(self.ITEMS) == '{"a": 1, "b": [null, "c"]}\n[1.5]\n"d\\ne"\n{}'
+
+    @pytest.mark.parametrize('batch_size', (1, 3, 1024))
+    def test_writes_to_stream(self, batch_size):
+        stream = io.StringIO()
+        assert json_to_jsonl(iter(self.ITEMS), stream, batch_size) is None
+        assert stream.getvalue() == json_to_jsonl(self.ITEMS) + '\n'
+
+    def test_writes_to_path(self, tmp_path):
+        path = tmp_path / 'data.jsonl'
+        json_to_jsonl(self.ITEMS, path)
+        assert list(iter_jsonl(path)) == [self.ITEMS]
+
+    def test_replaces_or_appends_to_path(self, tmp_path):
+        path = tmp_path / 'data.jsonl'
+        json_to_jsonl(self.ITEMS, path)
+        json_to_jsonl(self.ITEMS[:2], path)
+        assert jsonl_to_json(path.read_text()) == self.ITEMS[:2]
+        json_to_jsonl(self.ITEMS[2:], path, append=True)
+        assert jsonl_to_json(path.read_text()) == self.ITEMS
+
+    def test_appends(self):
+        stream = io.StringIO()
+        json_to_jsonl(self.ITEMS[:2], stream)
+        json_to_jsonl(self.ITEMS[2:], stream)
+        assert jsonl_to_json(stream.getvalue()) == self.ITEMS
+
+    def test_bad_batch_size(self):
+        with pytest.raises(ValueError):
+            json_to_jsonl(self.ITEMS, io.StringIO(), 0)
+
+
+@pytest.mark.usefixtures('parser_backend')
+class TestJsonProjection:
+    DATA = {KEYS[0]: [{KEYS[1]: 1, KEYS[2]: '"]}[{\\'}, {KEYS[1]: [2, {KEYS[2]: None}]}],
+            KEYS[3]: {KEYS[4]: 1e10, KEYS[5]: [[], {}]}, KEYS[6]: 'ünïcödé'}
+
+    @pytest.mark.parametrize('projection,output', (
+        ({KEYS[0]: {KEYS[1]: None}}, {KEYS[0]: [{KEYS[1]: 1}, {KEYS[1]: [2, {KEYS[2]: None}]}]}),
+        ({KEYS[0]: {KEYS[2]: None}}, {KEYS[0]: [{KEYS[2]: '"]}[{\\'}, {}]}),
+        ({KEYS[3]: None, KEYS[6]: None}, {KEYS[3]: DATA[KEYS[3]], KEYS[6]: 'ünïcödé'}),
+        ({KEYS[3]: {KEYS[5]: {}}}, {KEYS[3]: {KEYS[5]: [[], {}]}}),
+        ({KEYS[9]: None}, {}),
+        ({}, {}),
+    ), ids=('nested', 'strings with brackets', 'whole values', 'empty projection inside',
+            'missing', 'nothing'))
+    def test_projection(self, projection, output):
+        for indent in (None, 4):
+            assert parse_json(json.dumps(self.DATA, indent=indent), projection) == output
+
+    def test_bytes(self):
+        assert parse_json(json.dumps(self.DATA).encode('utf-16'), {KEYS[6]: None}) \
+            == {KEYS[6]: 'ünïcödé'}
+
+    def test_duplicate_keys(self):
+        assert parse_json('{"a": 1, "b": 2, "a": 3}', {'a': None}) == {'a': 3}
+
+    @pytest.mark.parametrize('_input', (
+        '{"k0": [1, 2}', '{"k0": nope}', '{"k0" 1}', '{"k1": [1, 2}', '{"k1": "a}', '{"k0": 1} 2',
+        '{k0: 1}', '',
+    ))
+    def test_invalid(self, _input):
+        with pytest.raises(json.JSONDecodeError):
+            parse_json(_input, {KEYS[0]: None})
+
+
+@pytest.mark.usefixtures('parser_backend')
+class TestXmlProjection:
+    DATA = f'<{ROOT} {KEYS[1]}="{VALS[1]}"><{KEYS[2]}>{VALS[2]}</{KEYS[2]}>' \
+           f'<{KEYS[3]}><{KEYS[4]}>{VALS[4]}</{KEYS[4]}><{KEYS[5]} {KEYS[6]}="{VALS[6]}"/>' \
+           f'</{KEYS[3]}><{KEYS[3]}><{KEYS[4]}>{VALS[5]}</{KEYS[4]}></{KEYS[3]}></{ROOT}>'
+
+    @pytest.mark.parametrize('sans_attributes', (False, True),
+                             ids=('with attributes', 'sans attributes'))
+    @pytest.mark.parametrize('projection', (
+        {ROOT: {KEYS[3]: {KEYS[4]: None}}},
+        {ROOT: {KEYS[1]: None, KEYS[2]: None}},
+        {ROOT: {KEYS[3]: {KEYS[5]: {KEYS[6]: None}}}},
+        {ROOT: None},
+        {KEYS[9]: None},
+    ), ids=('repeated', 'attribute and text', 'deep attribute', 'everything', 'missing root'))
+    def test_projection(self, projection, sans_attributes):
+        def project(value, _projection):
+            if _projection is None:
+                return value
+
+            if isinstance(value, dict):
+                return {k: project(v, _projection[k]) for k, v in value.items() if k in _projection}
+
+            if isinstance(value, list):
+                return [project(v, _projection) for v in value]
+
+            return value
+
+        expected = project(xml_to_json(self.DATA, sans_attributes), projection)
+        assert xml_to_json(self.DATA, sans_attributes, projection) == expected
+
+    def test_unwanted_elements_are_dropped(self):
+        result = xml_to_json(self.DATA, False, {ROOT: {KEYS[2]: None}})
+        assert result == {ROOT: {KEYS[2]: VALS[2]}}
+
+    def test_same_as_parse_json(self):
+        projection = {'a': {'c': {'d': None}}}
+        assert xml_to_json('<a><b>1</b><c><d>2</d><e>3</e></c></a>', False, projection) \
+            == parse_json('{"a": {"b": "1", "c": {"d": "2", "e": "3"}}}', projection) \
+            == {'a': {'c': {'d': '2'}}}
+
+    def test_dropped_elements_keep_shape(self):
+        # c is still a dict holding its text, just as it would be if d had been kept.
+        result = xml_to_json('<a><c>t<d>1</d></c></a>', False, {'a': {'c': {'text': None}}})
+        assert result == {'a': {'c': {'text': 't'}}}
+
+    def test_invalid(self):
+        with pytest.raises(ET.ParseError):
+            xml_to_json('<k0><k1></k0>', False, {ROOT: None})
+
+
+class TestIterXml:
+    RECORDS = f'<{KEYS[3]} {KEYS[6]}="{VALS[6]}"><{KEYS[4]}>{VALS[4]}</{KEYS[4]}></{KEYS[3]}>' \
+              f'<{KEYS[3]}><{KEYS[4]}>{VALS[5]}</{KEYS[4]}><{KEYS[4]}/></{KEYS[3]}>' \
+              f'<{KEYS[5]}>{VALS[7]}</{KEYS[5]}><{KEYS[3]} {KEYS[6]}="{VALS[8]}"/>'
+    DATA = f'<{ROOT}><{KEYS[1]}>{VALS[1]}</{KEYS[1]}><{KEYS[2]}>{RECORDS}</{KEYS[2]}>' \
+           f'<{KEYS[2]}>{RECORDS}</{KEYS[2]}></{ROOT}>'
+    PATH = f'{ROOT}/{KEYS[2]}/{KEYS[3]}'
+
+    @pytest.fixture(params=('str', 'bytes', 'text file', 'binary file', 'path', 'mmap'))
+    def source(self, request, tmp_path):
+        if request.param == 'str':
+            yield self.DATA
+
+        elif request.param == 'bytes':
+            yield self.DATA.encode()
+
+        elif request.param == 'text file':
+            yield io.StringIO(self.DATA)
+
+        elif request.param == 'binary file':
+            yield io.BytesIO(self.DATA.encode())
+
+        else:
+            path = tmp_path / 'data.xml'
+            path.write_bytes(self.DATA.encode())
+            if request.param == 'path':
+                yield path
+
+            else:
+                with open(path, 'rb') as file, \
+                        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    yield mapped
+
+    @pytest.mark.parametrize('sans_attributes', (False, True),
+                             ids=('with attributes', 'sans attributes'))
+    def test_same_shape_as_xml_to_json(self, source, sans_attributes):
+        expected = [record for parent in xml_to_json(self.DATA, sans_attributes)[ROOT][KEYS[2]]
+                    for record in parent[KEYS[3]]]
+        assert list(iter_xml(source, self.PATH, sans_attributes)) == expected
+
+    def test_records(self):
+        records = [{KEYS[4]: VALS[4], KEYS[6]: VALS[6]}, {KEYS[4]: [VALS[5], {}]},
+                   {KEYS[6]: VALS[8]}]
+        assert list(iter_xml(self.DATA, self.PATH)) == records * 2
+
+    def test_records_sans_attributes(self):
+        records = [{KEYS[4]: VALS[4]}, {KEYS[4]: [VALS[5], {}]}, {KEYS[6]: VALS[8]}]
+        assert list(iter_xml(self.DATA, self.PATH, True)) == records * 2
+
+    def test_path_as_tags(self):
+        assert list(iter_xml(self.DATA, self.PATH.split('/'))) == list(iter_xml(self.DATA,
+                                                                                self.PATH))
+
+    def test_root_path(self):
+        assert list(iter_xml(self.DATA, ROOT)) == [xml_to_json(self.DATA)[ROOT]]
+
+    def test_missing_path(self):
+        assert list(iter_xml(self.DATA, f'{ROOT}/{KEYS[9]}')) == []
+        assert list(iter_xml(self.DATA, f'{KEYS[9]}/{KEYS[2]}')) == []
+
+    def test_is_lazy(self):
+        source = io.StringIO(f'<{ROOT}>' + f'<{KEYS[1]}>{VALS[1]}</{KEYS[1]}>' * 100_000
+                             + f'</{ROOT}>')
+        records = iter_xml(source, f'{ROOT}/{KEYS[1]}')
+        assert next(records) == VALS[1]
+        assert source.tell() < len(source.getvalue())
+
+    def test_consumed_elements_cleared(self, monkeypatch):
+        # Hold onto the root as it is parsed, to see what is left of it afterwards.
+        roots = []
+        iterparse = ET.iterparse
+
+        def spy(*args, **kwargs):
+            for event, element in iterparse(*args, **kwargs):
+                if not len(roots):
+                    roots.append(element)
+
+                yield event, element
+
+        class SlowReader(io.BytesIO):
+            # Only a few bytes are parsed ahead of each record when reads are this small.
+            def read(self, size=-1):
+                return super().read(16)
+
+        monkeypatch.setattr(ET, 'iterparse', spy)
+        count = 0
+        for _ in iter_xml(SlowReader(self.DATA.encode()), self.PATH):
+            count += 1
+            # Only the root, the records' parent, the current record and what has been parsed
+            # ahead of it should be left.
+            assert sum(1 for _ in roots[0].iter()) <= 7
+
+        assert count == 6
+        assert len(roots[0]) == 0
+
+    def test_empty_path(self):
+        with pytest.raises(ValueError):
+            next(iter_xml(self.DATA, ()))
+
+    def test_invalid(self):
+        with pytest.raises(ET.ParseError):
+            list(iter_xml('<k0><k1></k0>', ROOT))
+
+
+class TestJsonToXml:
+    DATA = {'a': {'b': {'c': {'text': '', 'd': 'e', 'f': 'g'}, 'h': 'i'},
+                  'j': {'k': {'l': [{'m': 'o', 'n': 'r'}, {'m': 'p', 'n': 's', 'text': 't'},
+                                    [{'m': 'q'}, 'u'], {'m': 'v', 'text': 'w'}],
+                              'x': {'y': ['ab', 'ac']}}}}}
+
+    @pytest.mark.parametrize('favor_attributes,avoid_text_and_elements,output', (
+        (False, True, '<a><b><c d="e" f="g" /><h>i</h></b><j><k><l><m>o</m><n>r</n></l>'
+                      '<l m="p" n="s">t</l><l m="q">u</l><l m="v">w</l><x><y>ab</y><y>ac</y></x>'
+                      '</k></j></a>'),
+        (False, False, '<a><b><c><d>e</d><f>g</f></c><h>i</h></b><j><k><l><m>o</m><n>r</n></l>'
+                       '<l>t<m>p</m><n>s</n></l><l>u<m>q</m></l><l>w<m>v</m></l>'
+                       '<x><y>ab</y><y>ac</y></x></k></j></a>'),
+        (True, True, '<a><b h="i"><c d="e" f="g" /></b><j><k><l m="o" n="r" />'
+                     '<l m="p" n="s">t</l><l m="q">u</l><l m="v">w</l><x><y>ab</y><y>ac</y></x>'
+                     '</k></j></a>'),
+    ), ids=('default', 'text and elements', 'favor attributes'))
+    def test_documented_output(self, favor_attributes, avoid_text_and_elements, output):
+        assert json_to_xml(self.DATA, favor_attributes, avoid_text_and_elements) == output
+
+    def test_escapes_like_elementtree(self):
+        data = {'r': {'a': '\u00e9<&>"\n', 'text': 'x<y\u20ac'}}
+        assert json_to_xml(data) == '<r a="&#233;&lt;&amp;&gt;&quot;&#10;">x&lt;y&#8364;</r>'
+        assert json_to_xml(data) == ET.tostring(ET.fromstring(json_to_xml(data))).decode()
+
+    @pytest.mark.parametrize('data,output', (
+        ({'r': None}, '<r>None</r>'),
+        ({'r': 1}, '<r>1</r>'),
+        ({'r': []}, '<r />'),
+        ({'r': {}}, '<r />'),
+        ({'r': [{'a': 1}, 'x', {'b': {'c': 2}}]}, '<r><a>1</a><b><c>2</c></b></r>'),
+    ), ids=('none', 'int', 'empty list', 'empty dict', 'list'))
+    def test_roots(self, data, output):
+        assert json_to_xml(data) == output
+
+    @pytest.mark.parametrize('data', (
+        {'{urn:a}r': {'{urn:b}x': 'v', 'y': [{'{urn:a}z': '1'}, {'{urn:c}z': {'text': 't'}}]}},
+        {'r': {'{http://purl.org/dc/elements/1.1/}title': 'v',
+               '{http://www.w3.org/XML/1998/namespace}lang': 'en', '{urn:a}e': None}},
+        {'r': [{'{urn:"&}x': 1}, {'x': {'{urn:b}y': 2}}]},
+    ), ids=('prefixes in order', 'well-known prefixes', 'list root'))
+    @pytest.mark.parametrize('favor_attributes', (False, True))
+    def test_namespaces_like_elementtree(self, data, favor_attributes):
+        def build(tag, val):
+            # Builds the tree the way json_to_xml did before it wrote XML itself.
+            element = ET.Element(tag)
+            for k, v in val.items():
+                if isinstance(v, dict):
+                    element.append(build(k, v))
+
+                elif favor_attributes:
+                    element.set(k, str(v))
+
+                else:
+                    element.append(child := ET.Element(k))
+                    child.text = None if v is None else str(v)
+
+            return element
+
+        key, val = next(iter(data.items()))
+        if isinstance(val, dict) and all(not isinstance(v, list) for v in val.values()):
+            assert json_to_xml(data, favor_attributes) == ET.tostring(build(key, val)).decode()
+
+        # Whatever the shape, the XML should read back to the same names.
+        result = json_to_xml(data, favor_attributes)
+        assert ET.tostring(ET.fromstring(result)).decode() == result
+
+    def test_namespaced_output(self):
+        data = {'{urn:a}r': {'{urn:b}x': 'v', 'y': {'{urn:a}z': '1'}}}
+        assert json_to_xml(data) == '<ns0:r xmlns:ns0="urn:a" xmlns:ns1="urn:b"><ns1:x>v</ns1:x>' \
+                                    '<y><ns0:z>1</ns0:z></y></ns0:r>'
+        assert json_to_xml(data, True) == \
+            '<ns0:r xmlns:ns0="urn:a" xmlns:ns1="urn:b" ns1:x="v"><y ns0:z="1" /></ns0:r>'
+
+    def test_namespaced_records(self):
+        with pytest.raises(ValueError):
+            json_to_xml(iter([{'{urn:a}x': 1}]), root='r')
+
+        with pytest.raises(ValueError):
+            json_to_xml(iter([{'x': 1}]), root='{urn:a}r')
+
+    def test_empty_dicts_in_lists(self):
+        assert json_to_xml({'r': {'a': [{}, {'text': None}, {'b': 1}]}}) == \
+            '<r><a /><a /><a><b>1</b></a></r>'
+
+    def test_erased_list_restored(self):
+        assert json_to_xml({'r': {'a': ['1', '2']}}, True) == '<r><a>1</a><a>2</a></r>'
+        assert json_to_xml({'r': {'a': ['1']}}, True) == '<r a="1" />'
+
+    def test_writes_to_stream(self):
+        stream = io.StringIO()
+        assert json_to_xml(self.DATA, stream=stream) is None
+        assert stream.getvalue() == json_to_xml(self.DATA)
+
+    def test_large_output_written_in_pieces(self):
+        data = {'r': {'i': [{'v': str(i), 'w': {'text': '\u00e9'}} for i in range(10_000)]}}
+        stream = io.StringIO()
+        json_to_xml(data, stream=stream)
+        assert stream.getvalue() == json_to_xml(data)
+        assert xml_to_json(stream.getvalue(), True) == \
+            {'r': {'i': [{'v': str(i), 'w': '\u00e9'} for i in range(10_000)]}}
+
+    @pytest.mark.parametrize('favor_attributes', (False, True))
+    def test_records(self, favor_attributes):
+        records = [{'i': {'v': 1, 'w': [1, 2]}}, {'i': [{'v': 2}, {'v': 3}], 'x': 'y'}, 'z', {}]
+        expected = json_to_xml({'r': records}, favor_attributes)
+        stream = io.StringIO()
+        assert json_to_xml(iter(records), favor_attributes, stream=stream, root='r') is None
+        assert stream.getvalue() == expected
+        assert json_to_xml(iter(records), favor_attributes, root='r') == expected
+
+    def test_no_records(self):
+        assert json_to_xml(iter(()), root='r') == '<r />'
+
+    def test_records_are_lazy(self):
+        stream = io.StringIO()
+
+        def records():
+            for i in range(10_000):
+                yield {'i': {'v': i}}
+
+            # Everything before the last few thousand pieces should have been written by now.
+            assert len(stream.getvalue())
+
+        json_to_xml(records(), stream=stream, root='r')
+
+    def test_root_needs_records(self):
+        with pytest.raises(TypeError):
+            json_to_xml(self.DATA, root='r')
+
+        with pytest.raises(TypeError):
+            json_to_xml([self.DATA])
+
+    @pytest.mark.parametrize('data', ({'a': 1, 'b': 2}, {}), ids=('many keys', 'empty'))
+    def test_bad_roots(self, data):
+        with pytest.raises(ValueError):
+            json_to_xml(data)
+
+    def test_root_must_be_str(self):
+        with pytest.raises(TypeError):
+            json_to_xml({1: 'a'})
+
+
+@pytest.mark.usefixtures('parser_backend')
+class TestYamlToJson:
+    def test_simple(self):
+        assert yaml_to_json('a: 1\nb:\n  - c\n  - 2.5\nd: null\n') \
+            == {'a': 1, 'b': ['c', 2.5], 'd': None}
+
+    def test_anchors(self):
+        assert yaml_to_json('a: &x [1, 2]\nb: *x\n') == {'a': [1, 2], 'b': [1, 2]}
+
+    def test_unsafe_tags_refused(self):
+        with pytest.raises(yaml.YAMLError):
+            yaml_to_json('!!python/object/apply:os.getcwd []')
+
+
+@pytest.mark.usefixtures('parser_backend')
+class TestXmlParsing:
+    def test_comments_and_instructions_left_out(self):
+        _input = '<?xml version="1.0"?><k0><!-- c --><?pi x?><k1>v</k1></k0>'
+        assert xml_to_json(_input) == {'k0': {'k1': 'v'}}
+
+    def test_entities(self):
+        _input = '<!DOCTYPE k0 [<!ENTITY e "v0">]><k0>&e;&amp;</k0>'
+        assert xml_to_json(_input) == {'k0': 'v0&'}
+
+    def test_errors_come_from_stdlib(self):
+        with pytest.raises(ET.ParseError):
+            xml_to_json('<k0>')
@@ -1,3 +1,5 @@
+import weakref
+
 import pytest
 
 from funk_py.sorting.pieces import fracture
@@ -178,3 +180,208 @@ def test_missing_keys(single_key_missing_from_some, data_missing_keys):
     inplace, _data = data_missing_keys
     result = list(fracture(_data, NAME))
     assert_correct(inplace, result, single_key_missing_from_some)
+
+
+@pytest.fixture
+def item1_unhashable(): return {NAME: [P1, P2], AGE: A1}
+
+
+@pytest.fixture
+def item2_unhashable(): return {NAME: {CITY: C1}, AGE: A2}
+
+
+@pytest.fixture
+def item3_unhashable(): return {NAME: [P1, P2], AGE: A3}
+
+
+@pytest.fixture
+def item4_unhashable(): return {NAME: (P1, P2), AGE: A4}
+
+
+@pytest.fixture
+def item5_unhashable(): return {NAME: {CITY: C1}, AGE: A1}
+
+
+@pytest.fixture(params=(False, True), ids=('not inplace', 'inplace'))
+def data_unhashable(
+        request,
+        item1_unhashable,
+        item2_unhashable,
+        item3_unhashable,
+        item4_unhashable,
+        item5_unhashable,
+):
+    items = [item1_unhashable, item2_unhashable, item3_unhashable, item4_unhashable,
+             item5_unhashable]
+    if request.param:
+        return True, items
+
+    return False, [item.copy() for item in items]
+
+
+@pytest.fixture
+def single_key_unhashable(
+        item1_unhashable,
+        item2_unhashable,
+        item3_unhashable,
+        item4_unhashable,
+        item5_unhashable,
+):
+    # A list and a tuple holding the same values are not equal, so they shouldn't be grouped.
+    return [
+        ({NAME: [P1, P2]}, [item1_unhashable, item3_unhashable]),
+        ({NAME: {CITY: C1}}, [item2_unhashable, item5_unhashable]),
+        ({NAME: (P1, P2)}, [item4_unhashable]),
+    ]
+
+
+def test_unhashable_values(single_key_unhashable, data_unhashable):
+    inplace, _data = data_unhashable
+    result = list(fracture(_data, NAME))
+    assert_correct(inplace, result, single_key_unhashable)
+
+
+def test_sets_group_with_frozensets():
+    items = [{NAME: {P1, P2}, AGE: A1}, {NAME: frozenset((P1, P2)), AGE: A2},
+             {NAME: {P1}, AGE: A3}]
+    result = list(fracture(items, NAME))
+    assert result == [({NAME: {P1, P2}}, [items[0], items[1]]), ({NAME: {P1}}, [items[2]])]
+
+
+def test_unordered(single_key, data):
+    inplace, _data = data
+    result = list(fracture(_data, NAME, ordered=False))
+    result.sort(key=lambda subset: subset[0][NAME])
+    assert_correct(inplace, result, sorted(single_key, key=lambda subset: subset[0][NAME]))
+
+
+@pytest.mark.parametrize('ordered', (True, False), ids=('ordered', 'unordered'))
+def test_unordered_lets_go_of_subsets(ordered):
+    class Item(dict):
+        pass
+
+    # Only references that the generator holds can keep these alive.
+    refs = []
+
+    def items():
+        for i in range(7):
+            refs.append(weakref.ref(item := Item({NAME: i % 3, AGE: i})))
+            yield item
+
+    subsets = fracture(items(), NAME, ordered=ordered)
+    next(subsets)
+    next(subsets)
+    # Unless subsets must be ordered, the first subset returned (which is not the one the last item
+    # went into) has been let go of.
+    assert sum(ref() is not None for ref in refs) == (7 if ordered else 5)
+
+
+def test_many_subsets_keep_first_seen_order():
+    _data = [{NAME: i % 1000, AGE: i} for i in range(100_000)]
+    result = list(fracture(_data, NAME))
+    assert [mark[NAME] for mark, _ in result] == list(range(1000))
+    assert all(len(subset) == 100 for _, subset in result)
+
+
+def _counting_generator(items: list, consumed: list):
+    for item in items:
+        consumed.append(item)
+        yield item
+
+
+def test_presorted_yields_before_input_ends():
+    _data = [{NAME: P1, AGE: A1}, {NAME: P1, AGE: A2}, {NAME: P2, AGE: A3}, {NAME: P3, AGE: A4}]
+    consumed = []
+    result = fracture(_counting_generator(_data, consumed), NAME, presorted=True)
+    assert next(result) == ({NAME: P1}, _data[:2])
+    # The first set can only be known to be closed once the first item of the next set is seen.
+    assert len(consumed) == 3
+    assert list(result) == [({NAME: P2}, [_data[2]]), ({NAME: P3}, [_data[3]])]
+
+
+def test_presorted_empty():
+    assert list(fracture(iter([]), NAME, presorted=True)) == []
+
+
+def test_max_idle():
+    _data = [
+        {NAME: P1, AGE: A1},
+        {NAME: P2, AGE: A2},
+        {NAME: P2, AGE: A3},
+        {NAME: P2, AGE: A4},
+        {NAME: P1, AGE: A2},
+    ]
+    result = list(fracture(iter(_data), NAME, max_idle=2))
+    # P1 goes idle for two items, so it is closed, and its second appearance starts a new set.
+    assert result == [
+        ({NAME: P1}, [_data[0]]),
+        ({NAME: P2}, _data[1:4]),
+        ({NAME: P1}, [_data[4]]),
+    ]
+
+
+@pytest.mark.parametrize('max_idle,expected', [
+    (1, [({NAME: P1}, [0]), ({NAME: P2}, [1]), ({NAME: P1}, [2])]),
+    (2, [({NAME: P2}, [1]), ({NAME: P1}, [0, 2])]),
+], ids=('closed', 'open'))
+def test_max_idle_boundary(max_idle, expected):
+    _data = [{NAME: P1, AGE: A1}, {NAME: P2, AGE: A2}, {NAME: P1, AGE: A3}]
+    result = list(fracture(iter(_data), NAME, max_idle=max_idle))
+    # A set is closed as soon as exactly max_idle items in a row have not belonged to it.
+    assert result == [(mark, [_data[i] for i in rows]) for mark, rows in expected]
+
+
+def test_max_idle_must_be_positive():
+    with pytest.raises(ValueError, match='max_idle must be at least 1.'):
+        list(fracture(iter([]), NAME, max_idle=0))
+
+
+def test_max_rows(data):
+    inplace, _data = data
+    result = list(fracture(iter(_data), NAME, inplace=inplace, max_rows=2))
+    # Each time a third item is held, the set that went longest without an item is closed.
+    assert_correct(inplace, result, [
+        ({NAME: P2}, [_data[1]]),
+        ({NAME: P1}, [_data[0], _data[2]]),
+        ({NAME: P3}, [_data[3]]),
+        ({NAME: P2}, [_data[4]]),
+    ])
+
+
+def test_max_rows_keeps_memory_bounded():
+    consumed = []
+    _data = ({NAME: i % 10, AGE: i} for i in range(10_000))
+    returned = 0
+    for _, subset in fracture(_counting_generator(_data, consumed), NAME, max_rows=100):
+        returned += len(subset)
+        assert len(consumed) - returned <= 100
+
+    assert returned == 10_000
+
+
+@pytest.mark.parametrize('spill_format', ('pickle', 'marshal', 'jsonl'))
+def test_spill_to_disk(spill_format, tmp_path):
+    _data = [{NAME: i % 50, AGE: i} for i in range(1_000)]
+    result = list(fracture(_data, NAME, ordered=False, spill_rows=100, spill_partitions=4,
+                           spill_format=spill_format, spill_dir=str(tmp_path)))
+    result.sort(key=lambda subset: subset[0][NAME])
+    assert result == list(fracture(_data, NAME))
+    # The temporary files should be cleaned up once everything has been returned.
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spill_not_needed(data):
+    inplace, _data = data
+    result = list(fracture(_data, NAME, inplace=inplace, ordered=False, spill_rows=100))
+    assert_correct(inplace, result, list(fracture(_data, NAME)))
+
+
+def test_spill_requires_unordered():
+    with pytest.raises(ValueError):
+        list(fracture([{NAME: P1}], NAME, spill_rows=1))
+
+
+def test_spill_invalid_format():
+    with pytest.raises(ValueError):
+        list(fracture([{NAME: P1}, {NAME: P2}], NAME, ordered=False, spill_rows=1,
+                      spill_format='llama'))
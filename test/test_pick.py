@@ -1,8 +1,12 @@
 from collections import namedtuple
 from copy import deepcopy
+import asyncio
 import csv
 import io
 import json
+import pickle
+from array import array
+import sys
 from typing import List, Any, Union, Tuple, Dict, Optional, Callable
 import yaml
 
@@ -10,7 +14,10 @@ import pytest
 
 from funk_py.modularity.basic_structures import pass_, Speed
 from funk_py.sorting.dict_manip import align_to_list, nest_under_keys
-from funk_py.sorting.pieces import pick, PickType
+from funk_py.sorting.pieces import pick, PickType, compile_pick, pick_many, iter_pick, \
+    PickInstruction, parse_type_as, ParseCache, enable_parse_cache, disable_parse_cache, \
+    get_parse_cache, enable_projected_parsing, disable_projected_parsing, pick_columns, \
+    PickProfile, pick_many_async
 from funk_py.sorting.converters import json_to_xml, json_to_csv, json_to_jsonl
 
 
@@ -1467,3 +1474,589 @@ class TestAccumulate:
         output_map, _dict = less_danger_dict
         ans = pick(output_map, _dict, self.pick_type)
         assert ans == [{OUT_KEYS[1]: [VALS1[0]]}]
+
+
+@pytest.fixture(params=tuple(PickType), ids=tuple(t.value for t in PickType))
+def pick_type(request): return request.param
+
+
+class TestCompiledPick:
+    @staticmethod
+    def assert_matches_pick(output_map, _input, pick_type):
+        # Some pick types extend lists found in the input, so give each its own copy.
+        expected = pick(output_map, deepcopy(_input), pick_type)
+        compiled = compile_pick(output_map, pick_type)
+        assert compiled(deepcopy(_input)) == expected
+        # A compiled pick should be reusable.
+        assert compiled(deepcopy(_input)) == expected
+
+    def test_simple_lists(self, similar_lists, pick_type):
+        t = similar_lists
+        self.assert_matches_pick(t.output_map1, t.list1, pick_type)
+        self.assert_matches_pick(t.output_map2, t.list2, pick_type)
+
+    def test_single_dict_nested_lists(self, dicts_with_one_nested_list, pick_type):
+        t = dicts_with_one_nested_list
+        self.assert_matches_pick(t.output_map1, t.list1, pick_type)
+        self.assert_matches_pick(t.output_map2, t.list2, pick_type)
+
+    def test_dict_nested_lists_in_list(self, dict_with_two_nested_similar_lists_in_list,
+                                       pick_type):
+        t = dict_with_two_nested_similar_lists_in_list
+        self.assert_matches_pick(t.output_map, t.dict, pick_type)
+
+    def test_dict_nested_dissimilar_lists_in_list(
+            self,
+            dict_with_two_nested_dissimilar_lists_in_list,
+            pick_type
+    ):
+        t = dict_with_two_nested_dissimilar_lists_in_list
+        self.assert_matches_pick(t.output_map, t.dict, pick_type)
+
+    def test_dict_nested_dissimilar_lists_under_keys(self, two_nested_lists_under_keys,
+                                                     pick_type):
+        t = two_nested_lists_under_keys
+        self.assert_matches_pick(t.output_map, t.dict, pick_type)
+
+    def test_dict_with_list_of_dicts(self, dict_with_list_of_dicts, pick_type):
+        t = dict_with_list_of_dicts
+        self.assert_matches_pick(t.output_map, t.dict, pick_type)
+
+    def test_dict_nested_dissimilar_lists_under_double_keys(
+            self,
+            two_nested_lists_under_double_keys,
+            pick_type
+    ):
+        t = two_nested_lists_under_double_keys
+        self.assert_matches_pick(t.output_map, t.dict, pick_type)
+
+    def test_complicated_dict1(self, complicated_dict1, pick_type):
+        t = complicated_dict1
+        self.assert_matches_pick(t.output_map, t.dict, pick_type)
+
+    def test_danger_dict(self, danger_dict, pick_type):
+        self.assert_matches_pick(*danger_dict, pick_type)
+
+    def test_less_danger_dict(self, less_danger_dict, pick_type):
+        self.assert_matches_pick(*less_danger_dict, pick_type)
+
+    @pytest.mark.parametrize('_input', (
+        {KEYS[0]: '{"k1": 1}'},
+        {KEYS[0]: 'not json'},
+        {KEYS[0]: '[{"k1": 1}, {"k1": 2}]'},
+        {KEYS[0]: ['{"k1": 1}', '{"k1": 2}']},
+        [{KEYS[0]: '{"k1": 1}'}, 7],
+        'llama',
+    ), ids=('json', 'bad json', 'json list', 'list of json', 'list with non-dict', 'non-dict'))
+    def test_instructions_and_failures(self, _input, pick_type):
+        output_map = {KEYS[0]: ['json', {KEYS[1]: OUT_KEYS[1]}], KEYS[2]: OUT_KEYS[2]}
+        self.assert_matches_pick(output_map, _input, pick_type)
+
+    def test_mode_switch(self, pick_type):
+        output_map = {KEYS[0]: ['tandem', {KEYS[1]: OUT_KEYS[1], KEYS[2]: OUT_KEYS[2]}],
+                      KEYS[3]: OUT_KEYS[3]}
+        _input = {KEYS[0]: [{KEYS[1]: 1, KEYS[2]: 2}, {KEYS[1]: 3}], KEYS[3]: 4}
+        self.assert_matches_pick(output_map, _input, pick_type)
+
+    def test_every_nested_path_is_followed(self, pick_type):
+        output_map = {key: {KEYS[10]: out_key} for key, out_key in zip(KEYS[:4], OUT_KEYS)}
+        _input = {key: {KEYS[10]: i} for i, key in enumerate(KEYS[:4])}
+        ans = pick(output_map, _input, pick_type)
+        if pick_type is PickType.ACCUMULATE:
+            assert ans == [{out_key: [i] for i, out_key in enumerate(OUT_KEYS[:4])}]
+
+        else:
+            assert ans == [{out_key: i for i, out_key in enumerate(OUT_KEYS[:4])}]
+
+        self.assert_matches_pick(output_map, _input, pick_type)
+
+    @pytest.mark.parametrize('output_map,error', (
+        ({KEYS[0]: []}, ValueError),
+        ({KEYS[0]: ['not-a-type', OUT_KEYS[0]]}, ValueError),
+        ({KEYS[0]: 5}, TypeError),
+    ), ids=('empty list', 'unknown instruction', 'invalid instruction'))
+    def test_invalid_output_map(self, output_map, error):
+        with pytest.raises(error):
+            compile_pick(output_map)
+
+
+class TestPickMany:
+    OUTPUT_MAP = {KEYS[0]: ['json', {KEYS[1]: OUT_KEYS[1], KEYS[2]: ['e-list', OUT_KEYS[2]]}],
+                  KEYS[3]: OUT_KEYS[3]}
+
+    @pytest.fixture
+    def inputs(self):
+        return [{KEYS[0]: json.dumps({KEYS[1]: i, KEYS[2]: list(range(i % 3))}), KEYS[3]: -i}
+                for i in range(50)]
+
+    def test_matches_pick(self, inputs, pick_type):
+        expected = [pick(self.OUTPUT_MAP, _input, pick_type) for _input in deepcopy(inputs)]
+        assert list(pick_many(self.OUTPUT_MAP, deepcopy(inputs), pick_type)) == expected
+
+    def test_consumes_generators(self, inputs):
+        results = pick_many(self.OUTPUT_MAP, (_input for _input in inputs))
+        assert next(results) == pick(self.OUTPUT_MAP, inputs[0])
+
+    @pytest.mark.parametrize('pool', ('thread', 'process'))
+    def test_workers(self, inputs, pool):
+        expected = [pick(self.OUTPUT_MAP, _input) for _input in deepcopy(inputs)]
+        assert list(pick_many(self.OUTPUT_MAP, inputs, workers=2, pool=pool,
+                              chunk_size=7)) == expected
+
+    def test_stop_early(self, inputs):
+        results = pick_many(self.OUTPUT_MAP, iter(inputs), workers=2, pool='thread', chunk_size=2)
+        assert next(results) == pick(self.OUTPUT_MAP, inputs[0])
+        results.close()
+
+    @pytest.mark.parametrize('kwargs', (
+        {'workers': 0}, {'workers': 2, 'chunk_size': 0}, {'workers': 2, 'pool': 'fiber'},
+    ), ids=('no workers', 'empty chunks', 'unknown pool'))
+    def test_invalid_arguments(self, inputs, kwargs):
+        with pytest.raises(ValueError):
+            next(pick_many(self.OUTPUT_MAP, inputs, **kwargs))
+
+    def test_compiled_pick_pickles(self, inputs):
+        compiled = pickle.loads(pickle.dumps(compile_pick(self.OUTPUT_MAP)))
+        assert compiled(inputs[1]) == pick(self.OUTPUT_MAP, inputs[1])
+
+
+class TestPickManyAsync:
+    OUTPUT_MAP = TestPickMany.OUTPUT_MAP
+
+    @pytest.fixture
+    def inputs(self):
+        return [{KEYS[0]: json.dumps({KEYS[1]: i, KEYS[2]: list(range(i % 3))}), KEYS[3]: -i}
+                for i in range(50)]
+
+    @staticmethod
+    async def arrive(inputs: list, log: list = None):
+        for _input in inputs:
+            # Give the event loop a chance to run something else, as a network read would.
+            await asyncio.sleep(0)
+            if log is not None:
+                log.append(_input)
+
+            yield _input
+
+    @staticmethod
+    async def collect(results, limit: int = None) -> list:
+        collected = []
+        async for result in results:
+            collected.append(result)
+            if limit is not None and len(collected) >= limit:
+                break
+
+        return collected
+
+    @pytest.mark.parametrize('pool,chunk_size', (('thread', 1), ('thread', 7), ('process', 4)))
+    def test_matches_pick(self, inputs, pick_type, pool, chunk_size):
+        if pool == 'process' and pick_type is not PickType.COMBINATORIAL:
+            pytest.skip('Process pools are slow to start; one pick type is enough.')
+
+        expected = [pick(self.OUTPUT_MAP, _input, pick_type) for _input in deepcopy(inputs)]
+        results = pick_many_async(self.OUTPUT_MAP, self.arrive(inputs), pick_type, workers=2,
+                                  pool=pool, chunk_size=chunk_size)
+        assert asyncio.run(self.collect(results)) == expected
+
+    def test_backpressure(self, inputs):
+        read = []
+
+        async def consume():
+            results = pick_many_async(self.OUTPUT_MAP, self.arrive(inputs, read), workers=2)
+            first = await results.__anext__()
+            # Two chunks per worker may be waiting, and one more input read before the limit was
+            # noticed, but nothing beyond that.
+            assert len(read) <= 5
+            await results.aclose()
+            return first
+
+        assert asyncio.run(consume()) == pick(self.OUTPUT_MAP, inputs[0])
+        assert len(read) < len(inputs)
+
+    def test_stop_early(self, inputs):
+        results = pick_many_async(self.OUTPUT_MAP, self.arrive(inputs), workers=2, chunk_size=3)
+        assert asyncio.run(self.collect(results, 4)) \
+            == [pick(self.OUTPUT_MAP, _input) for _input in inputs[:4]]
+
+    def test_empty(self):
+        assert asyncio.run(self.collect(pick_many_async(self.OUTPUT_MAP, self.arrive([])))) == []
+
+    @pytest.mark.parametrize('kwargs', (
+        {'workers': 0}, {'chunk_size': 0}, {'pool': 'fiber'},
+    ), ids=('no workers', 'empty chunks', 'unknown pool'))
+    def test_invalid_arguments(self, inputs, kwargs):
+        with pytest.raises(ValueError):
+            asyncio.run(self.collect(pick_many_async(self.OUTPUT_MAP, self.arrive(inputs),
+                                                     **kwargs)))
+
+
+class TestDeepPick:
+    @staticmethod
+    def make_deep_map(depth: int):
+        output_map = OUT_KEYS[0]
+        _dict = VALS1[0]
+        for i in range(depth):
+            output_map = {KEYS[0]: output_map, KEYS[1]: OUT_KEYS[1]}
+            _dict = {KEYS[0]: _dict, KEYS[1]: i}
+
+        return output_map, _dict
+
+    def test_deeper_than_recursion_limit(self, pick_type):
+        depth = sys.getrecursionlimit() * 2
+        output_map, _dict = self.make_deep_map(depth)
+        ans = pick(output_map, _dict, pick_type)
+        if pick_type is PickType.ACCUMULATE:
+            assert ans == [{OUT_KEYS[0]: [VALS1[0]], OUT_KEYS[1]: list(range(depth))}]
+
+        else:
+            # Each level's static values are applied over the levels below it, so the outermost
+            # wins.
+            assert ans == [{OUT_KEYS[0]: VALS1[0], OUT_KEYS[1]: depth - 1}]
+
+    def test_deeply_nested_lists(self, pick_type):
+        _input = {KEYS[0]: VALS1[0]}
+        for _ in range(sys.getrecursionlimit() * 2):
+            _input = [_input]
+
+        ans = pick({KEYS[0]: OUT_KEYS[0]}, _input, pick_type)
+        if pick_type is PickType.ACCUMULATE:
+            assert ans == [{OUT_KEYS[0]: [VALS1[0]]}]
+
+        else:
+            assert ans == [{OUT_KEYS[0]: VALS1[0]}]
+
+
+class TestIterPick:
+    @staticmethod
+    def assert_matches_pick(output_map, _input, pick_type):
+        expected = pick(output_map, deepcopy(_input), pick_type)
+        assert list(iter_pick(output_map, deepcopy(_input), pick_type)) == expected
+
+    def test_simple_lists(self, similar_lists, pick_type):
+        t = similar_lists
+        self.assert_matches_pick(t.output_map1, t.list1, pick_type)
+        self.assert_matches_pick(t.output_map2, t.list2, pick_type)
+
+    def test_dict_nested_dissimilar_lists_under_keys(self, two_nested_lists_under_keys,
+                                                     pick_type):
+        t = two_nested_lists_under_keys
+        self.assert_matches_pick(t.output_map, t.dict, pick_type)
+
+    def test_dict_with_list_of_dicts(self, dict_with_list_of_dicts, pick_type):
+        t = dict_with_list_of_dicts
+        self.assert_matches_pick(t.output_map, t.dict, pick_type)
+
+    def test_complicated_dict1(self, complicated_dict1, pick_type):
+        t = complicated_dict1
+        self.assert_matches_pick(t.output_map, t.dict, pick_type)
+
+    def test_danger_dict(self, danger_dict, pick_type):
+        self.assert_matches_pick(*danger_dict, pick_type)
+
+    def test_less_danger_dict(self, less_danger_dict, pick_type):
+        self.assert_matches_pick(*less_danger_dict, pick_type)
+
+    @pytest.mark.parametrize('mode', (COM, TAN, RED, ACC))
+    def test_mode_switch(self, pick_type, mode):
+        output_map = {KEYS[0]: [mode, {KEYS[1]: {KEYS[2]: OUT_KEYS[2]},
+                                       KEYS[3]: {KEYS[4]: OUT_KEYS[4]}}],
+                      KEYS[5]: {KEYS[6]: OUT_KEYS[6]}, KEYS[7]: OUT_KEYS[7]}
+        _input = {
+            KEYS[0]: {KEYS[1]: [{KEYS[2]: v} for v in VALS1],
+                      KEYS[3]: [{KEYS[4]: v} for v in VALS2[:2]]},
+            KEYS[5]: [{KEYS[6]: v} for v in VALS3[:2]],
+            KEYS[7]: VALS4[0],
+        }
+        self.assert_matches_pick(output_map, _input, pick_type)
+
+    def test_combinations_are_built_lazily(self):
+        # 50 ** 6 combinations could never be built all at once, but the first few can be.
+        output_map = {key: {KEYS[10]: out_key} for key, out_key in zip(KEYS[:6], OUT_KEYS)}
+        _input = {key: [{KEYS[10]: i} for i in range(50)] for key in KEYS[:6]}
+        rows = iter_pick(output_map, _input)
+        assert next(rows) == {out_key: 0 for out_key in OUT_KEYS[:6]}
+        assert next(rows) == {**{out_key: 0 for out_key in OUT_KEYS[1:6]}, OUT_KEYS[0]: 1}
+
+
+class TestParseCache:
+    JSON_STR = json.dumps({KEYS[0]: [VALS1[0], VALS1[1]], KEYS[1]: {KEYS[2]: VALS2[0]}})
+
+    @pytest.fixture
+    def cache(self):
+        yield enable_parse_cache(max_size=2)
+        disable_parse_cache()
+
+    def test_disabled_by_default(self):
+        assert get_parse_cache() is None
+
+    def test_hits_and_misses(self, cache):
+        first = parse_type_as(PickInstruction.JSON, self.JSON_STR, [])
+        second = parse_type_as('json', self.JSON_STR, [])
+        assert first == second == json.loads(self.JSON_STR)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_results_are_copies(self, cache):
+        parse_type_as(PickInstruction.JSON, self.JSON_STR, [])[KEYS[0]].append(VALS1[2])
+        result = parse_type_as(PickInstruction.JSON, self.JSON_STR, [])
+        result[KEYS[1]][KEYS[2]] = VALS2[1]
+        assert parse_type_as(PickInstruction.JSON, self.JSON_STR, []) == json.loads(self.JSON_STR)
+
+    def test_results_that_cannot_be_marshalled(self, cache):
+        yaml_str = 'when: 2024-01-02\nitems: [1, 2]'
+        expected = yaml.safe_load(yaml_str)
+        parse_type_as(PickInstruction.YAML, yaml_str, [])['items'].append(3)
+        assert parse_type_as(PickInstruction.YAML, yaml_str, []) == expected
+        assert cache.hits == 1
+
+    def test_yaml_aliases_stay_shared(self, cache):
+        yaml_str = 'a: &x [1, 2]\nb: *x'
+        for _ in range(2):
+            result = parse_type_as(PickInstruction.YAML, yaml_str, [])
+            assert result == {'a': [1, 2], 'b': [1, 2]}
+            assert result['a'] is result['b']
+
+        assert cache.hits == 1
+
+    def test_least_recently_used_are_dropped(self, cache):
+        strings = [json.dumps([i]) for i in range(3)]
+        parse_type_as(PickInstruction.JSON, strings[0], [])
+        parse_type_as(PickInstruction.JSON, strings[1], [])
+        parse_type_as(PickInstruction.JSON, strings[0], [])
+        parse_type_as(PickInstruction.JSON, strings[2], [])
+        assert len(cache) == 2
+        parse_type_as(PickInstruction.JSON, strings[0], [])
+        assert (cache.hits, cache.misses) == (2, 3)
+        parse_type_as(PickInstruction.JSON, strings[1], [])
+        assert (cache.hits, cache.misses) == (2, 4)
+
+    def test_instructions_are_kept_apart(self, cache):
+        assert parse_type_as(PickInstruction.JSON, '[1, 2]', []) == [1, 2]
+        assert parse_type_as(PickInstruction.YAML, '[1, 2]', []) == [1, 2]
+        assert cache.misses == 2
+
+    def test_only_strings_are_cached(self, cache):
+        parse_type_as(PickInstruction.ELIST, [1], [])
+        parse_type_as(PickInstruction.TUPLE_DICT, [{'key': 'a', 'value': 1}], [])
+        assert len(cache) == 0
+
+    def test_pick_matches_uncached(self, cache, pick_type):
+        output_map = {KEYS[0]: ['json', {KEYS[0]: OUT_KEYS[0], KEYS[1]: {KEYS[2]: OUT_KEYS[2]}}]}
+        inputs = [{KEYS[0]: self.JSON_STR} for _ in range(3)]
+        results = [pick(output_map, _input, pick_type) for _input in inputs]
+        disable_parse_cache()
+        assert results == [pick(output_map, inputs[0], pick_type)] * 3
+        assert cache.hits == 2
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            ParseCache(0)
+
+
+class TestProjectedParsing:
+    DATA = {KEYS[0]: [{KEYS[1]: VALS1[i], KEYS[2]: VALS2[i], KEYS[3]: {KEYS[4]: VALS3[i]}}
+                      for i in range(3)],
+            KEYS[5]: {KEYS[6]: VALS4[0], KEYS[7]: [VALS4[1], {KEYS[8]: VALS4[2]}]}}
+    MAPS = (
+        {KEYS[0]: {KEYS[1]: OUT_KEYS[1]}},
+        {KEYS[0]: [TAN, {KEYS[1]: OUT_KEYS[1], KEYS[3]: {KEYS[4]: OUT_KEYS[4]}}],
+         KEYS[5]: {KEYS[6]: OUT_KEYS[6]}},
+        {KEYS[5]: {KEYS[7]: OUT_KEYS[7]}, KEYS[0]: ['e-list', {KEYS[2]: OUT_KEYS[2]}]},
+        {KEYS[5]: {KEYS[7]: {KEYS[8]: OUT_KEYS[8]}}, KEYS[9]: OUT_KEYS[9]},
+    )
+
+    @pytest.fixture
+    def projected(self):
+        enable_projected_parsing(0)
+        yield
+        disable_projected_parsing()
+
+    @pytest.fixture(params=range(len(MAPS)))
+    def inner_map(self, request): return self.MAPS[request.param]
+
+    @pytest.fixture(params=('json', 'xml', 'xml-sa'))
+    def projected_input(self, request, inner_map):
+        if request.param == 'json':
+            data = json.dumps(self.DATA)
+            output_map = {DATA_KEY1: ['json', inner_map]}
+
+        else:
+            data = json_to_xml({DATA_KEY2: self.DATA})
+            output_map = {DATA_KEY1: [request.param, {DATA_KEY2: inner_map}]}
+
+        return output_map, {DATA_KEY1: data}
+
+    def test_matches_full_parse(self, projected_input, pick_type, projected):
+        output_map, _input = projected_input
+        result = pick(output_map, _input, pick_type)
+        disable_projected_parsing()
+        assert result == pick(output_map, _input, pick_type)
+
+    def test_compiled_matches_full_parse(self, projected_input, pick_type, projected):
+        output_map, _input = projected_input
+        result = compile_pick(output_map, pick_type)(_input)
+        disable_projected_parsing()
+        assert result == pick(output_map, _input, pick_type)
+
+    def test_only_needed_keys_are_built(self, projected):
+        result = parse_type_as('json', json.dumps(self.DATA), [], self.MAPS[0])
+        assert result == {KEYS[0]: [{KEYS[1]: VALS1[i]} for i in range(3)]}
+
+    def test_small_strings_are_parsed_whole(self):
+        enable_projected_parsing(10 ** 6)
+        try:
+            assert parse_type_as('json', json.dumps(self.DATA), [], self.MAPS[0]) == self.DATA
+
+        finally:
+            disable_projected_parsing()
+
+    def test_disabled_by_default(self):
+        assert parse_type_as('json', json.dumps(self.DATA), [], self.MAPS[0]) == self.DATA
+
+    def test_not_cached(self, projected):
+        cache = enable_parse_cache()
+        try:
+            parse_type_as('json', json.dumps(self.DATA), [], self.MAPS[0])
+            assert len(cache) == 0
+
+        finally:
+            disable_parse_cache()
+
+    def test_invalid_kept_data(self, projected):
+        assert pick({DATA_KEY1: ['json', self.MAPS[0]]},
+                    {DATA_KEY1: '{"k0": [{"k1": nope}]}'}) == []
+
+    def test_invalid_min_size(self):
+        with pytest.raises(ValueError):
+            enable_projected_parsing(-1)
+
+
+class TestPickColumns:
+    OUTPUT_MAP = {DATA_KEY1: {KEYS[0]: OUT_KEYS[0], KEYS[1]: OUT_KEYS[1], KEYS[2]: OUT_KEYS[2],
+                              KEYS[3]: OUT_KEYS[3]}}
+
+    @pytest.fixture
+    def rows(self):
+        return {DATA_KEY1: [{KEYS[0]: i, KEYS[1]: i / 2, KEYS[2]: VALS1[i], KEYS[3]: [i, i + 1]}
+                            for i in range(3)]}
+
+    def test_typed_columns(self, rows):
+        result = pick_columns(self.OUTPUT_MAP, rows)
+        assert result == {OUT_KEYS[0]: array('q', [0, 1, 2]), OUT_KEYS[1]: array('d', [0, .5, 1]),
+                          OUT_KEYS[2]: VALS1, OUT_KEYS[3]: array('q', [0, 1, 1, 2, 2, 3])}
+
+    def test_matches_accumulate(self, rows):
+        expected = pick(self.OUTPUT_MAP, rows, PickType.ACCUMULATE)[0]
+        assert {k: list(v) for k, v in pick_columns(self.OUTPUT_MAP, rows).items()} == expected
+
+    @pytest.mark.parametrize('values', (
+        [1, 2.5], [1.5, 2], [1, True], [True, False], [1, 2 ** 70], [1, None], [1, '2'],
+    ), ids=('int then float', 'float then int', 'int then bool', 'bools', 'huge int', 'none',
+            'string'))
+    def test_mixed_values_stay_exact(self, values):
+        result = pick_columns({DATA_KEY1: {KEYS[0]: OUT_KEYS[0]}},
+                              {DATA_KEY1: [{KEYS[0]: v} for v in values]})
+        assert type(result[OUT_KEYS[0]]) is list
+        assert [(type(v), v) for v in result[OUT_KEYS[0]]] == [(type(v), v) for v in values]
+
+    def test_single_value(self):
+        assert pick_columns({KEYS[0]: OUT_KEYS[0]}, {KEYS[0]: 1}) == {OUT_KEYS[0]: array('q', [1])}
+
+    def test_nothing_found(self):
+        assert pick_columns({KEYS[0]: OUT_KEYS[0]}, {KEYS[1]: 1}) == {}
+
+    def test_changed_pick_type(self, rows):
+        result = pick_columns([TAN, self.OUTPUT_MAP], rows)
+        assert result[OUT_KEYS[0]] == array('q', [0, 1, 2])
+        assert result[OUT_KEYS[3]] == array('q', [0, 1, 1, 2, 2, 3])
+
+    def test_input_untouched(self, rows):
+        expected = deepcopy(rows)
+        pick_columns(self.OUTPUT_MAP, rows)
+        pick(self.OUTPUT_MAP, rows, PickType.ACCUMULATE)
+        assert rows == expected
+
+    def test_accumulate_keeps_every_row_of_a_nested_result(self):
+        output_map = {DATA_KEY1: [TAN, {KEYS[0]: OUT_KEYS[0],
+                                        KEYS[1]: [ACC, {KEYS[2]: OUT_KEYS[2]}]}]}
+        _input = {DATA_KEY1: {KEYS[0]: VALS1[0], KEYS[1]: [{KEYS[2]: 1}, {KEYS[2]: 2}]}}
+        # The tandem pick gives a row for each item in the list, and every one of them counts.
+        assert pick(output_map, _input, PickType.ACCUMULATE) \
+            == [{OUT_KEYS[2]: [1, 2], OUT_KEYS[0]: [VALS1[0], VALS1[0]]}]
+
+
+class TestPickProfile:
+    OUTPUT_MAP = {KEYS[0]: OUT_KEYS[0],
+                  DATA_KEY1: ['json', {KEYS[1]: {KEYS[2]: OUT_KEYS[2],
+                                                 KEYS[3]: ['xml', {KEYS[4]: OUT_KEYS[4]}]}}]}
+
+    @pytest.fixture
+    def _input(self):
+        items = [{KEYS[2]: VALS1[i], KEYS[3]: f'<{KEYS[4]}>{VALS2[i]}</{KEYS[4]}>'}
+                 for i in range(3)]
+        items.append({KEYS[2]: VALS1[0], KEYS[3]: '<broken'})
+        return {KEYS[0]: VALS3[0], DATA_KEY1: json.dumps({KEYS[1]: items})}
+
+    @pytest.fixture
+    def profile(self, _input):
+        with PickProfile() as profile:
+            self.result = pick(self.OUTPUT_MAP, _input)
+
+        return profile
+
+    def test_results_unchanged(self, _input, profile):
+        assert self.result == pick(self.OUTPUT_MAP, _input)
+
+    def test_paths(self, profile):
+        paths = {path: (calls, rows) for path, (calls, seconds, rows) in profile.paths.items()}
+        assert paths == {
+            (): (1, 4),
+            (DATA_KEY1,): (1, 4),
+            (DATA_KEY1, KEYS[1]): (1, 4),
+            (DATA_KEY1, KEYS[1], '[]'): (4, 4),
+            (DATA_KEY1, KEYS[1], '[]', KEYS[3]): (3, 3),
+        }
+        assert all(seconds >= 0 for calls, seconds, rows in profile.paths.values())
+
+    def test_parses(self, _input, profile):
+        json_stats = profile.parses[((DATA_KEY1,), 'json')]
+        assert (json_stats[0], json_stats[2], json_stats[3]) == (1, len(_input[DATA_KEY1]), 0)
+        xml_stats = profile.parses[((DATA_KEY1, KEYS[1], '[]', KEYS[3]), 'xml')]
+        assert (xml_stats[0], xml_stats[3]) == (4, 1)
+
+    def test_compiled_picks_are_recorded(self, _input):
+        compiled = compile_pick(self.OUTPUT_MAP)
+        with PickProfile() as profile:
+            result = compiled(_input)
+
+        assert result == pick(self.OUTPUT_MAP, _input)
+        assert profile.paths[()][0] == 1
+
+    def test_only_recorded_while_in_use(self, _input, profile):
+        before = deepcopy(profile.paths)
+        pick(self.OUTPUT_MAP, _input)
+        assert profile.paths == before
+
+    def test_nested_profiles(self, _input):
+        with PickProfile() as outer:
+            with PickProfile() as inner:
+                pick(self.OUTPUT_MAP, _input)
+
+            pick(self.OUTPUT_MAP, _input)
+
+        assert inner.paths[()][0] == outer.paths[()][0] == 1
+
+    def test_json(self, profile):
+        data = json.loads(profile.to_json())
+        assert {tuple(p['path']) for p in data['paths']} == set(profile.paths)
+        assert {(tuple(p['path']), p['instruction']) for p in data['parses']} \
+            == set(profile.parses)
+
+    def test_report(self, profile):
+        report = profile.report()
+        assert report.splitlines()[0].split() == ['path', 'calls', 'seconds', 'rows']
+        assert '<root>' in report
+        assert f'{DATA_KEY1} > {KEYS[1]} > [] > {KEYS[3]}' in report
+
+    def test_clear(self, profile):
+        profile.clear()
+        assert profile.paths == profile.parses == {}